@@ -0,0 +1,95 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import numpy as np
+from conlang_tools.utils.methods import weigh_syllable
+
+if TYPE_CHECKING:
+    from conlang_tools.language.classes import Language
+
+
+def segment_table(weights: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+    keys = [key for key, weight in weights.items() if weight > 0]
+    if not keys:
+        raise IndexError("Cannot choose from an empty sequence")
+    table = np.empty(len(keys), dtype=object)
+    table[:] = keys
+    odds = np.array([weights[key] for key in keys], dtype=np.float64)
+    return table, odds / odds.sum()
+
+
+@lru_cache(maxsize=65536)
+def cached_weight(syllable: str) -> int:
+    return weigh_syllable(syllable)
+
+
+def cached_weights(syllables: List[str]) -> List[int]:
+    return [cached_weight(syllable) for syllable in syllables]
+
+
+def stress_indices(
+    lang: "Language",
+    syllables: np.ndarray,
+    codes: np.ndarray,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    num_words, num_syllables = syllables.shape
+    stress = lang.phonology.stress
+    if stress == "random":
+        return rng.integers(0, num_syllables, size=num_words)
+    if stress == "heavy":
+        # Each code stands for one onset, nucleus and coda (or none), so we
+        # only need to weigh one syllable per distinct code, then stress the
+        # first of the heaviest in each word, as apply_stress does. We don't
+        # build a syllable pool for this: workers get a fresh copy of the
+        # language for every batch, and would each build it again.
+        _, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+        examples = syllables.reshape(-1)[first]
+        weights = np.array(cached_weights(list(examples)))
+        return np.argmax(weights[inverse].reshape(codes.shape), axis=1)
+    row = [""] * num_syllables
+    index = lang.stress_index(row)
+    return np.full(num_words, index if index is not None else 0)
+
+
+def generate_batch(
+    lang: "Language",
+    num_words: int,
+    num_syllables: int = 1,
+    rng: Optional[np.random.Generator] = None,
+) -> List[str]:
+    # Draws every segment and open/closed flag for the whole batch at once,
+    # then assembles the strings column by column.
+    rng = rng if rng is not None else np.random.default_rng(lang.rng.getrandbits(64))
+    shape = (num_words, num_syllables)
+    tactics = lang.phonotactics
+    onsets, onset_odds = segment_table(tactics.onset)
+    nuclei, nucleus_odds = segment_table(tactics.nucleus)
+    codas, coda_odds = segment_table(tactics.coda)
+
+    onset = rng.choice(len(onsets), size=shape, p=onset_odds)
+    nucleus = rng.choice(len(nuclei), size=shape, p=nucleus_odds)
+    coda = rng.choice(len(codas), size=shape, p=coda_odds)
+    is_open = rng.random(shape) < lang.phonology.openness
+    syllables = onsets[onset] + nuclei[nucleus] + np.where(is_open, "", codas[coda])
+
+    if num_syllables > 1:
+        coda_code = np.where(is_open, 0, coda + 1)
+        codes = (onset * len(nuclei) + nucleus) * (len(codas) + 1) + coda_code
+        stressed = stress_indices(lang, syllables, codes, rng)
+        rows = np.arange(num_words)
+        syllables[rows, stressed] = "ˈ" + syllables[rows, stressed]
+
+    words = "/" + syllables[:, 0]
+    for column in range(1, num_syllables):
+        words = words + "." + syllables[:, column]
+    return (words + "/").tolist()
+
+
+def generate_shard(
+    lang: "Language",
+    num_words: int,
+    num_syllables: int,
+    seed: np.random.SeedSequence,
+) -> List[str]:
+    # Run in a worker process, with its own stream of random numbers.
+    return generate_batch(lang, num_words, num_syllables, np.random.default_rng(seed))
@@ -1,24 +1,144 @@
 from collections import Counter
-from typing import Dict, List, Literal, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
+from itertools import chain, repeat
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 import random
-from statistics import mean
+from statistics import NormalDist, mean
+import numpy as np
 import yaml
+from conlang_tools.language.batch import generate_batch, generate_shard
+from conlang_tools.language.constraints import WordConstraints, generate_constrained
+from conlang_tools.language.statistics import (
+    count_open_per_word,
+    count_segments,
+    count_stress_positions,
+    count_syllables,
+    measure_openness,
+)
+from conlang_tools.language.index import PhonemeIndex
+from conlang_tools.language.ledger import Ledger
+from conlang_tools.language.neighbors import NeighborIndex
+from conlang_tools.language.pool import SyllablePool, count_combinations, pool_limit
+from conlang_tools.language.lexicon import EncodedLexicon, Lexicon
+from conlang_tools.language.scoring import score_words
+from conlang_tools.language.wordspace import (
+    Saturation,
+    WordSpace,
+    drawing_threshold,
+    tracking_threshold,
+)
 from conlang_tools.phonemes.consonants import Consonant
 from conlang_tools.phonemes.vowels import Vowel, VowelLocation, VowelOpenness
 from conlang_tools.phonemes.roots import Root, Syllable
-from conlang_tools.utils.methods import get_choices, weigh_syllables
+from conlang_tools.utils.classes import (
+    BloomFilter,
+    Snapshot,
+    VersionedDict,
+    VersionedList,
+    WeightedSampler,
+    appended,
+    snapshot,
+)
+from conlang_tools.utils.external import external_unique
+from conlang_tools.utils.methods import (
+    get_choices,
+    phoneme_distance,
+    shard,
+    weigh_syllables,
+)
 
 # Sadly, we can't automate literal-to-list, so if you update this list, make
 # sure you update Stress.types to match!
 StressTypes = Literal[
     "initial", "final", "penultimate", "antepenultimate", "heavy", "random"
 ]
+StorageTypes = Literal["list", "array"]
+GiveUpTypes = Literal["raise", "stop"]
+GenerationModes = Literal["sequential", "batch"]
 LanguageDictionaryTypes = (
     Dict[str, Dict[str, int]] | Dict[str, float | StressTypes] | List[str]
 )
 languages_directory = "languages/"
 
 
+class RetryPolicy(NamedTuple):
+    attempts: int = 10
+    max_syllables: Optional[int] = None
+    give_up: GiveUpTypes = "raise"
+    # How many phonemes a new word must differ by from every word we have.
+    # At 1, any word we don't already have will do.
+    min_distance: int = 1
+
+
+class ChangeMeasurement(NamedTuple):
+    words: int
+    changed: int
+    phonemes: int
+
+    @property
+    def ratio(self) -> float:
+        return self.changed / self.words if self.words else 0
+
+
+class Estimate(NamedTuple):
+    value: float
+    low: float
+    high: float
+
+
+class Inventory(NamedTuple):
+    consonants: FrozenSet[Consonant]
+    vowels: FrozenSet[Vowel]
+
+
+@lru_cache(maxsize=1024)
+def map_vowels(
+    vowels: FrozenSet[Vowel], map_type: str = "height", reverse: bool = True
+) -> Dict[str, Vowel]:
+    locations = VowelLocation.types()
+    heights = VowelOpenness.types()
+
+    def location_sort(v: Vowel):
+        return (
+            heights.index(v.openness.value),
+            v.rounded,
+            locations.index(v.location.value),
+        )
+
+    def height_sort(v: Vowel):
+        return (
+            locations.index(v.location.value),
+            v.rounded,
+            heights.index(v.openness.value),
+        )
+
+    sorting_method = location_sort if map_type == "location" else height_sort
+    sorted_vowels = sorted(vowels, key=sorting_method, reverse=reverse)
+    mapping: Dict[str, Vowel] = {}
+
+    for i, vowel in enumerate(sorted_vowels):
+        mapping[vowel.symbol] = vowel
+        for next_vowel in sorted_vowels[i + 1 :]:
+            if vowel.same_except(next_vowel, map_type):
+                mapping[vowel.symbol] = next_vowel
+                break
+
+    return mapping
+
+
 class Phonology:
     def __init__(
         self,
@@ -35,37 +155,34 @@ class Phonology:
 
     @staticmethod
     def calculate_openness(words: List[str]):
-        syllables = [syllable for ipa in words for syllable in Root(ipa).syllables]
-        total = len(syllables)
-        open = sum(syllable.is_open() for syllable in syllables)
-        return open / total if total else 0
+        return measure_openness(EncodedLexicon(words))
 
     @staticmethod
     def poll_stress(words: List[str]) -> StressTypes:
-        counter: Dict[StressTypes, int] = {
-            "initial": 0,
-            "final": 0,
-            "penultimate": 0,
-            "antepenultimate": 0,
-            "heavy": 0,
-        }
-
-        for word in words:
-            analysis = Stress.analyze_stress(word)
-            for stress_type in analysis:
-                if analysis[stress_type]:
-                    counter[stress_type] += 1
+        counter = count_stress_positions(EncodedLexicon(words))
+        return Phonology.choose_stress(counter, len(words))
 
+    @staticmethod
+    def choose_stress(counter: Dict[StressTypes, int], total: int) -> StressTypes:
         max_key = max(counter, key=counter.get)
-        if counter[max_key] < (len(words) / 2):
+        if counter[max_key] < (total / 2):
             return "random"
         return max_key
 
     @staticmethod
-    def from_words(words: List[str]) -> "Phonology":
-        openness = Phonology.calculate_openness(words)
-        stress = Phonology.poll_stress(words)
-        return Phonology(openness=openness, stress=stress)
+    def from_statistics(stats: "LexiconStatistics") -> "Phonology":
+        return Phonology(openness=stats.openness, stress=stats.poll_stress())
+
+    @staticmethod
+    def from_words(
+        words: Sequence[str],
+        jobs: int = 1,
+        sample: Optional[int] = None,
+        seed: Optional[int] = None,
+        stratify: bool = False,
+    ) -> "Phonology":
+        stats = LexiconStatistics.from_sample(words, sample, seed, stratify, jobs)
+        return Phonology.from_statistics(stats)
 
 
 class Phonotactics:
@@ -75,12 +192,55 @@ class Phonotactics:
         nucleus: Optional[Dict[str, int]] = None,
         coda: Optional[Dict[str, int]] = None,
     ):
+        self.version = 0
+        self._samplers: Dict[str, Tuple[int, WeightedSampler]] = {}
         self.onset = onset if onset is not None else {}
         self.nucleus = nucleus if nucleus is not None else {}
         self.coda = coda if coda is not None else {}
 
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state: Dict[str, Dict[str, int]]):
+        self.__init__(**state)
+
+    @property
+    def onset(self) -> Dict[str, int]:
+        return self._onset
+
+    @onset.setter
+    def onset(self, value: Dict[str, int]):
+        self._onset = self.track(value)
+
+    @property
+    def nucleus(self) -> Dict[str, int]:
+        return self._nucleus
+
+    @nucleus.setter
+    def nucleus(self, value: Dict[str, int]):
+        self._nucleus = self.track(value)
+
+    @property
+    def coda(self) -> Dict[str, int]:
+        return self._coda
+
+    @coda.setter
+    def coda(self, value: Dict[str, int]):
+        self._coda = self.track(value)
+
+    def track(self, value: Dict[str, int]) -> VersionedDict:
+        self.touch()
+        return VersionedDict(value, on_change=self.touch)
+
+    def touch(self) -> None:
+        self.version += 1
+
     def to_dict(self) -> Dict[str, Dict[str, int]]:
-        return {"onset": self.onset, "nucleus": self.nucleus, "coda": self.coda}
+        return {
+            "onset": dict(self.onset),
+            "nucleus": dict(self.nucleus),
+            "coda": dict(self.coda),
+        }
 
     def choices(self, element: str = "nucleus") -> List[str]:
         if element == "onset":
@@ -90,22 +250,44 @@ class Phonotactics:
         else:
             return get_choices(self.nucleus)
 
-    @staticmethod
-    def from_words(words: str) -> "Phonotactics":
-        roots = [Root(word) for word in words]
-        onsets = [
-            s.onset for root in roots for s in root.syllables if s.onset is not None
-        ]
-        nuclei = [
-            s.nucleus for root in roots for s in root.syllables if s.nucleus is not None
-        ]
-        codas = [s.coda for root in roots for s in root.syllables if s.coda is not None]
+    def sampler(self, element: str = "nucleus") -> WeightedSampler:
+        cached = self._samplers.get(element)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+
+        if element == "onset":
+            weights = self.onset
+        elif element == "coda":
+            weights = self.coda
+        else:
+            weights = self.nucleus
+        sampler = WeightedSampler(weights)
+        self._samplers[element] = (self.version, sampler)
+        return sampler
 
-        onset = dict(Counter(onsets))
-        nucleus = dict(Counter(nuclei))
-        coda = dict(Counter(codas))
+    def choose(
+        self, element: str = "nucleus", rng: Optional[random.Random] = None
+    ) -> str:
+        return self.sampler(element).sample(rng)
 
-        return Phonotactics(onset=onset, nucleus=nucleus, coda=coda)
+    @staticmethod
+    def from_statistics(stats: "LexiconStatistics") -> "Phonotactics":
+        return Phonotactics(
+            onset=stats.scale(stats.onset),
+            nucleus=stats.scale(stats.nucleus),
+            coda=stats.scale(stats.coda),
+        )
+
+    @staticmethod
+    def from_words(
+        words: Sequence[str],
+        jobs: int = 1,
+        sample: Optional[int] = None,
+        seed: Optional[int] = None,
+        stratify: bool = False,
+    ) -> "Phonotactics":
+        stats = LexiconStatistics.from_sample(words, sample, seed, stratify, jobs)
+        return Phonotactics.from_statistics(stats)
 
 
 class Stress:
@@ -154,23 +336,177 @@ class Stress:
 
     @staticmethod
     def is_heavy(word: str) -> bool:
-        root = Root(word)
-        weights = weigh_syllables([syllable.unmarked for syllable in root.syllables])
-        heavyweight = max(weights)
-        for index in range(len(root.syllables)):
-            if root.stresses(index) and weights[index] < heavyweight:
-                return False
-        return True
+        return Stress.analyze_stress(word)["heavy"]
 
     @staticmethod
     def analyze_stress(word: str) -> Dict[str, bool]:
-        return {
-            "initial": Stress.is_initial(word),
-            "final": Stress.is_final(word),
-            "penultimate": Stress.is_penultimate(word),
-            "antepenultimate": Stress.is_antepenultimate(word),
-            "heavy": Stress.is_heavy(word),
-        }
+        # The same analysis LexiconStatistics makes of a whole lexicon, for
+        # a lexicon of one word.
+        counts = count_stress_positions(EncodedLexicon([word]))
+        return {stress_type: count > 0 for stress_type, count in counts.items()}
+
+
+class LexiconStatistics:
+    def __init__(self):
+        self.words = 0
+        self.syllables = 0
+        self.open_syllables = 0
+        self.onset: Counter[str] = Counter()
+        self.nucleus: Counter[str] = Counter()
+        self.coda: Counter[str] = Counter()
+        self.stress: Counter[StressTypes] = Counter()
+        self.lengths: Counter[int] = Counter()
+        self.population: Optional[int] = None
+
+        # Per-word sums of squares, so that we can estimate the variance of
+        # openness when these statistics only describe a sample.
+        self.open_squares = 0
+        self.open_products = 0
+        self.syllable_squares = 0
+
+    @property
+    def openness(self) -> float:
+        return self.open_syllables / self.syllables if self.syllables else 0
+
+    @property
+    def sampled(self) -> bool:
+        return self.population is not None and self.population > self.words
+
+    def scale(self, counter: Counter[str]) -> Dict[str, int]:
+        if not self.sampled:
+            return dict(counter)
+        factor = self.population / self.words
+        return {key: max(round(count * factor), 1) for key, count in counter.items()}
+
+    def interval(self, value: float, variance: float, confidence: float) -> Estimate:
+        if not self.sampled or self.words < 2:
+            return Estimate(value=value, low=value, high=value)
+        correction = 1 - self.words / self.population
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        margin = z * (max(variance, 0) * correction) ** 0.5
+        low, high = max(value - margin, 0), min(value + margin, 1)
+        return Estimate(value=value, low=low, high=high)
+
+    def estimate_openness(self, confidence: float = 0.95) -> Estimate:
+        n = self.words
+        r = self.openness
+        if n < 2 or self.syllables < 1:
+            return self.interval(r, 0, confidence)
+        residuals = (
+            self.open_squares
+            - 2 * r * self.open_products
+            + r * r * self.syllable_squares
+        )
+        mean_syllables = self.syllables / n
+        variance = residuals / (n - 1) / (n * mean_syllables**2)
+        return self.interval(r, variance, confidence)
+
+    def estimate_stress(
+        self, stress_type: StressTypes, confidence: float = 0.95
+    ) -> Estimate:
+        n = self.words
+        p = self.stress[stress_type] / n if n else 0
+        variance = p * (1 - p) / (n - 1) if n > 1 else 0
+        return self.interval(p, variance, confidence)
+
+    def estimates(self, confidence: float = 0.95) -> Dict[str, Estimate]:
+        polled = [t for t in Stress.types() if t != "random"]
+        estimates = {"openness": self.estimate_openness(confidence)}
+        for stress_type in polled:
+            estimates[stress_type] = self.estimate_stress(stress_type, confidence)
+        return estimates
+
+    def add(self, word: str) -> None:
+        self.update([word])
+
+    def update(self, words: List[str]) -> None:
+        self.merge(LexiconStatistics.analyze(words))
+
+    def merge(self, other: "LexiconStatistics") -> "LexiconStatistics":
+        self.words += other.words
+        self.syllables += other.syllables
+        self.open_syllables += other.open_syllables
+        self.onset.update(other.onset)
+        self.nucleus.update(other.nucleus)
+        self.coda.update(other.coda)
+        self.stress.update(other.stress)
+        self.lengths.update(other.lengths)
+        self.open_squares += other.open_squares
+        self.open_products += other.open_products
+        self.syllable_squares += other.syllable_squares
+        return self
+
+    def poll_stress(self) -> StressTypes:
+        polled = [t for t in Stress.types() if t != "random"]
+        counter = {stress_type: self.stress[stress_type] for stress_type in polled}
+        return Phonology.choose_stress(counter, self.words)
+
+    @staticmethod
+    def analyze(words: List[str]) -> "LexiconStatistics":
+        return LexiconStatistics.from_lexicon(EncodedLexicon(words))
+
+    @staticmethod
+    def from_lexicon(lexicon: EncodedLexicon) -> "LexiconStatistics":
+        stats = LexiconStatistics()
+        stats.words = len(lexicon)
+        stats.syllables = len(lexicon.open)
+        stats.open_syllables = int(lexicon.open.sum())
+        stats.onset = Counter(count_segments(lexicon, "onset"))
+        stats.nucleus = Counter(count_segments(lexicon, "nucleus"))
+        stats.coda = Counter(count_segments(lexicon, "coda"))
+        stress = count_stress_positions(lexicon)
+        stats.stress = Counter({key: count for key, count in stress.items() if count})
+        stats.lengths = Counter(count_syllables(lexicon))
+
+        opens = count_open_per_word(lexicon)
+        counts = lexicon.syllable_counts
+        stats.open_squares = int((opens**2).sum())
+        stats.open_products = int((opens * counts).sum())
+        stats.syllable_squares = int((counts**2).sum())
+        return stats
+
+    @staticmethod
+    def from_words(words: List[str], jobs: int = 1) -> "LexiconStatistics":
+        if jobs < 2 or len(words) < 2:
+            return LexiconStatistics.analyze(words)
+
+        stats = LexiconStatistics()
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for partial in executor.map(LexiconStatistics.analyze, shard(words, jobs)):
+                stats.merge(partial)
+        return stats
+
+    @staticmethod
+    def from_sample(
+        words: Sequence[str],
+        size: Optional[int] = None,
+        seed: Optional[int] = None,
+        stratify: bool = False,
+        jobs: int = 1,
+    ) -> "LexiconStatistics":
+        if size is not None and size < 1:
+            raise ValueError(f"Cannot sample {size} words; a sample needs at least 1.")
+        if size is None or size >= len(words):
+            return LexiconStatistics.from_words(words, jobs=jobs)
+
+        rng = random.Random(seed)
+        if stratify:
+            # Proportional allocation across syllable counts, so the sample
+            # stays self-weighting and the estimates need no reweighting.
+            strata: Dict[int, List[int]] = {}
+            for index, word in enumerate(words):
+                strata.setdefault(word.count("."), []).append(index)
+            indices: List[int] = []
+            for members in strata.values():
+                quota = max(round(size * len(members) / len(words)), 1)
+                indices.extend(rng.sample(members, min(quota, len(members))))
+        else:
+            indices = rng.sample(range(len(words)), size)
+
+        sample = [words[index] for index in sorted(indices)]
+        stats = LexiconStatistics.from_words(sample, jobs=jobs)
+        stats.population = len(words)
+        return stats
 
 
 class Language:
@@ -178,67 +514,221 @@ class Language:
         self,
         phonotactics: Optional[Phonotactics] = None,
         phonology: Optional[Phonology] = None,
-        words: Optional[List[str]] = None,
+        words: Optional[Sequence[str]] = None,
+        storage: StorageTypes = "list",
+        rng: Optional[random.Random] = None,
     ):
         self.phonotactics = phonotactics if phonotactics is not None else Phonotactics()
+        self.rng = rng if rng is not None else random.Random()
         self.phonology = phonology if phonology is not None else Phonology()
-        self.words: List[str] = words if words is not None else []
-        self.generated: List[str] = []
+        self._words = Language.store(words if words is not None else [], storage)
+        self.generated: List[str] = VersionedList()
+        self._inventory: Optional[Inventory] = None
+        self._inventory_source: Optional[Tuple[Phonotactics, int]] = None
+        self._phoneme_index: Optional[PhonemeIndex] = None
+        self._phoneme_index_source: Optional[Snapshot] = None
+        self._known: Set[str] = set()
+        self._known_source: Tuple[Optional[Snapshot], Optional[Snapshot]] = (None, None)
+        self.bloom: Optional[BloomFilter] = None
+        self.ledger: Optional[Ledger] = None
+        self._bloom_source: Tuple[Optional[Snapshot], Optional[Snapshot]] = (None, None)
+        self._word_spaces: Dict[int, Tuple[Tuple, WordSpace]] = {}
+        self._syllable_pool: Optional[Tuple[Tuple, Optional[SyllablePool]]] = None
+        self._neighbors: Dict[int, NeighborIndex] = {}
+        self._neighbors_source: Dict[int, Tuple[Snapshot, Snapshot]] = {}
 
     def to_dict(self) -> Dict[str, LanguageDictionaryTypes]:
         return {
             "phonotactics": self.phonotactics.to_dict(),
             "phonology": self.phonology.to_dict(),
-            "words": self.words,
+            "words": list(self.words),
         }
 
-    def take_inventory(self) -> Tuple[List[Consonant], List[Vowel]]:
-        onset = [Syllable(key) for key in self.phonotactics.onset.keys()]
-        nucleus = [Syllable(key) for key in self.phonotactics.nucleus.keys()]
-        coda = [Syllable(key) for key in self.phonotactics.coda.keys()]
+    @property
+    def storage(self) -> StorageTypes:
+        return "array" if isinstance(self.words, Lexicon) else "list"
 
-        analyses = onset + nucleus + coda
-        phonemes = [p for a in analyses for p in a.phonemes]
+    @property
+    def words(self) -> Sequence[str]:
+        return self._words
 
-        consonants = [p for p in phonemes if isinstance(p, Consonant)]
-        consonants = list(set(consonants))
+    @words.setter
+    def words(self, words: Sequence[str]) -> None:
+        # Replacing the words keeps whatever storage the language had.
+        self._words = Language.store(words, self.storage)
 
-        vowels = [p for p in phonemes if isinstance(p, Vowel)]
-        vowels = list(set(vowels))
+    @staticmethod
+    def store(words: Sequence[str], storage: StorageTypes = "list") -> Sequence[str]:
+        # Lists are kept as a VersionedList, so that caches notice when a
+        # word is changed in place, and not only when words are added.
+        if isinstance(words, Lexicon):
+            return words
+        if storage == "array":
+            return Lexicon(words)
+        return words if isinstance(words, VersionedList) else VersionedList(words)
 
-        return consonants, vowels
+    @property
+    def inventory(self) -> Inventory:
+        tactics = self.phonotactics
+        source = self._inventory_source
+        if source is None or source[0] is not tactics or source[1] != tactics.version:
+            self._inventory = self.analyze_inventory(tactics)
+            self._inventory_source = (tactics, tactics.version)
+        return self._inventory
 
-    def vowel_mapping(self, map_type: str = "height", reverse: bool = True):
-        _, vowels = self.take_inventory()
-        locations = VowelLocation.types()
-        heights = VowelOpenness.types()
+    @property
+    def phoneme_index(self) -> PhonemeIndex:
+        # Rebuilt when words is replaced, shrinks or has a word changed in
+        # place, and otherwise extended with whatever's been appended.
+        index = self._phoneme_index
+        words = self.words
+        new_words = appended(words, self._phoneme_index_source)
+        if index is None or new_words is None:
+            index = PhonemeIndex(words)
+        else:
+            index.extend(new_words, start=len(index))
+        self._phoneme_index = index
+        self._phoneme_index_source = snapshot(words)
+        return index
 
-        def location_sort(v: Vowel):
-            return (
-                heights.index(v.openness.value),
-                v.rounded,
-                locations.index(v.location.value),
-            )
+    @property
+    def known(self) -> Set[str]:
+        # Every word we already have or have generated, kept in step with
+        # self.words and self.generated as they grow.
+        words, generated = self.words, self.generated
+        new_words = appended(words, self._known_source[0])
+        new_generated = appended(generated, self._known_source[1])
+        if new_words is None or new_generated is None:
+            self._known = set(words) | set(generated)
+        else:
+            self._known.update(new_words)
+            self._known.update(new_generated)
+        self._known_source = (snapshot(words), snapshot(generated))
+        return self._known
 
-        def height_sort(v: Vowel):
-            return (
-                locations.index(v.location.value),
-                v.rounded,
-                heights.index(v.openness.value),
-            )
+    @property
+    def dedup(self) -> Set[str] | BloomFilter:
+        # What new words are checked against: the exact set of known words,
+        # or a Bloom filter if use_bloom_filter has been called.
+        if self.bloom is None:
+            return self.known
 
-        sorting_method = location_sort if map_type == "location" else height_sort
-        sorted_vowels = sorted(vowels, key=sorting_method, reverse=reverse)
-        mapping: Dict[str, Vowel] = {}
+        # A Bloom filter can't forget anything, so if words or generated are
+        # replaced or changed, we add them again and live with the leftovers.
+        words, generated = self.words, self.generated
+        new_words = appended(words, self._bloom_source[0])
+        new_generated = appended(generated, self._bloom_source[1])
+        self.bloom.update(words if new_words is None else new_words)
+        self.bloom.update(generated if new_generated is None else new_generated)
+        self._bloom_source = (snapshot(words), snapshot(generated))
+        return self.bloom
 
-        for i, vowel in enumerate(sorted_vowels):
-            mapping[vowel.symbol] = vowel
-            for next_vowel in sorted_vowels[i + 1 :]:
-                if vowel.same_except(next_vowel, map_type):
-                    mapping[vowel.symbol] = next_vowel
-                    break
+    def use_bloom_filter(
+        self, expected: int = 1_000_000, error_rate: float = 0.001
+    ) -> BloomFilter:
+        # Trades exactness for memory: once this is on, checking for new
+        # words takes a fixed amount of memory however many we generate, but
+        # up to about error_rate of the new words we could have found (once
+        # we've generated the expected number) are skipped as if we already
+        # had them. New words are no longer kept in self.generated either,
+        # since that would grow without bound.
+        capacity = len(self.words) + len(self.generated) + expected
+        self.bloom = BloomFilter(capacity, error_rate)
+        self._bloom_source = (None, None)
+        return self.dedup
+
+    def neighbors(self, radius: int = 1) -> NeighborIndex:
+        # Built once per radius, then kept in step with self.words and
+        # self.generated, and given every word we claim.
+        words, generated = self.words, self.generated
+        index = self._neighbors.get(radius)
+        source = self._neighbors_source.get(radius, (None, None))
+        new_words = appended(words, source[0])
+        new_generated = appended(generated, source[1])
+        if index is None or new_words is None or new_generated is None:
+            ledger = self.ledger if self.ledger is not None else []
+            index = NeighborIndex(radius, chain(words, generated, ledger))
+        else:
+            index.update(new_words)
+            index.update(new_generated)
+        self._neighbors[radius] = index
+        self._neighbors_source[radius] = (snapshot(words), snapshot(generated))
+        return index
+
+    def is_new(
+        self, word: str, known: Set[str] | BloomFilter, min_distance: int = 1
+    ) -> bool:
+        if word in known or (self.ledger is not None and word in self.ledger):
+            return False
+        return min_distance <= 1 or not self.neighbors(min_distance - 1).near(word)
+
+    def syllable_pool(self) -> Optional[SyllablePool]:
+        # Built the first time we need it, and again whenever the
+        # phonotactics, openness or stress change. None if the language has more
+        # combinations of onset, nucleus and coda than pool_limit.
+        source = (self.phonotactics, self.phonotactics.version)
+        source += (self.phonology.openness, self.phonology.stress)
+        if self._syllable_pool is None or self._syllable_pool[0] != source:
+            fits = count_combinations(self) <= pool_limit
+            self._syllable_pool = (source, SyllablePool(self) if fits else None)
+        return self._syllable_pool[1]
+
+    def use_ledger(self, path: str) -> Ledger:
+        # From now on, new words must not be in the ledger at path either,
+        # and every new word we claim is added to it.
+        self.ledger = Ledger(path)
+        return self.ledger
+
+    def word_space(self, num_syllables: int = 1) -> WordSpace:
+        # Rebuilt whenever the phonotactics or phonology it was built from
+        # change; it keeps up with words and generated on its own.
+        phones = self.phonology
+        source = (self.phonotactics, self.phonotactics.version)
+        source += (phones.openness, phones.stress)
+        cached = self._word_spaces.get(num_syllables)
+        if cached is not None and cached[0] == source:
+            return cached[1]
+        space = WordSpace(self, num_syllables)
+        self._word_spaces[num_syllables] = (source, space)
+        return space
 
-        return mapping
+    def tracked_space(self, num_syllables: int = 1) -> Optional[WordSpace]:
+        # Only languages small enough to keep a syllable pool are small
+        # enough to fill up, and then only once they've used a good part of
+        # the words that many syllables could make, so we check that
+        # against a cheap upper bound before building anything.
+        used = len(self.words) + len(self.generated)
+        used += len(self.ledger) if self.ledger is not None else 0
+        bound = count_combinations(self) ** num_syllables
+        if used < tracking_threshold * bound or self.syllable_pool() is None:
+            return None
+        return self.word_space(num_syllables)
+
+    def saturation(self, num_syllables: int = 1) -> Saturation:
+        return self.word_space(num_syllables).saturation()
+
+    @staticmethod
+    def analyze_inventory(tactics: Phonotactics) -> Inventory:
+        onset = [Syllable(key) for key in tactics.onset.keys()]
+        nucleus = [Syllable(key) for key in tactics.nucleus.keys()]
+        coda = [Syllable(key) for key in tactics.coda.keys()]
+
+        analyses = onset + nucleus + coda
+        phonemes = [p for a in analyses for p in a.phonemes]
+
+        consonants = frozenset(p for p in phonemes if isinstance(p, Consonant))
+        vowels = frozenset(p for p in phonemes if isinstance(p, Vowel))
+        return Inventory(consonants=consonants, vowels=vowels)
+
+    def take_inventory(self) -> Tuple[List[Consonant], List[Vowel]]:
+        inventory = self.inventory
+        return list(inventory.consonants), list(inventory.vowels)
+
+    def vowel_mapping(
+        self, map_type: str = "height", reverse: bool = True
+    ) -> Dict[str, Vowel]:
+        mapping = map_vowels(self.inventory.vowels, map_type, reverse)
+        return dict(mapping)
 
     def vowel_height_mapping(self, rise: bool = True) -> Dict[str, Vowel]:
         return self.vowel_mapping("height", reverse=rise)
@@ -247,70 +737,384 @@ class Language:
         return self.vowel_mapping("location", reverse=fronting)
 
     def generate_syllable(self):
-        onset = random.choice(self.phonotactics.choices("onset"))
-        nucleus = random.choice(self.phonotactics.choices("nucleus"))
-        coda = random.choice(self.phonotactics.choices("coda"))
+        pool = self.syllable_pool()
+        if pool is not None:
+            return pool.sample(self.rng)
+
+        onset = self.phonotactics.choose("onset", self.rng)
+        nucleus = self.phonotactics.choose("nucleus", self.rng)
+        coda = self.phonotactics.choose("coda", self.rng)
 
         open_syllable = onset + nucleus
         closed_syllable = onset + nucleus + coda
 
-        is_open = random.random() < self.phonology.openness
+        is_open = self.rng.random() < self.phonology.openness
         return open_syllable if is_open else closed_syllable
 
-    def apply_stress(self, syllables: List[str]):
-        if len(syllables) < 2:
-            return syllables
-
+    def stress_index(
+        self, syllables: List[str], weights: Optional[List[int]] = None
+    ) -> Optional[int]:
+        # Which syllable the language stresses, or None if that's random.
         if self.phonology.stress == "final":
-            index = -1
+            return len(syllables) - 1
         elif self.phonology.stress == "penultimate":
-            index = -2
+            return len(syllables) - 2
         elif self.phonology.stress == "antepenultimate":
-            index = -3 if len(syllables) > 2 else 0
+            return len(syllables) - 3 if len(syllables) > 2 else 0
         elif self.phonology.stress == "random":
-            index = random.randrange(0, len(syllables))
+            return None
         elif self.phonology.stress == "heavy":
-            weights = weigh_syllables(syllables)
-            index = weights.index(max(weights))
-        else:
-            index = 0
+            weights = weights if weights is not None else weigh_syllables(syllables)
+            return weights.index(max(weights))
+        return 0
+
+    def apply_stress(self, syllables: List[str], weights: Optional[List[int]] = None):
+        if len(syllables) < 2:
+            return syllables
+
+        index = self.stress_index(syllables, weights)
+        if index is None:
+            index = self.rng.randrange(0, len(syllables))
 
         syllables[index] = "ˈ" + syllables[index]
         return syllables
 
     def generate_word(self, num_syllables: int = 1):
         syllables = [self.generate_syllable() for _ in range(num_syllables)]
-        stressed = self.apply_stress(syllables)
+        pool = self.syllable_pool()
+        heavy = pool is not None and self.phonology.stress == "heavy"
+        weights = pool.weigh(syllables) if heavy else None
+        stressed = self.apply_stress(syllables, weights)
         return f"/{'.'.join(stressed)}/"
 
-    def generate_new_word(self, num_syllables: int = 1):
-        for _ in range(10):
-            word = self.generate_word(num_syllables)
-            if word not in self.words and word not in self.generated:
-                self.generated.append(word)
-                return word
-        return self.generate_new_word(num_syllables + 1)
+    def generate_constrained_word(self, constraints: WordConstraints) -> str:
+        return generate_constrained(self, constraints, self.rng)
 
-    def generate_new_words(self, num_words: int = 1, num_syllables: int = 1):
-        return [
-            self.generate_new_word(num_syllables=num_syllables)
-            for _ in range(num_words)
-        ]
+    def generate_new_word(
+        self,
+        num_syllables: int = 1,
+        policy: Optional[RetryPolicy] = None,
+        record: bool = True,
+        constraints: Optional[WordConstraints] = None,
+    ) -> Optional[str]:
+        policy = policy if policy is not None else RetryPolicy()
+        known = self.dedup
+        if constraints is not None:
+            # Constraints set the length, so there's nothing to grow; every
+            # attempt already fits them, and can only fail by being used.
+            for _ in range(policy.attempts):
+                word = self.generate_constrained_word(constraints)
+                if self.is_new(word, known, policy.min_distance):
+                    self.claim(word, known, record)
+                    return word
+            if policy.give_up == "stop":
+                return None
+            raise ValueError("Could not find a new word that fits those constraints.")
+
+        length = num_syllables
+        while policy.max_syllables is None or length <= policy.max_syllables:
+            space = self.tracked_space(length)
+            saturation = space.saturation() if space is not None else None
+            if saturation is not None and saturation.full:
+                length += 1
+                continue
+            if (
+                space is not None
+                and saturation is not None
+                and saturation.free < drawing_threshold
+            ):
+                # Most attempts here would fail, so rather than make them,
+                # we step up with the chance that all of them would have
+                # failed, and otherwise draw from the unused words, which
+                # gives each the same chance the first success would have.
+                if self.rng.random() < (1 - saturation.free) ** policy.attempts:
+                    length += 1
+                    continue
+                word = space.spell(space.draw_weighted(self.rng))
+                if self.is_new(word, known, policy.min_distance):
+                    self.claim(word, known, record)
+                    return word
+
+            for _ in range(policy.attempts):
+                word = self.generate_word(length)
+                if self.is_new(word, known, policy.min_distance):
+                    self.claim(word, known, record)
+                    return word
+            length += 1
+
+        if policy.give_up == "stop":
+            return None
+        raise ValueError(
+            f"Could not find a new word with {num_syllables} to "
+            f"{policy.max_syllables} syllables."
+        )
+
+    def claim(
+        self, word: str, known: Set[str] | BloomFilter, record: bool = True
+    ) -> None:
+        # With record=False, a word is only remembered in the dedup set (and
+        # any neighbor indexes, word spaces and ledger), so long streams
+        # don't also pile up in self.generated.
+        known.add(word)
+        if self.ledger is not None:
+            self.ledger.add(word)
+        for _, space in self._word_spaces.values():
+            space.mark(word)
+        for index in self._neighbors.values():
+            index.add(word)
+        if record and self.bloom is None:
+            self.generated.append(word)
+
+    def generate_new_words(
+        self,
+        num_words: int = 1,
+        num_syllables: int = 1,
+        policy: Optional[RetryPolicy] = None,
+        mode: GenerationModes = "sequential",
+        jobs: int = 1,
+        constraints: Optional[WordConstraints] = None,
+    ) -> List[str]:
+        return list(
+            self.iter_new_words(
+                num_syllables,
+                limit=num_words,
+                policy=policy,
+                mode=mode,
+                jobs=jobs,
+                constraints=constraints,
+            )
+        )
+
+    def iter_new_words(
+        self,
+        num_syllables: int = 1,
+        limit: Optional[int] = None,
+        policy: Optional[RetryPolicy] = None,
+        mode: GenerationModes = "sequential",
+        jobs: int = 1,
+        record: bool = True,
+        constraints: Optional[WordConstraints] = None,
+    ) -> Iterator[str]:
+        if constraints is None and (mode == "batch" or jobs > 1):
+            yield from self.iter_new_words_in_batches(
+                num_syllables, limit, policy, jobs=jobs, record=record
+            )
+            return
+
+        count = 0
+        while limit is None or count < limit:
+            word = self.generate_new_word(num_syllables, policy, record, constraints)
+            if word is None:
+                return
+            yield word
+            count += 1
+
+    def iter_new_words_in_batches(
+        self,
+        num_syllables: int = 1,
+        limit: Optional[int] = None,
+        policy: Optional[RetryPolicy] = None,
+        jobs: int = 1,
+        record: bool = True,
+    ) -> Iterator[str]:
+        # Like iter_new_words, but a whole batch of candidates at a time. A
+        # length is given up on after policy.attempts batches in a row that
+        # don't turn up a single new word. With more than one job, workers
+        # each draw part of every batch from their own stream, and all of
+        # the deduplication happens here.
+        policy = policy if policy is not None else RetryPolicy()
+        seeds = np.random.SeedSequence(self.rng.getrandbits(64))
+        rng = np.random.default_rng(seeds)
+        template = Language(phonotactics=self.phonotactics, phonology=self.phonology)
+        known = self.dedup
+        count = 0
+        length = num_syllables
+        misses = 0
+        with ProcessPoolExecutor(jobs) if jobs > 1 else nullcontext() as executor:
+            while limit is None or count < limit:
+                if policy.max_syllables is not None and length > policy.max_syllables:
+                    if policy.give_up == "stop":
+                        return
+                    raise ValueError(
+                        f"Could not find {limit or 'any more'} new words with "
+                        f"{num_syllables} to {policy.max_syllables} syllables."
+                    )
+
+                space = self.tracked_space(length)
+                saturation = space.saturation() if space is not None else None
+                if saturation is not None and saturation.full:
+                    length += 1
+                    misses = 0
+                    continue
+                if saturation is not None and saturation.free < drawing_threshold:
+                    # Most of a batch would be words we already have, so
+                    # draw from what's left a word at a time instead. Each
+                    # of our attempts is a whole batch, so it gets as many
+                    # attempts as a batch has candidates.
+                    batches = policy._replace(attempts=policy.attempts * 64 * jobs)
+                    word = self.generate_new_word(length, batches, record)
+                    if word is None:
+                        return
+                    yield word
+                    count += 1
+                    continue
+
+                needed = limit - count if limit is not None else 4096 * jobs
+                size = max(needed, 64 * jobs)
+                if executor is None:
+                    candidates = generate_batch(self, size, length, rng)
+                else:
+                    sizes = [len(part) for part in shard(range(size), jobs)]
+                    shards = executor.map(
+                        generate_shard,
+                        repeat(template),
+                        sizes,
+                        repeat(length),
+                        seeds.spawn(len(sizes)),
+                    )
+                    candidates = [word for part in shards for word in part]
+
+                found = 0
+                for word in candidates:
+                    if self.is_new(word, known, policy.min_distance):
+                        self.claim(word, known, record)
+                        yield word
+                        found += 1
+                        count += 1
+                        if limit is not None and count >= limit:
+                            break
+
+                misses = misses + 1 if found == 0 else 0
+                if misses >= policy.attempts:
+                    length += 1
+                    misses = 0
+
+    def iter_exhaustive(
+        self,
+        num_syllables: int = 1,
+        limit: Optional[int] = None,
+        policy: Optional[RetryPolicy] = None,
+        record: bool = True,
+    ) -> Iterator[str]:
+        # Every new word with exactly num_syllables syllables, most likely
+        # first, until we've found limit of them or there are none left.
+        policy = policy if policy is not None else RetryPolicy()
+        space = self.word_space(num_syllables)
+        known = self.dedup
+        count = 0
+        for digits in space.best_first():
+            if limit is not None and count >= limit:
+                return
+            word = space.spell(digits)
+            if self.is_new(word, known, policy.min_distance):
+                self.claim(word, known, record)
+                yield word
+                count += 1
+
+    def iter_candidates(
+        self, num_candidates: int, num_syllables: int = 1, batch_size: int = 65536
+    ) -> Iterator[str]:
+        rng = np.random.default_rng(self.rng.getrandbits(64))
+        for start in range(0, num_candidates, batch_size):
+            size = min(batch_size, num_candidates - start)
+            yield from generate_batch(self, size, num_syllables, rng)
+
+    def iter_unique_candidates(
+        self,
+        num_candidates: int,
+        num_syllables: int = 1,
+        run_size: int = 1_000_000,
+        directory: Optional[str] = None,
+    ) -> Iterator[str]:
+        # Draws num_candidates words with no deduplication at all, then sorts
+        # them on disk and merges them to yield each new one exactly once, in
+        # sorted order. Neither the candidates nor the words we have need to
+        # fit in memory, so nothing is added to self.generated either.
+        candidates = self.iter_candidates(num_candidates, num_syllables)
+        ledger = self.ledger if self.ledger is not None else []
+        exclude = chain(self.words, self.generated, ledger)
+        for word in external_unique(candidates, exclude, run_size, directory):
+            if self.ledger is not None:
+                self.ledger.add(word)
+            yield word
+
+    def score(self, words: Sequence[str]) -> np.ndarray:
+        # The log-probability of the language generating each word.
+        return score_words(self, words)
+
+    def rank_new_words(
+        self,
+        num_words: int,
+        num_syllables: int = 1,
+        oversample: int = 10,
+        typical: bool = True,
+        policy: Optional[RetryPolicy] = None,
+        record: bool = True,
+    ) -> List[str]:
+        # Draws oversample times as many candidates as we need, then returns
+        # the num_words new ones the language is most likely to generate (or,
+        # with typical=False, least likely), in that order. Candidates that
+        # tie keep the order they were drawn in, so ties are broken at
+        # random. We may find fewer than num_words if the space is small.
+        policy = policy if policy is not None else RetryPolicy()
+        candidates = self.iter_candidates(num_words * oversample, num_syllables)
+        unique = list(dict.fromkeys(candidates))
+        scores = self.score(unique)
+        order = np.argsort(-scores if typical else scores, kind="stable")
+
+        known = self.dedup
+        chosen: List[str] = []
+        for index in order:
+            word = unique[index]
+            if self.is_new(word, known, policy.min_distance):
+                self.claim(word, known, record)
+                chosen.append(word)
+                if len(chosen) >= num_words:
+                    break
+        return chosen
 
     def measure_change(self, after: List[str]) -> float:
+        before = set(self.words)
+        changed = sum(word not in before for word in after)
+        return changed / len(after)
+
+    def measure_aligned_change(
+        self, after: List[str], phonemes: bool = True
+    ) -> ChangeMeasurement:
+        # With phonemes=False, we only count the words that changed, and
+        # leave the phonemes at 0, since that's the costly part.
+        if len(after) != len(self.words):
+            raise ValueError(
+                f"Cannot align {len(after)} words with {len(self.words)} words."
+            )
+
         changed = 0
-        for word in after:
-            if word not in self.words:
+        distance = 0
+        for before_word, after_word in zip(self.words, after):
+            if before_word != after_word:
                 changed += 1
-        return changed / len(after)
+                if phonemes:
+                    distance += phoneme_distance(before_word, after_word)
+        return ChangeMeasurement(words=len(after), changed=changed, phonemes=distance)
 
-    def calculate_conservatism_after_change(self, after: List[str]) -> float:
+    def calculate_conservatism_after_change(
+        self, after: List[str], aligned: bool = False
+    ) -> float:
         c = self.phonology.conservatism
-        c1 = 1 - self.measure_change(after)
+        if aligned:
+            change = self.measure_aligned_change(after, phonemes=False).ratio
+        else:
+            change = self.measure_change(after)
+        c1 = 1 - change
         return mean([c, c, c, c1])
 
     @classmethod
-    def load(cls, name: str) -> "Language":
+    def load(
+        cls,
+        name: str,
+        storage: StorageTypes = "list",
+        rng: Optional[random.Random] = None,
+    ) -> "Language":
         with open(f"{languages_directory}{name}.yaml", "r") as yaml_file:
             data = yaml.safe_load(yaml_file)
             phonotactics = Phonotactics(
@@ -324,13 +1128,39 @@ class Language:
                 openness=data["phonology"]["openness"],
             )
             return cls(
-                phonotactics=phonotactics, phonology=phonology, words=data["words"]
+                phonotactics=phonotactics,
+                phonology=phonology,
+                words=data["words"],
+                storage=storage,
+                rng=rng,
             )
 
     @classmethod
-    def from_words(cls, words: List[str]) -> "Language":
+    def from_words(
+        cls,
+        words: Sequence[str],
+        jobs: int = 1,
+        storage: StorageTypes = "list",
+        sample: Optional[int] = None,
+        seed: Optional[int] = None,
+        stratify: bool = False,
+        rng: Optional[random.Random] = None,
+    ) -> "Language":
+        stats = LexiconStatistics.from_sample(words, sample, seed, stratify, jobs)
+        return cls.from_statistics(stats, words, storage=storage, rng=rng)
+
+    @classmethod
+    def from_statistics(
+        cls,
+        stats: LexiconStatistics,
+        words: Sequence[str],
+        storage: StorageTypes = "list",
+        rng: Optional[random.Random] = None,
+    ) -> "Language":
         return cls(
-            phonotactics=Phonotactics.from_words(words),
-            phonology=Phonology.from_words(words),
+            phonotactics=Phonotactics.from_statistics(stats),
+            phonology=Phonology.from_statistics(stats),
             words=words,
+            storage=storage,
+            rng=rng,
         )
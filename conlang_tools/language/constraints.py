@@ -0,0 +1,202 @@
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    FrozenSet,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+import random
+from conlang_tools.language.lexicon import analyze_syllable, phoneme_table
+
+if TYPE_CHECKING:
+    from conlang_tools.language.classes import Language
+
+ElementTypes = Literal["onset", "nucleus", "coda"]
+
+
+class SegmentConstraint(NamedTuple):
+    syllable: int
+    element: ElementTypes
+    segments: FrozenSet[str]
+
+
+class WordConstraints(NamedTuple):
+    min_syllables: int = 1
+    max_syllables: Optional[int] = None
+    onset: Optional[str] = None
+    open_ending: Optional[bool] = None
+    contains: Optional[str] = None
+    stress: Optional[int] = None
+    segments: Tuple[SegmentConstraint, ...] = ()
+
+    def lengths(self) -> range:
+        longest = self.max_syllables if self.max_syllables is not None else 0
+        return range(self.min_syllables, max(longest, self.min_syllables) + 1)
+
+
+@lru_cache(maxsize=4096)
+def segment_phonemes(segment: str) -> FrozenSet[str]:
+    if segment == "":
+        return frozenset()
+    ids = analyze_syllable(segment).phonemes
+    return frozenset(phoneme_table[phoneme].symbol for phoneme in ids)
+
+
+class Slot(NamedTuple):
+    # One draw in building a word: an onset, a nucleus, or how a syllable
+    # ends ("" for an open syllable, otherwise its coda).
+    options: List[str]
+    weights: List[float]
+
+
+def build_slots(
+    lang: "Language", constraints: WordConstraints, num_syllables: int
+) -> Optional[List[Slot]]:
+    # Restricts each slot to what the constraints allow. Returns None if
+    # some slot is left with nothing to draw from.
+    allowed: Dict[Tuple[int, str], FrozenSet[str]] = {}
+    for constraint in constraints.segments:
+        index = constraint.syllable
+        index = index + num_syllables if index < 0 else index
+        if not 0 <= index < num_syllables:
+            return None
+        key = (index, constraint.element)
+        previous = allowed.get(key, constraint.segments)
+        allowed[key] = previous & constraint.segments
+    if constraints.onset is not None:
+        key = (0, "onset")
+        allowed[key] = allowed.get(key, frozenset([constraints.onset]))
+        allowed[key] &= frozenset([constraints.onset])
+
+    tactics = lang.phonotactics
+    openness = lang.phonology.openness
+    slots: List[Slot] = []
+    for index in range(num_syllables):
+        for element, weights in [
+            ("onset", tactics.onset),
+            ("nucleus", tactics.nucleus),
+        ]:
+            permitted = allowed.get((index, element))
+            options = [
+                key
+                for key, weight in weights.items()
+                if weight > 0 and (permitted is None or key in permitted)
+            ]
+            slots.append(Slot(options, [weights[key] for key in options]))
+
+        total = sum(weight for weight in tactics.coda.values() if weight > 0)
+        endings: Dict[str, float] = {"": openness} if openness > 0 else {}
+        for coda, weight in tactics.coda.items():
+            if weight > 0 and openness < 1:
+                p = (1 - openness) * weight / total
+                endings[coda] = endings.get(coda, 0) + p
+
+        permitted = allowed.get((index, "coda"))
+        if permitted is not None:
+            endings = {key: p for key, p in endings.items() if key and key in permitted}
+        if index == num_syllables - 1 and constraints.open_ending is not None:
+            endings = {
+                key: p
+                for key, p in endings.items()
+                if (key == "") == constraints.open_ending
+            }
+        slots.append(Slot(list(endings), list(endings.values())))
+
+    if any(sum(slot.weights) <= 0 for slot in slots):
+        return None
+    return slots
+
+
+def miss_chances(slots: List[Slot], phoneme: str) -> List[float]:
+    # misses[i] is the chance that none of slots i onward contains phoneme.
+    misses = [1.0] * (len(slots) + 1)
+    for index in range(len(slots) - 1, -1, -1):
+        slot = slots[index]
+        hit = sum(
+            weight
+            for option, weight in zip(slot.options, slot.weights)
+            if phoneme in segment_phonemes(option)
+        )
+        misses[index] = misses[index + 1] * (1 - hit / sum(slot.weights))
+    return misses
+
+
+def draw_slots(
+    slots: List[Slot], contains: Optional[str], rng: random.Random
+) -> List[str]:
+    # Without a phoneme to include, every slot is an independent draw. With
+    # one, each slot (until one includes it) is drawn conditioned on the
+    # rest of the word still being able to include it, so every word we
+    # draw has it, and with the same probability it would have had if we'd
+    # generated words freely and thrown away the ones without it.
+    misses = miss_chances(slots, contains) if contains is not None else None
+    satisfied = contains is None
+    chosen: List[str] = []
+    for index, slot in enumerate(slots):
+        options, weights = slot.options, slot.weights
+        if not satisfied and misses is not None:
+            total = sum(weights)
+            has = [contains in segment_phonemes(option) for option in options]
+            hit = sum(weight for weight, flag in zip(weights, has) if flag) / total
+            must_hit = hit / (1 - misses[index]) if misses[index] < 1 else 1
+            hits = rng.random() < must_hit
+            weights = [
+                weight if flag == hits else 0 for weight, flag in zip(weights, has)
+            ]
+            satisfied = hits
+        chosen.append(rng.choices(options, weights=weights)[0])
+    return chosen
+
+
+def generate_constrained(
+    lang: "Language", constraints: WordConstraints, rng: random.Random
+) -> str:
+    feasible: List[Tuple[int, List[Slot], Optional[int]]] = []
+    for num_syllables in constraints.lengths():
+        slots = build_slots(lang, constraints, num_syllables)
+        if slots is None:
+            continue
+        if constraints.contains is not None:
+            if miss_chances(slots, constraints.contains)[0] >= 1:
+                continue
+        stress = stress_position(lang, constraints, num_syllables)
+        if stress is False:
+            continue
+        feasible.append((num_syllables, slots, stress))
+
+    if not feasible:
+        raise ValueError("No words in this language satisfy those constraints.")
+    num_syllables, slots, stress = rng.choice(feasible)
+
+    chosen = draw_slots(slots, constraints.contains, rng)
+    syllables = ["".join(chosen[i : i + 3]) for i in range(0, len(chosen), 3)]
+    if num_syllables > 1:
+        if stress is None:
+            stress = lang.stress_index(syllables)
+        if stress is None:
+            stress = rng.randrange(num_syllables)
+        syllables[stress] = "ˈ" + syllables[stress]
+    return f"/{'.'.join(syllables)}/"
+
+
+def stress_position(
+    lang: "Language", constraints: WordConstraints, num_syllables: int
+) -> Optional[int] | Literal[False]:
+    # Where the constraints put the stress: None if they leave it to the
+    # language, or False if they ask for something the language can't do.
+    if constraints.stress is None or num_syllables < 2:
+        return None if constraints.stress in (None, 0, -num_syllables) else False
+    index = constraints.stress
+    index = index + num_syllables if index < 0 else index
+    if not 0 <= index < num_syllables:
+        return False
+    stress = lang.phonology.stress
+    if stress == "random":
+        return index
+    if stress == "heavy":
+        raise ValueError("Stress can't be constrained in a language with heavy stress.")
+    return index if lang.stress_index([""] * num_syllables) == index else False
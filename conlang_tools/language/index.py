@@ -0,0 +1,114 @@
+from collections import defaultdict
+from typing import Dict, List, Literal, Optional, Sequence, Set, Tuple
+from conlang_tools.language.lexicon import (
+    analyze_syllable,
+    phoneme_ids,
+    phoneme_table,
+    split_word,
+)
+from conlang_tools.phonemes.consonants import Consonant
+from conlang_tools.phonemes.phonemes import Phoneme
+from conlang_tools.phonemes.vowels import Vowel
+
+IndexPositions = Literal["any", "initial", "final", "intervocalic"]
+IndexKey = Tuple[int | str, IndexPositions]
+
+
+def phoneme_features(phoneme: Phoneme) -> List[str]:
+    if isinstance(phoneme, Consonant):
+        features = [
+            "consonant",
+            phoneme.manner.value,
+            phoneme.place.value,
+            phoneme.category,
+            "voiced" if phoneme.voiced else "voiceless",
+        ]
+        return features + ["sibilant"] if phoneme.is_sibilant() else features
+    elif isinstance(phoneme, Vowel):
+        return [
+            "vowel",
+            phoneme.openness.value,
+            phoneme.location.value,
+            "rounded" if phoneme.rounded else "unrounded",
+            "long" if phoneme.long else "short",
+        ]
+    return []
+
+
+features_by_id = [phoneme_features(phoneme) for phoneme in phoneme_table]
+vowel_ids = {i for i, phoneme in enumerate(phoneme_table) if isinstance(phoneme, Vowel)}
+
+
+def is_canonical(word: str) -> bool:
+    # A word is canonical if rebuilding its root would give back exactly the
+    # same string, so a sound change that doesn't touch it can skip it.
+    syllables = split_word(word)
+    multisyllabic = len(syllables) > 1
+    rebuilt: List[str] = []
+    for index, (unmarked, stressed) in enumerate(syllables):
+        if index > 0 and analyze_syllable(unmarked).nucleus is None:
+            return False
+        rebuilt.append(("ˈ" if stressed and multisyllabic else "") + unmarked)
+    return word == f"/{'.'.join(rebuilt)}/"
+
+
+class PhonemeIndex:
+    def __init__(self, words: Optional[Sequence[str]] = None):
+        self.entries: Dict[IndexKey, Set[int]] = defaultdict(set)
+        self.keys: Dict[int, Set[IndexKey]] = {}
+        self.irregular: Set[int] = set()
+        for index, word in enumerate(words if words is not None else []):
+            self.add(index, word)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, index: int, word: str) -> None:
+        ids = [
+            phoneme
+            for unmarked, _ in split_word(word)
+            for phoneme in analyze_syllable(unmarked).phonemes
+        ]
+
+        keys: Set[IndexKey] = set()
+        for position, phoneme in enumerate(ids):
+            positions: List[IndexPositions] = ["any"]
+            if position == 0:
+                positions.append("initial")
+            if position == len(ids) - 1:
+                positions.append("final")
+            if 0 < position < len(ids) - 1:
+                if ids[position - 1] in vowel_ids and ids[position + 1] in vowel_ids:
+                    positions.append("intervocalic")
+
+            for key in [phoneme] + features_by_id[phoneme]:
+                keys.update((key, where) for where in positions)
+
+        for key in keys:
+            self.entries[key].add(index)
+        self.keys[index] = keys
+        if not is_canonical(word):
+            self.irregular.add(index)
+
+    def extend(self, words: Sequence[str], start: int = 0) -> None:
+        for offset, word in enumerate(words):
+            self.add(start + offset, word)
+
+    def remove(self, index: int) -> None:
+        for key in self.keys.pop(index, set()):
+            self.entries[key].discard(index)
+        self.irregular.discard(index)
+
+    def update(self, index: int, word: str) -> None:
+        self.remove(index)
+        self.add(index, word)
+
+    def with_phoneme(
+        self, phoneme: int | str | Phoneme, position: IndexPositions = "any"
+    ) -> Set[int]:
+        symbol = phoneme.symbol if isinstance(phoneme, Phoneme) else phoneme
+        key = phoneme_ids.get(symbol) if isinstance(symbol, str) else symbol
+        return set(self.entries.get((key, position), set()))
+
+    def with_feature(self, feature: str, position: IndexPositions = "any") -> Set[int]:
+        return set(self.entries.get((feature, position), set()))
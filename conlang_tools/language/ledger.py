@@ -0,0 +1,78 @@
+import os
+import sqlite3
+from typing import Iterable, Iterator, List, Optional
+
+
+def ledger_path(name: str, directory: str = "languages/") -> str:
+    return os.path.join(directory, f"{name}.ledger.db")
+
+
+class Ledger:
+    # Every word we've ever generated for a language, kept on disk so that
+    # later runs don't give us the same words again. Words live in an
+    # indexed SQLite table, so checking one stays fast however many there
+    # are, and new ones are committed in batches rather than one at a time.
+    def __init__(self, path: str = ":memory:", batch_size: int = 10_000):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS words (word TEXT PRIMARY KEY) WITHOUT ROWID"
+        )
+        self.connection.commit()
+        # Counted once here and kept up to date as words go in, so asking
+        # how many there are doesn't scan the whole table.
+        self.count = self.connection.execute("SELECT COUNT(*) FROM words").fetchone()[0]
+
+    def __enter__(self) -> "Ledger":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, word: str) -> bool:
+        query = "SELECT 1 FROM words WHERE word = ?"
+        return self.connection.execute(query, (word,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        # In sorted order, a row at a time, so we never hold them all.
+        cursor = self.connection.execute("SELECT word FROM words ORDER BY word")
+        for (word,) in cursor:
+            yield word
+
+    def add(self, word: str) -> None:
+        query = "INSERT OR IGNORE INTO words VALUES (?)"
+        self.count += self.connection.execute(query, (word,)).rowcount
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.commit()
+
+    def update(self, words: Iterable[str]) -> None:
+        cursor = self.connection.executemany(
+            "INSERT OR IGNORE INTO words VALUES (?)", ((word,) for word in words)
+        )
+        self.count += cursor.rowcount
+        self.commit()
+
+    def list(self, limit: Optional[int] = None) -> List[str]:
+        if limit is None:
+            return list(self)
+        query = "SELECT word FROM words ORDER BY word LIMIT ?"
+        return [word for (word,) in self.connection.execute(query, (limit,))]
+
+    def reset(self) -> None:
+        self.connection.execute("DELETE FROM words")
+        self.count = 0
+        self.commit()
+
+    def commit(self) -> None:
+        self.connection.commit()
+        self.pending = 0
+
+    def close(self) -> None:
+        self.commit()
+        self.connection.close()
@@ -0,0 +1,210 @@
+from array import array
+from functools import lru_cache
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    overload,
+)
+import numpy as np
+from conlang_tools.phonemes.collections import get_phonemes
+from conlang_tools.phonemes.consonants import Consonant
+from conlang_tools.phonemes.roots import Syllable
+from conlang_tools.phonemes.vowels import Vowel
+
+phoneme_table = get_phonemes()
+phoneme_ids = {phoneme.symbol: index for index, phoneme in enumerate(phoneme_table)}
+markings = str.maketrans("", "", "ˈ.")
+
+
+class SyllableAnalysis(NamedTuple):
+    phonemes: Tuple[int, ...]
+    onset: Optional[str]
+    nucleus: Optional[str]
+    coda: Optional[str]
+    open: bool
+    weight: int
+
+
+@lru_cache(maxsize=65536)
+def analyze_syllable(unmarked: str) -> SyllableAnalysis:
+    syllable = Syllable(unmarked)
+    phonemes = syllable.phonemes
+    long = any(isinstance(p, Vowel) and p.long is True for p in phonemes)
+    closed = len(phonemes) > 0 and isinstance(phonemes[-1], Consonant)
+    return SyllableAnalysis(
+        phonemes=tuple(phoneme_ids[p.symbol] for p in phonemes),
+        onset=syllable.onset,
+        nucleus=syllable.nucleus,
+        coda=syllable.coda,
+        open=syllable.is_open(),
+        weight=long + closed,
+    )
+
+
+def split_word(word: str) -> List[Tuple[str, bool]]:
+    # Mirrors how Root and Syllable read a word, so that an encoded lexicon
+    # always agrees with an analysis of the same words through Root.
+    syllables: List[Tuple[str, bool]] = []
+    for ipa in word.strip("/[]").split("."):
+        unbracketed = ipa.strip("/[]")
+        syllables.append((unbracketed.translate(markings), unbracketed.startswith("ˈ")))
+    return syllables
+
+
+class EncodedLexicon:
+    def __init__(self, words: Optional[List[str]] = None):
+        self.segments: List[str] = []
+        self.segment_ids: Dict[str, int] = {}
+
+        phonemes: List[int] = []
+        syllable_offsets = [0]
+        word_offsets = [0]
+        stressed: List[bool] = []
+        onset: List[int] = []
+        nucleus: List[int] = []
+        coda: List[int] = []
+        open_syllables: List[bool] = []
+        weight: List[int] = []
+
+        for word in words if words is not None else []:
+            for unmarked, is_stressed in split_word(word):
+                analysis = analyze_syllable(unmarked)
+                phonemes.extend(analysis.phonemes)
+                syllable_offsets.append(len(phonemes))
+                stressed.append(is_stressed)
+                onset.append(self.segment_id(analysis.onset))
+                nucleus.append(self.segment_id(analysis.nucleus))
+                coda.append(self.segment_id(analysis.coda))
+                open_syllables.append(analysis.open)
+                weight.append(analysis.weight)
+            word_offsets.append(len(stressed))
+
+        self.phonemes = np.array(phonemes, dtype=np.uint8)
+        self.syllable_offsets = np.array(syllable_offsets, dtype=np.int64)
+        self.word_offsets = np.array(word_offsets, dtype=np.int64)
+        self.stressed = np.array(stressed, dtype=bool)
+        self.onset = np.array(onset, dtype=np.int32)
+        self.nucleus = np.array(nucleus, dtype=np.int32)
+        self.coda = np.array(coda, dtype=np.int32)
+        self.open = np.array(open_syllables, dtype=bool)
+        self.weight = np.array(weight, dtype=np.int8)
+
+    def __len__(self) -> int:
+        return len(self.word_offsets) - 1
+
+    @property
+    def syllable_counts(self) -> np.ndarray:
+        return np.diff(self.word_offsets)
+
+    def segment_id(self, segment: Optional[str]) -> int:
+        if segment is None:
+            return -1
+        if segment not in self.segment_ids:
+            self.segment_ids[segment] = len(self.segments)
+            self.segments.append(segment)
+        return self.segment_ids[segment]
+
+    def element(self, element: str = "nucleus") -> np.ndarray:
+        if element == "onset":
+            return self.onset
+        elif element == "coda":
+            return self.coda
+        else:
+            return self.nucleus
+
+
+class Lexicon(Sequence[str]):
+    def __init__(self, words: Optional[Iterable[str]] = None):
+        self.phonemes = array("B")
+        self.syllable_offsets = array("I", [0])
+        self.word_offsets = array("I", [0])
+        self.stressed = array("B")
+        self.exceptions: Dict[int, str] = {}
+        self.extend(words if words is not None else [])
+
+    def __len__(self) -> int:
+        return len(self.word_offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | List[str]:
+        if isinstance(index, slice):
+            return [self.decode(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Lexicon index out of range")
+        return self.decode(index)
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self.decode(index)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"Lexicon({list(self)!r})"
+
+    @property
+    def nbytes(self) -> int:
+        buffers = [self.phonemes, self.syllable_offsets, self.word_offsets]
+        buffers.append(self.stressed)
+        arrays = sum(len(buffer) * buffer.itemsize for buffer in buffers)
+        return arrays + sum(len(word) for word in self.exceptions.values())
+
+    def append(self, word: str) -> None:
+        syllables = split_word(word)
+        try:
+            analyses = [analyze_syllable(unmarked) for unmarked, _ in syllables]
+        except ValueError:
+            analyses = None
+
+        # We only encode words that we can spell back exactly; anything else
+        # is kept as it was given to us.
+        pieces = [
+            ("ˈ" if stressed else "") + unmarked for unmarked, stressed in syllables
+        ]
+        if analyses is None or word != f"/{'.'.join(pieces)}/":
+            self.exceptions[len(self)] = word
+            self.word_offsets.append(self.word_offsets[-1])
+            return
+
+        for analysis, (_, stressed) in zip(analyses, syllables):
+            self.phonemes.extend(analysis.phonemes)
+            self.syllable_offsets.append(len(self.phonemes))
+            self.stressed.append(stressed)
+        self.word_offsets.append(len(self.stressed))
+
+    def extend(self, words: Iterable[str]) -> None:
+        for word in words:
+            self.append(word)
+
+    def decode(self, index: int) -> str:
+        if index in self.exceptions:
+            return self.exceptions[index]
+
+        pieces: List[str] = []
+        for syllable in range(self.word_offsets[index], self.word_offsets[index + 1]):
+            start = self.syllable_offsets[syllable]
+            end = self.syllable_offsets[syllable + 1]
+            spelling = spell(self.phonemes[start:end].tobytes())
+            pieces.append("ˈ" + spelling if self.stressed[syllable] else spelling)
+        return f"/{'.'.join(pieces)}/"
+
+
+@lru_cache(maxsize=65536)
+def spell(phonemes: bytes) -> str:
+    return "".join(phoneme_table[phoneme].symbol for phoneme in phonemes)
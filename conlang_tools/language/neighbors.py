@@ -0,0 +1,126 @@
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Set
+from conlang_tools.language.lexicon import analyze_syllable, split_word
+
+
+@lru_cache(maxsize=65536)
+def phoneme_key(word: str) -> Optional[bytes]:
+    # A word's phonemes, one byte each, leaving out stress and syllable
+    # breaks, or None if we can't read it.
+    try:
+        return bytes(
+            phoneme
+            for unmarked, _ in split_word(word)
+            for phoneme in analyze_syllable(unmarked).phonemes
+        )
+    except ValueError:
+        return None
+
+
+def deletions(key: bytes, depth: int) -> Set[bytes]:
+    # Every string we can get by deleting up to depth phonemes from key.
+    variants = {key}
+    for count in range(1, min(depth, len(key)) + 1):
+        for removed in combinations(range(len(key)), count):
+            variants.add(bytes(p for i, p in enumerate(key) if i not in removed))
+    return variants
+
+
+def bounded_distance(a: bytes, b: bytes, limit: int) -> int:
+    # Edit distance between a and b, except that we stop as soon as we know
+    # it's more than limit and return limit + 1.
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, item_a in enumerate(a, start=1):
+        current = [i]
+        for j, item_b in enumerate(b, start=1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (item_a != item_b),
+                )
+            )
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
+class NeighborIndex:
+    # Finds words within radius phonemes (by edit distance) of a given word.
+    # If two words are that close, deleting at most radius phonemes from
+    # each gives the same string, so we file every word under each string we
+    # can get that way, and a search only has to look up the query's own
+    # deletions and check the handful of words filed under them.
+    def __init__(self, radius: int = 1, words: Iterable[str] = ()):
+        if radius < 0:
+            raise ValueError("A neighbor index's radius can't be negative.")
+        self.radius = radius
+        self.keys: List[bytes] = []
+        self.ids: Dict[bytes, int] = {}
+        self.variants: Dict[bytes, int | List[int]] = {}
+        self.update(words)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, word: str) -> bool:
+        key = phoneme_key(word)
+        return key is not None and key in self.ids
+
+    def add(self, word: str) -> None:
+        key = phoneme_key(word)
+        if key is None or key in self.ids:
+            return
+        index = len(self.keys)
+        self.keys.append(key)
+        self.ids[key] = index
+        # Most variants only ever belong to one word, so we store a bare id
+        # until there's a second.
+        for variant in deletions(key, self.radius):
+            filed = self.variants.get(variant)
+            if filed is None:
+                self.variants[variant] = index
+            elif isinstance(filed, int):
+                self.variants[variant] = [filed, index]
+            else:
+                filed.append(index)
+
+    def update(self, words: Iterable[str]) -> None:
+        for word in words:
+            self.add(word)
+
+    def candidates(self, key: bytes) -> Set[int]:
+        found: Set[int] = set()
+        for variant in deletions(key, self.radius):
+            filed = self.variants.get(variant)
+            if isinstance(filed, int):
+                found.add(filed)
+            elif filed is not None:
+                found.update(filed)
+        return found
+
+    def near(self, word: str) -> bool:
+        key = phoneme_key(word)
+        if key is None:
+            return False
+        if key in self.ids:
+            return True
+        return any(
+            bounded_distance(key, self.keys[index], self.radius) <= self.radius
+            for index in self.candidates(key)
+        )
+
+    def neighbors(self, word: str) -> List[bytes]:
+        key = phoneme_key(word)
+        if key is None:
+            return []
+        found = [
+            self.keys[index]
+            for index in self.candidates(key)
+            if bounded_distance(key, self.keys[index], self.radius) <= self.radius
+        ]
+        return sorted(found)
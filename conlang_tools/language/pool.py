@@ -0,0 +1,122 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional
+import random
+from conlang_tools.language.batch import cached_weight
+from conlang_tools.language.lexicon import analyze_syllable, phoneme_table
+from conlang_tools.phonemes.consonants import Consonant
+from conlang_tools.phonemes.vowels import Vowel
+from conlang_tools.utils.classes import WeightedSampler
+
+if TYPE_CHECKING:
+    from conlang_tools.language.classes import Language
+
+# Past this many onset, nucleus and coda combinations, we don't build a
+# pool, and generate syllables a segment at a time instead.
+pool_limit = 10_000
+
+
+def normalize(weights: Dict[str, int]) -> Dict[str, float]:
+    total = sum(weight for weight in weights.values() if weight > 0)
+    return {key: weight / total for key, weight in weights.items() if weight > 0}
+
+
+def count_combinations(lang: "Language") -> int:
+    tactics = lang.phonotactics
+    return len(tactics.onset) * len(tactics.nucleus) * (len(tactics.coda) + 1)
+
+
+class SegmentFacts(NamedTuple):
+    long: bool
+    # Whether the segment ends in a consonant, or None if it's empty.
+    closed: Optional[bool]
+
+
+@lru_cache(maxsize=4096)
+def segment_facts(segment: str) -> Optional[SegmentFacts]:
+    # What a segment adds to a syllable's weight, or None if we can't read
+    # it (in which case we can still generate it, just not weigh it).
+    if segment == "":
+        return SegmentFacts(long=False, closed=None)
+    try:
+        phonemes = [phoneme_table[i] for i in analyze_syllable(segment).phonemes]
+    except ValueError:
+        return None
+    return SegmentFacts(
+        long=any(isinstance(p, Vowel) and p.long is True for p in phonemes),
+        closed=isinstance(phonemes[-1], Consonant) if phonemes else None,
+    )
+
+
+def combine_weight(segments: List[str]) -> Optional[int]:
+    # A syllable is one heavier for a long vowel, and one for ending in a
+    # consonant, just as weigh_syllable has it, but from facts about each
+    # segment, so we parse each segment once rather than every syllable.
+    facts: List[SegmentFacts] = []
+    for segment in segments:
+        fact = segment_facts(segment)
+        if fact is None:
+            return None
+        facts.append(fact)
+    ends = [fact.closed for fact in facts if fact.closed is not None]
+    if not ends:
+        return None
+    return any(fact.long for fact in facts) + ends[-1]
+
+
+class SyllablePool:
+    def __init__(self, lang: "Language", weigh: Optional[bool] = None):
+        # Every distinct syllable the language could generate, with the
+        # probability that generate_syllable produces it and whether it's
+        # open, so that generating a syllable is one draw. Weights are only
+        # worked out if we'll need them, which by default means the
+        # language stresses heavy syllables.
+        weigh = lang.phonology.stress == "heavy" if weigh is None else weigh
+        weights: Dict[str, Optional[int]] = {}
+        openness = lang.phonology.openness
+        onsets = normalize(lang.phonotactics.onset)
+        nuclei = normalize(lang.phonotactics.nucleus)
+        codas = normalize(lang.phonotactics.coda)
+        odds: Dict[str, float] = {}
+        is_open: Dict[str, bool] = {}
+        for onset, p_onset in onsets.items():
+            for nucleus, p_nucleus in nuclei.items():
+                core = onset + nucleus
+                odds[core] = odds.get(core, 0) + openness * p_onset * p_nucleus
+                is_open.setdefault(core, True)
+                if weigh:
+                    weights.setdefault(core, combine_weight([onset, nucleus]))
+                for coda, p_coda in codas.items():
+                    closed = core + coda
+                    p_closed = (1 - openness) * p_onset * p_nucleus * p_coda
+                    odds[closed] = odds.get(closed, 0) + p_closed
+                    is_open.setdefault(closed, coda == "")
+                    if weigh:
+                        segments = [onset, nucleus, coda]
+                        weights.setdefault(closed, combine_weight(segments))
+
+        total = sum(odds.values())
+        self.syllables: List[str] = [key for key, value in odds.items() if value > 0]
+        self.probabilities = [odds[syllable] / total for syllable in self.syllables]
+        self.ids = {syllable: i for i, syllable in enumerate(self.syllables)}
+        self.weights: Optional[List[Optional[int]]] = (
+            [weights[syllable] for syllable in self.syllables] if weigh else None
+        )
+        self.open = [is_open[syllable] for syllable in self.syllables]
+        self.sampler = WeightedSampler(dict(zip(self.syllables, self.probabilities)))
+
+    def __len__(self) -> int:
+        return len(self.syllables)
+
+    def sample(self, rng: Optional[random.Random] = None) -> str:
+        return self.sampler.sample(rng)
+
+    def weigh(self, syllables: List[str]) -> List[int]:
+        # Anything we couldn't weigh from its segments is weighed the slow
+        # way, which raises if it can't be read at all.
+        if self.weights is None:
+            return [cached_weight(syllable) for syllable in syllables]
+        found = [self.weights[self.ids[syllable]] for syllable in syllables]
+        return [
+            weight if weight is not None else cached_weight(syllable)
+            for weight, syllable in zip(found, syllables)
+        ]
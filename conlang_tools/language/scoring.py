@@ -0,0 +1,47 @@
+from typing import TYPE_CHECKING, Dict, List, Sequence
+import numpy as np
+from conlang_tools.language.lexicon import EncodedLexicon
+
+if TYPE_CHECKING:
+    from conlang_tools.language.classes import Language
+
+
+def log_odds(weights: Dict[str, int], segments: List[str]) -> np.ndarray:
+    # The log-probability of drawing each of a lexicon's segments from
+    # weights, with one more entry at the end for a syllable without one
+    # (since EncodedLexicon marks those -1), which only an empty segment
+    # in weights can give us. Anything we could never draw is -inf.
+    total = sum(weight for weight in weights.values() if weight > 0)
+    odds = np.full(len(segments) + 1, -np.inf)
+    if total <= 0:
+        return odds
+    for index, segment in enumerate(segments + [""]):
+        weight = weights.get(segment, 0)
+        if weight > 0:
+            odds[index] = np.log(weight / total)
+    return odds
+
+
+def score_lexicon(lang: "Language", lexicon: EncodedLexicon) -> np.ndarray:
+    # How likely the language is to generate each word, syllable by
+    # syllable: its onset, its nucleus, and either staying open or closing
+    # with its coda. Stress isn't counted.
+    if len(lexicon) < 1:
+        return np.zeros(0)
+    tactics = lang.phonotactics
+    openness = lang.phonology.openness
+    segments = lexicon.segments
+    onset = log_odds(tactics.onset, segments)[lexicon.onset]
+    nucleus = log_odds(tactics.nucleus, segments)[lexicon.nucleus]
+    coda = log_odds(tactics.coda, segments)[lexicon.coda]
+
+    with np.errstate(divide="ignore"):
+        stays_open = np.log(openness)
+        closes = np.log(1 - openness)
+    ending = np.where(lexicon.open, stays_open, closes + coda)
+    syllables = onset + nucleus + ending
+    return np.add.reduceat(syllables, lexicon.word_offsets[:-1])
+
+
+def score_words(lang: "Language", words: Sequence[str]) -> np.ndarray:
+    return score_lexicon(lang, EncodedLexicon(list(words)))
@@ -0,0 +1,57 @@
+from typing import Dict
+import numpy as np
+from conlang_tools.language.lexicon import EncodedLexicon
+
+
+def measure_openness(lexicon: EncodedLexicon) -> float:
+    total = len(lexicon.open)
+    return int(np.count_nonzero(lexicon.open)) / total if total else 0
+
+
+def count_syllables(lexicon: EncodedLexicon) -> Dict[int, int]:
+    counts = np.bincount(lexicon.syllable_counts)
+    lengths = np.flatnonzero(counts)
+    return {int(length): int(counts[length]) for length in lengths}
+
+
+def count_segments(lexicon: EncodedLexicon, element: str = "nucleus") -> Dict[str, int]:
+    ids = lexicon.element(element)
+    ids = ids[ids >= 0]
+    if len(ids) < 1:
+        return {}
+
+    # Report segments in the order they first appear, like a Counter would.
+    unique, first, counts = np.unique(ids, return_index=True, return_counts=True)
+    order = np.argsort(first)
+    return {lexicon.segments[unique[index]]: int(counts[index]) for index in order}
+
+
+def count_stress_positions(lexicon: EncodedLexicon) -> Dict[str, int]:
+    polled = ["initial", "final", "penultimate", "antepenultimate", "heavy"]
+    if len(lexicon) < 1:
+        return {stress_type: 0 for stress_type in polled}
+
+    counts = lexicon.syllable_counts
+    starts = lexicon.word_offsets[:-1]
+    last = starts + counts - 1
+
+    # Monosyllables count as stressed whether or not they're marked.
+    stressed = lexicon.stressed | np.repeat(counts < 2, counts)
+    heaviest = np.repeat(np.maximum.reduceat(lexicon.weight, starts), counts)
+    light_stressed = stressed & (lexicon.weight < heaviest)
+
+    positions = {
+        "initial": stressed[starts],
+        "final": stressed[last],
+        "penultimate": stressed[np.maximum(last - 1, starts)],
+        "antepenultimate": stressed[np.maximum(last - 2, starts)],
+        "heavy": ~np.logical_or.reduceat(light_stressed, starts),
+    }
+    return {key: int(np.count_nonzero(positions[key])) for key in polled}
+
+
+def count_open_per_word(lexicon: EncodedLexicon) -> np.ndarray:
+    if len(lexicon) < 1:
+        return np.zeros(0, dtype=np.int64)
+    starts = lexicon.word_offsets[:-1]
+    return np.add.reduceat(lexicon.open.astype(np.int64), starts)
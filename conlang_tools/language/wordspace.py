@@ -0,0 +1,342 @@
+from bisect import bisect_right, insort
+from heapq import heappop, heappush
+from itertools import accumulate, chain
+from math import prod
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+import random
+from conlang_tools.language.ledger import Ledger
+from conlang_tools.language.pool import SyllablePool
+from conlang_tools.utils.classes import Snapshot, appended, snapshot
+
+if TYPE_CHECKING:
+    from conlang_tools.language.classes import Language
+
+Digits = Tuple[int, ...]
+
+# Languages only keep track of how full a number of syllables is once
+# they've used at least this fraction of the words it could hold.
+tracking_threshold = 0.1
+
+# Generation keeps making random attempts until less than this much of a
+# length's probability mass is free, then draws from the unused words.
+drawing_threshold = 0.1
+
+
+class Saturation(NamedTuple):
+    size: int
+    used: int
+    # The chance that a word generated at random isn't one of the used ones.
+    free: float
+
+    @property
+    def full(self) -> bool:
+        return self.used >= self.size
+
+
+class WordSpace:
+    def __init__(self, lang: "Language", num_syllables: int = 1):
+        if num_syllables < 1:
+            raise ValueError("A word needs at least one syllable.")
+        self.lang = lang
+        self.num_syllables = num_syllables
+
+        # Every distinct syllable the language could generate. We need them
+        # all, even if there are too many for the language to keep a pool.
+        pool = lang.syllable_pool() or SyllablePool(lang)
+        self.syllables = pool.syllables
+        self.probabilities = pool.probabilities
+        self.syllable_ids = pool.ids
+        self.pool = pool
+
+        # A word is a row of digits: one per syllable, then one for which
+        # syllable carries the stress if the language stresses at random.
+        random_stress = lang.phonology.stress == "random" and num_syllables > 1
+        self.stress_choices = num_syllables if random_stress else 1
+        self.bases = [len(self.syllables)] * num_syllables
+        self.digit_odds = [self.probabilities] * num_syllables
+        if random_stress:
+            self.bases.append(num_syllables)
+            self.digit_odds.append([1 / num_syllables] * num_syllables)
+        self.cumulative = [[0.0, *accumulate(odds)] for odds in self.digit_odds]
+
+        self.used: List[int] = []
+        self.used_set: Set[int] = set()
+        self.used_counts: Dict[Digits, int] = {}
+        self.used_masses: Dict[Digits, float] = {}
+        # For every prefix with a used word below it, a sparse Fenwick tree
+        # of the used mass under each of its digits, so draw_weighted can
+        # find a digit without looking at every one.
+        self.used_trees: Dict[Digits, Dict[int, float]] = {}
+        self.used_mass = 0.0
+        self._source: Tuple[
+            Optional[Snapshot], Optional[Snapshot], Optional[Ledger]
+        ] = (None, None, None)
+        self.sync()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, word: str) -> bool:
+        return self.parse(word) is not None
+
+    @property
+    def size(self) -> int:
+        return prod(self.bases) if self.syllables else 0
+
+    @property
+    def remaining(self) -> int:
+        self.sync()
+        return self.size - len(self.used)
+
+    def saturation(self) -> Saturation:
+        self.sync()
+        free = max(1 - self.used_mass, 0) if self.remaining > 0 else 0
+        return Saturation(size=self.size, used=len(self.used), free=free)
+
+    def capacity(self, depth: int) -> int:
+        # How many words share any one prefix of this many digits.
+        return prod(self.bases[depth:])
+
+    def digits(self, index: int) -> Digits:
+        digits: List[int] = []
+        for base in reversed(self.bases):
+            index, digit = divmod(index, base)
+            digits.append(digit)
+        return tuple(reversed(digits))
+
+    def index(self, digits: Digits) -> int:
+        index = 0
+        for base, digit in zip(self.bases, digits):
+            index = index * base + digit
+        return index
+
+    def spell(self, digits: Digits) -> str:
+        syllables = [self.syllables[digit] for digit in digits[: self.num_syllables]]
+        if self.num_syllables > 1:
+            stress = self.stress_position(digits)
+            syllables[stress] = "ˈ" + syllables[stress]
+        return f"/{'.'.join(syllables)}/"
+
+    def stress_position(self, digits: Digits) -> int:
+        if self.stress_choices > 1:
+            return digits[-1]
+        syllables = [self.syllables[digit] for digit in digits[: self.num_syllables]]
+        heavy = self.lang.phonology.stress == "heavy"
+        weights = self.pool.weigh(syllables) if heavy else None
+        index = self.lang.stress_index(syllables, weights)
+        return index if index is not None else 0
+
+    def parse(self, word: str) -> Optional[Digits]:
+        pieces = word.strip("/").split(".")
+        if len(pieces) != self.num_syllables:
+            return None
+
+        digits: List[int] = []
+        stressed: List[int] = []
+        for position, piece in enumerate(pieces):
+            if piece.startswith("ˈ"):
+                stressed.append(position)
+                piece = piece[1:]
+            if piece not in self.syllable_ids:
+                return None
+            digits.append(self.syllable_ids[piece])
+
+        if self.num_syllables < 2:
+            return tuple(digits) if not stressed else None
+        if len(stressed) != 1:
+            return None
+        if self.stress_choices > 1:
+            return tuple(digits + stressed)
+        expected = self.stress_position(tuple(digits))
+        return tuple(digits) if stressed[0] == expected else None
+
+    def weight(self, digits: Digits) -> float:
+        return prod(odds[digit] for odds, digit in zip(self.digit_odds, digits))
+
+    def mark(self, word: str) -> bool:
+        digits = self.parse(word)
+        if digits is None:
+            return False
+        index = self.index(digits)
+        if index in self.used_set:
+            return False
+
+        self.used_set.add(index)
+        insort(self.used, index)
+        weight = self.weight(digits)
+        self.used_mass += weight
+        for depth in range(1, len(digits) + 1):
+            prefix = digits[:depth]
+            self.used_counts[prefix] = self.used_counts.get(prefix, 0) + 1
+            self.used_masses[prefix] = self.used_masses.get(prefix, 0) + weight
+            tree = self.used_trees.setdefault(digits[: depth - 1], {})
+            node = digits[depth - 1] + 1
+            while node <= self.bases[depth - 1]:
+                tree[node] = tree.get(node, 0) + weight
+                node += node & -node
+        return True
+
+    def sync(self) -> None:
+        # Keep up with the words and generated lists of the language, the
+        # same way Language.known does, and with its ledger. Words go into
+        # the ledger as they're claimed, and claiming marks them here too,
+        # so we only need to read the ledger when we start over.
+        words, generated = self.lang.words, self.lang.generated
+        ledger = self.lang.ledger
+        source = self._source
+        new_words = appended(words, source[0])
+        new_generated = appended(generated, source[1])
+        if new_words is None or new_generated is None or source[2] is not ledger:
+            self.used, self.used_set = [], set()
+            self.used_counts, self.used_masses = {}, {}
+            self.used_trees = {}
+            self.used_mass = 0.0
+            marking = chain(words, generated, ledger if ledger is not None else [])
+        else:
+            marking = chain(new_words, new_generated)
+        for word in marking:
+            self.mark(word)
+        self._source = (snapshot(words), snapshot(generated), ledger)
+
+    def nth_unused(self, rank: int) -> int:
+        # The index of the rank-th unused word, skipping over used indices.
+        index = rank
+        while True:
+            shifted = rank + bisect_right(self.used, index)
+            if shifted == index:
+                return index
+            index = shifted
+
+    def draw_uniform(self, rng: Optional[random.Random] = None) -> Digits:
+        rank = (rng or self.lang.rng).randrange(self.size - len(self.used))
+        return self.digits(self.nth_unused(rank))
+
+    def draw_weighted(self, rng: Optional[random.Random] = None) -> Digits:
+        # Walk down the digits, choosing each in proportion to the mass of
+        # unused words below it, so we never land on a used word.
+        rng = rng or self.lang.rng
+        prefix: Digits = ()
+        mass = 1.0
+        for odds in self.digit_odds:
+            digit = self.find_digit(prefix, mass, rng)
+            if digit is None:
+                digit = self.scan_digit(prefix, mass, rng)
+            prefix += (digit,)
+            mass *= odds[digit]
+        return prefix
+
+    def find_digit(
+        self, prefix: Digits, mass: float, rng: random.Random
+    ) -> Optional[int]:
+        # Pick a point in the unused mass under prefix, then descend its
+        # Fenwick tree to the digit it falls under, which costs one step per
+        # power of two in the base. None if rounding leaves us nowhere
+        # sensible to land, so draw_weighted can fall back on scan_digit.
+        depth = len(prefix)
+        base, cumulative = self.bases[depth], self.cumulative[depth]
+        tree = self.used_trees.get(prefix, {})
+        used = self.used_masses.get(prefix, 0) if prefix else self.used_mass
+        free = mass * cumulative[base] - used
+        if free <= 0:
+            return None
+        point = rng.random() * free
+        position = 0
+        step = 1 << base.bit_length()
+        while step:
+            following = position + step
+            if following <= base:
+                width = mass * (cumulative[following] - cumulative[position])
+                width -= tree.get(following, 0)
+                if width <= point:
+                    position = following
+                    point -= width
+            step >>= 1
+        if position >= base:
+            return None
+        child = prefix + (position,)
+        if self.used_counts.get(child, 0) >= self.capacity(depth + 1):
+            return None
+        return position
+
+    def scan_digit(self, prefix: Digits, mass: float, rng: random.Random) -> int:
+        # The slow way, weighing every digit in turn, for when rounding has
+        # left the unused mass too small to trust.
+        depth = len(prefix)
+        capacity = self.capacity(depth + 1)
+        options: List[int] = []
+        masses: List[float] = []
+        counts: List[int] = []
+        for digit, p in enumerate(self.digit_odds[depth]):
+            child = prefix + (digit,)
+            used = self.used_counts.get(child, 0)
+            if used >= capacity:
+                continue
+            options.append(digit)
+            masses.append(max(mass * p - self.used_masses.get(child, 0), 0))
+            counts.append(capacity - used)
+
+        # Nearly exhausted branches can have no mass at all; fall back on
+        # how many words they have left.
+        weights = masses if sum(masses) > 0 else counts
+        return rng.choices(options, weights=weights)[0]
+
+    def best_first(self) -> Iterator[Digits]:
+        # Every word in the space, most likely first, without listing them
+        # all. Each digit's options are ranked from most to least likely,
+        # so a row of ranks is never likelier than the one before it in any
+        # position. Starting from all zeros, we pop the likeliest row on the
+        # heap and push the rows one rank further along at its pivot or any
+        # later position, which reaches every row exactly once.
+        if self.size < 1:
+            return
+        orders = [
+            sorted(range(len(odds)), key=lambda digit: -odds[digit])
+            for odds in self.digit_odds
+        ]
+
+        def push(heap: List, ranks: Tuple[int, ...], pivot: int) -> None:
+            digits = tuple(order[rank] for order, rank in zip(orders, ranks))
+            heappush(heap, (-self.weight(digits), ranks, pivot, digits))
+
+        heap: List[Tuple[float, Tuple[int, ...], int, Digits]] = []
+        push(heap, (0,) * len(self.bases), 0)
+        while heap:
+            _, ranks, pivot, digits = heappop(heap)
+            yield digits
+            for position in range(pivot, len(ranks)):
+                if ranks[position] + 1 < self.bases[position]:
+                    following = list(ranks)
+                    following[position] += 1
+                    push(heap, tuple(following), position)
+
+    def sample(
+        self, weighted: bool = False, rng: Optional[random.Random] = None
+    ) -> str:
+        if self.remaining < 1:
+            raise ValueError(
+                f"There are no unused words with {self.num_syllables} syllables."
+            )
+        digits = self.draw_weighted(rng) if weighted else self.draw_uniform(rng)
+        word = self.spell(digits)
+        self.lang.generated.append(word)
+        self.sync()
+        return word
+
+    def sample_many(
+        self,
+        num_words: int,
+        weighted: bool = False,
+        rng: Optional[random.Random] = None,
+    ) -> List[str]:
+        return [
+            self.sample(weighted, rng) for _ in range(min(num_words, self.remaining))
+        ]
@@ -1,4 +1,4 @@
-from typing import Callable, Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
 import random
 from conlang_tools.language.classes import Language
 from conlang_tools.phonemes.collections import (
@@ -14,28 +14,53 @@ from conlang_tools.phonemes.consonants import (
 from conlang_tools.phonemes.vowels import Vowel
 from conlang_tools.phonemes.phonemes import Phoneme
 from conlang_tools.phonemes.roots import Root
-from conlang_tools.utils.methods import oxford_comma, get_choices
+from conlang_tools.utils.classes import WeightedSampler
+from conlang_tools.utils.methods import oxford_comma
 
 
 def apply_change(
-    lang: Language, evaluator: Callable, transformer: Callable
+    lang: Language,
+    evaluator: Callable,
+    transformer: Callable,
+    candidates: Optional[Set[int]] = None,
 ) -> List[str]:
-    new_words: List[str] = []
-    for original in lang.words:
-        root = Root(original)
+    def change_root(root: Root) -> None:
         for si, syllable in enumerate(root.syllables):
             for pi, phoneme in enumerate(syllable.phonemes):
                 if evaluator(root, si, pi, phoneme):
                     replace(root, si, pi, transformer(root, si, pi, phoneme))
+
+    return apply_to_roots(lang, change_root, candidates)
+
+
+def apply_to_roots(
+    lang: Language, fn: Callable, candidates: Optional[Set[int]] = None
+) -> List[str]:
+    # Words that aren't candidates for the change can't be affected by it,
+    # so unless rebuilding them would rewrite them anyway, we pass them
+    # through without parsing them.
+    if candidates is not None:
+        candidates = candidates | lang.phoneme_index.irregular
+
+    new_words: List[str] = []
+    for index, original in enumerate(lang.words):
+        if candidates is not None and index not in candidates:
+            new_words.append(original)
+            continue
+        root = Root(original)
+        fn(root)
         root.rebuild()
-        new_words.append(root.ipa)
+        new_words.append(original if root.ipa == original else root.ipa)
     return new_words
 
 
 def describe_vowel_change(
-    mapping: Dict[str, Vowel], name: str, syllables: Optional[str] = None
+    mapping: Dict[str, Vowel],
+    name: str,
+    syllables: Optional[str] = None,
+    rng: Optional[random.Random] = None,
 ) -> Tuple[str, str, List[str]]:
-    affected = get_affected_syllables(syllables)
+    affected = get_affected_syllables(syllables, rng)
     affected_keys = [key for key in mapping.keys() if key != mapping[key].symbol]
     changes = [f"[{key}] > [{mapping[key].symbol}]" for key in affected_keys]
     title = f"**Vowel {name}:**"
@@ -46,8 +71,10 @@ def describe_vowel_change(
     return description, affected, affected_keys
 
 
-def get_affected_syllables(syllables: Optional[str] = None) -> str:
-    rand_all = "all" if random.random() < 0.1 else "stressed"
+def get_affected_syllables(
+    syllables: Optional[str] = None, rng: Optional[random.Random] = None
+) -> str:
+    rand_all = "all" if (rng or random).random() < 0.1 else "stressed"
     return syllables if syllables is not None else rand_all
 
 
@@ -80,7 +107,8 @@ def devoicing(lang: Language) -> Tuple[str, List[str]]:
         voiceless = find_similar_consonant(phoneme, voiced=False)
         return [voiceless or phoneme]
 
-    new_words = apply_change(lang, evaluator, transformer)
+    candidates = lang.phoneme_index.with_feature("voiced")
+    new_words = apply_change(lang, evaluator, transformer, candidates)
     return description, new_words
 
 
@@ -90,7 +118,7 @@ def devoicing_assimilation(lang: Language) -> Tuple[str, List[str]]:
         "when they occurred next to voiceless consonants."
     )
 
-    consonants, _ = lang.take_inventory()
+    consonants = lang.inventory.consonants
 
     def evaluator(root: Root, si: int, pi: int, phoneme: Phoneme) -> bool:
         if not isinstance(phoneme, Consonant) or phoneme.voiced is False:
@@ -105,7 +133,9 @@ def devoicing_assimilation(lang: Language) -> Tuple[str, List[str]]:
         repl = find_similar_consonant(phoneme, voiced=False)
         return [repl if repl is not None and repl in consonants else phoneme]
 
-    new_words = apply_change(lang, evaluator, transformer)
+    index = lang.phoneme_index
+    candidates = index.with_feature("voiced") & index.with_feature("voiceless")
+    new_words = apply_change(lang, evaluator, transformer, candidates)
     return description, new_words
 
 
@@ -145,7 +175,8 @@ def erosion_coda_stops_followed_by_consonant(lang: Language) -> Tuple[str, List[
     ) -> List[Consonant]:
         return []
 
-    new_words = apply_change(lang, evaluator, transformer)
+    candidates = lang.phoneme_index.with_feature("stop")
+    new_words = apply_change(lang, evaluator, transformer, candidates)
     return description, new_words
 
 
@@ -175,7 +206,9 @@ def erosion_voiceless_obstruents(lang: Language) -> Tuple[str, List[str]]:
     ) -> List[Consonant]:
         return []
 
-    new_words = apply_change(lang, evaluator, transformer)
+    index = lang.phoneme_index
+    candidates = index.with_feature("voiceless") & index.with_feature("obstruent")
+    new_words = apply_change(lang, evaluator, transformer, candidates)
     return description, new_words
 
 
@@ -194,7 +227,8 @@ def erosion_h_between_vowels(lang: Language) -> Tuple[str, List[str]]:
     ) -> List[Consonant]:
         return []
 
-    new_words = apply_change(lang, evaluator, transformer)
+    candidates = lang.phoneme_index.with_phoneme("h", "intervocalic")
+    new_words = apply_change(lang, evaluator, transformer, candidates)
     return description, new_words
 
 
@@ -217,7 +251,9 @@ def erosion_ui_becomes_jw_vowel_pair(lang: Language) -> Tuple[str, List[str]]:
         symbol = "j" if phoneme.symbol == "i" else "w"
         return [get_consonant(symbol)]
 
-    new_words = apply_change(lang, evaluator, transformer)
+    index = lang.phoneme_index
+    candidates = index.with_phoneme("i") | index.with_phoneme("u")
+    new_words = apply_change(lang, evaluator, transformer, candidates)
     return description, new_words
 
 
@@ -228,18 +264,16 @@ def erosion_word_final_diphthongs(lang: Language) -> Tuple[str, List[str]]:
         "vowel in the original diphthong."
     )
 
-    new_words: List[str] = []
-    for original in lang.words:
-        root = Root(original)
+    def change_root(root: Root) -> None:
         ult = root.phoneme_index[-1]
         penult = root.phoneme_index[-2]
         if isinstance(ult[2], Vowel) and isinstance(penult[2], Vowel):
             long = find_similar_vowel(penult[2], long=True)
             replace(root, penult[0], penult[1], [long])
             replace(root, ult[0], ult[1], [])
-        root.rebuild()
-        new_words.append(root.ipa)
 
+    candidates = lang.phoneme_index.with_feature("vowel", "final")
+    new_words = apply_to_roots(lang, change_root, candidates)
     return description, new_words
 
 
@@ -249,15 +283,13 @@ def erosion_word_final_short_vowels(lang: Language) -> Tuple[str, List[str]]:
         "sound in a word were dropped."
     )
 
-    new_words: List[str] = []
-    for original in lang.words:
-        root = Root(original)
+    def change_root(root: Root) -> None:
         last = root.phoneme_index[-1]
         if isinstance(last[2], Vowel) and last[2].long is False:
             replace(root, last[0], last[1], [])
-        root.rebuild()
-        new_words.append(root.ipa)
 
+    candidates = lang.phoneme_index.with_feature("short", "final")
+    new_words = apply_to_roots(lang, change_root, candidates)
     return description, new_words
 
 
@@ -267,15 +299,13 @@ def erosion_word_final_shortening(lang: Language) -> Tuple[str, List[str]]:
         "sound in a word became short vowels."
     )
 
-    new_words: List[str] = []
-    for original in lang.words:
-        root = Root(original)
+    def change_root(root: Root) -> None:
         last = root.phoneme_index[-1]
         if isinstance(last[2], Vowel) and last[2].long is True:
             root.syllables[-1].phonemes[-1] = find_similar_vowel(last[2], long=False)
-        root.rebuild()
-        new_words.append(root.ipa)
 
+    candidates = lang.phoneme_index.with_feature("long", "final")
+    new_words = apply_to_roots(lang, change_root, candidates)
     return description, new_words
 
 
@@ -285,16 +315,14 @@ def erosion_word_final_voiced_consonants(lang: Language) -> Tuple[str, List[str]
         "became voiceless."
     )
 
-    new_words: List[str] = []
-    for original in lang.words:
-        root = Root(original)
+    def change_root(root: Root) -> None:
         last = root.phoneme_index[-1]
         if isinstance(last[2], Consonant) and last[2].voiced is True:
             voiceless = find_similar_consonant(last[2], voiced=False)
             root.syllables[-1].phonemes[-1] = voiceless
-        root.rebuild()
-        new_words.append(root.ipa)
 
+    candidates = lang.phoneme_index.with_feature("voiced", "final")
+    new_words = apply_to_roots(lang, change_root, candidates)
     return description, new_words
 
 
@@ -304,18 +332,15 @@ def haplology(lang: Language) -> Tuple[str, List[str]]:
         "instance of that syllable."
     )
 
-    new_words: List[str] = []
-    for original in lang.words:
-        root = Root(original)
+    def change_root(root: Root) -> None:
         for si, syllable in enumerate(root.syllables):
             is_last = si == len(root.syllables) - 1
             if not is_last:
                 next_syllable = root.syllables[si + 1]
                 if next_syllable.unmarked == syllable.unmarked:
                     root.syllables.remove(next_syllable)
-        root.rebuild()
-        new_words.append(root.ipa)
 
+    new_words = apply_to_roots(lang, change_root)
     return description, new_words
 
 
@@ -325,7 +350,7 @@ def labial_assimilation(lang: Language) -> Tuple[str, List[str]]:
         "consonants when they occurred next to labial consonants."
     )
 
-    consonants, _ = lang.take_inventory()
+    consonants = lang.inventory.consonants
 
     def evaluator(root: Root, si: int, pi: int, phoneme: Phoneme) -> bool:
         if not isinstance(phoneme, Consonant) or phoneme.place == "labial":
@@ -340,7 +365,8 @@ def labial_assimilation(lang: Language) -> Tuple[str, List[str]]:
         labial = find_similar_consonant(phoneme, place="labial")
         return [labial if labial is not None and labial in consonants else phoneme]
 
-    new_words = apply_change(lang, evaluator, transformer)
+    candidates = lang.phoneme_index.with_feature("labial")
+    new_words = apply_change(lang, evaluator, transformer, candidates)
     return description, new_words
 
 
@@ -385,7 +411,9 @@ def metathesis(lang: Language) -> Tuple[str, List[str]]:
         replace(root, si, pi + 1, [first])
         return [second]
 
-    new_words = apply_change(lang, evaluator, transformer)
+    index = lang.phoneme_index
+    candidates = index.with_feature("stop") & index.with_feature("sibilant")
+    new_words = apply_change(lang, evaluator, transformer, candidates)
     return description, new_words
 
 
@@ -395,7 +423,7 @@ def nasal_assimilation(lang: Language) -> Tuple[str, List[str]]:
         "consonants when they occurred next to nasal consonants."
     )
 
-    consonants, _ = lang.take_inventory()
+    consonants = lang.inventory.consonants
 
     def evaluator(root: Root, si: int, pi: int, phoneme: Phoneme) -> bool:
         if not isinstance(phoneme, Consonant) or phoneme.place == "nasal":
@@ -410,7 +438,8 @@ def nasal_assimilation(lang: Language) -> Tuple[str, List[str]]:
         nasal = find_similar_consonant(phoneme, manner="nasal")
         return [nasal if nasal is not None and nasal in consonants else phoneme]
 
-    new_words = apply_change(lang, evaluator, transformer)
+    candidates = lang.phoneme_index.with_feature("nasal")
+    new_words = apply_change(lang, evaluator, transformer, candidates)
     return description, new_words
 
 
@@ -419,8 +448,8 @@ def palatalization(
 ) -> Tuple[str, List[str]]:
     possible_places = ["dental", "alveolar-central", "velar"]
     if places is None:
-        rand_places = random.randint(1, len(possible_places))
-        places = random.sample(possible_places, rand_places)
+        rand_places = lang.rng.randint(1, len(possible_places))
+        places = lang.rng.sample(possible_places, rand_places)
 
     affected = [place for place in possible_places if place in places]
     readable = [
@@ -445,7 +474,10 @@ def palatalization(
         palatal = find_similar_consonant(phoneme, place="palatal")
         return [palatal or phoneme]
 
-    new_words = apply_change(lang, evaluator, transformer)
+    index = lang.phoneme_index
+    places_affected = set().union(*[index.with_feature(place) for place in affected])
+    candidates = index.with_feature("front") & places_affected
+    new_words = apply_change(lang, evaluator, transformer, candidates)
     return description, new_words
 
 
@@ -455,7 +487,7 @@ def velar_assimilation(lang: Language) -> Tuple[str, List[str]]:
         "consonants when they occurred next to velar consonants."
     )
 
-    consonants, _ = lang.take_inventory()
+    consonants = lang.inventory.consonants
 
     def evaluator(root: Root, si: int, pi: int, phoneme: Phoneme) -> bool:
         if not isinstance(phoneme, Consonant) or phoneme.place == "velar":
@@ -470,7 +502,8 @@ def velar_assimilation(lang: Language) -> Tuple[str, List[str]]:
         velar = find_similar_consonant(phoneme, place="velar")
         return [velar if velar is not None and velar in consonants else phoneme]
 
-    new_words = apply_change(lang, evaluator, transformer)
+    candidates = lang.phoneme_index.with_feature("velar")
+    new_words = apply_change(lang, evaluator, transformer, candidates)
     return description, new_words
 
 
@@ -489,7 +522,8 @@ def voicing(lang: Language) -> Tuple[str, List[str]]:
         voiced = find_similar_consonant(phoneme, voiced=True)
         return [voiced or phoneme]
 
-    new_words = apply_change(lang, evaluator, transformer)
+    candidates = lang.phoneme_index.with_feature("voiceless", "intervocalic")
+    new_words = apply_change(lang, evaluator, transformer, candidates)
     return description, new_words
 
 
@@ -499,7 +533,7 @@ def voicing_assimilation(lang: Language) -> Tuple[str, List[str]]:
         "when they occurred next to voiced consonants."
     )
 
-    consonants, _ = lang.take_inventory()
+    consonants = lang.inventory.consonants
 
     def evaluator(root: Root, si: int, pi: int, phoneme: Phoneme) -> bool:
         if not isinstance(phoneme, Consonant) or phoneme.voiced:
@@ -514,7 +548,9 @@ def voicing_assimilation(lang: Language) -> Tuple[str, List[str]]:
         voiced = find_similar_consonant(phoneme, voiced=True)
         return [voiced if voiced is not None and voiced in consonants else phoneme]
 
-    new_words = apply_change(lang, evaluator, transformer)
+    index = lang.phoneme_index
+    candidates = index.with_feature("voiceless") & index.with_feature("voiced")
+    new_words = apply_change(lang, evaluator, transformer, candidates)
     return description, new_words
 
 
@@ -529,7 +565,9 @@ def apply_vowel_change(
     def transformer(root: Root, si: int, pi: int, phoneme: Consonant) -> List[Vowel]:
         return [mapping[phoneme.symbol]]
 
-    return apply_change(lang, evaluator, transformer)
+    index = lang.phoneme_index
+    candidates = set().union(*[index.with_phoneme(key) for key in affected_keys])
+    return apply_change(lang, evaluator, transformer, candidates)
 
 
 def vowel_change(
@@ -543,7 +581,7 @@ def vowel_change(
     direction = "Backing" if reverse is False else "Fronting"
     name = direction if map_type == "location" else height
     description, affected, affected_keys = describe_vowel_change(
-        mapping, name, syllables
+        mapping, name, syllables, lang.rng
     )
     new_words = apply_vowel_change(lang, mapping, affected, affected_keys)
     return description, new_words
@@ -576,10 +614,10 @@ def vowel_backing(
 def vowel_lengthening(
     lang: Language, syllables: Optional[str] = None
 ) -> Tuple[str, List[str]]:
-    _, vowels = lang.take_inventory()
+    vowels = lang.inventory.vowels
     mapping = {v.symbol: find_similar_vowel(v, long=True) for v in vowels}
     description, affected, affected_keys = describe_vowel_change(
-        mapping, "Lengthening", syllables
+        mapping, "Lengthening", syllables, lang.rng
     )
     new_words = apply_vowel_change(lang, mapping, affected, affected_keys)
     return description, new_words
@@ -588,10 +626,10 @@ def vowel_lengthening(
 def vowel_shortening(
     lang: Language, syllables: Optional[str] = None
 ) -> Tuple[str, List[str]]:
-    _, vowels = lang.take_inventory()
+    vowels = lang.inventory.vowels
     mapping = {v.symbol: find_similar_vowel(v, long=False) for v in vowels}
     description, affected, affected_keys = describe_vowel_change(
-        mapping, "Shortening", syllables
+        mapping, "Shortening", syllables, lang.rng
     )
     new_words = apply_vowel_change(lang, mapping, affected, affected_keys)
     return description, new_words
@@ -619,7 +657,9 @@ def vowel_splitting_palatalization(lang: Language) -> Tuple[str, List[str]]:
     def transformer(root: Root, si: int, pi: int, phoneme: Consonant) -> List[Vowel]:
         return [get_vowel("æ")]
 
-    new_words = apply_change(lang, evaluator, transformer)
+    index = lang.phoneme_index
+    candidates = index.with_phoneme("a") & index.with_feature("palatal")
+    new_words = apply_change(lang, evaluator, transformer, candidates)
     return description, new_words
 
 
@@ -634,12 +674,12 @@ def vowel_splitting_stress_diphthongization(
         "u": ["ue", "uo"],
     }
     original_symbol = (
-        original if original is not None else random.choice(list(options.keys()))
+        original if original is not None else lang.rng.choice(list(options.keys()))
     )
     target_symbols = (
         target
         if target is not None and target in options[original_symbol]
-        else random.choice(options[original_symbol])
+        else lang.rng.choice(options[original_symbol])
     )
 
     description = (
@@ -653,15 +693,24 @@ def vowel_splitting_stress_diphthongization(
     def transformer(root: Root, si: int, pi: int, phoneme: Consonant) -> List[Vowel]:
         return [get_vowel(character) for character in target_symbols]
 
-    new_words = apply_change(lang, evaluator, transformer)
+    candidates = lang.phoneme_index.with_phoneme(original_symbol)
+    new_words = apply_change(lang, evaluator, transformer, candidates)
     return description, new_words
 
 
+# Samplers for each table of choices we've seen, keyed on the choices and
+# their weights, since the tables are built anew on every call.
+_samplers: Dict[Tuple[Tuple[str, int], ...], WeightedSampler] = {}
+
+
 def apply_random_change(
     lang: Language, choices: Dict[str, Tuple[int, Callable]]
 ) -> Tuple[str, List[str]]:
-    weighted = get_choices({key: wgt for key, (wgt, _) in choices.items()})
-    chosen = random.choice(weighted)
+    weights = tuple((key, wgt) for key, (wgt, _) in choices.items())
+    sampler = _samplers.get(weights)
+    if sampler is None:
+        sampler = _samplers[weights] = WeightedSampler(dict(weights))
+    chosen = sampler.sample(lang.rng)
     if chosen in choices:
         _, change_fn = choices[chosen]
         return change_fn(lang)
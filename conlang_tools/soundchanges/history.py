@@ -1,20 +1,43 @@
 import csv
 import io
-from typing import List, Optional
+import sys
+from typing import Dict, List, NamedTuple, Optional, Sequence
 from conlang_tools.language.classes import Language
+from conlang_tools.language.lexicon import Lexicon
 from conlang_tools.soundchanges.changes import change
 
 
+class MemoryReport(NamedTuple):
+    stages: int
+    words: int
+    strings: int
+    string_bytes: int
+    unshared_bytes: int
+    storage_bytes: int
+
+
 class History:
     def __init__(self, lang: Language):
         self.language = lang
         self.log: List[str] = []
-        self.stages: List[List[str]] = []
+        self.stages: List[Sequence[str]] = []
+        self.pool: Dict[str, str] = {}
         if lang is not None:
-            self.stages.append(lang.words)
+            self.stages.append(self.intern(lang.words))
+
+    def intern(self, words: Sequence[str]) -> Sequence[str]:
+        if isinstance(words, Lexicon):
+            return words
+        pool = self.pool
+        interned = [pool.setdefault(word, word) for word in words]
+        if all(a is b for a, b in zip(interned, words)):
+            return words
+        return interned
 
     def step(self, lang: Optional[Language] = None):
-        description, words = change(lang or self.language)
+        lang = lang or self.language
+        description, words = change(lang)
+        words = self.intern(Language.store(words, lang.storage))
         self.log.append(description)
         self.stages.append(words)
         return description, words
@@ -23,11 +46,37 @@ class History:
         lang = self.language
         for _ in range(num_steps):
             _, words = self.step(lang)
-            conservatism = lang.calculate_conservatism_after_change(words)
-            lang = Language.from_words(words)
+            conservatism = lang.calculate_conservatism_after_change(words, aligned=True)
+            lang = Language.from_words(words, storage=lang.storage, rng=lang.rng)
             lang.phonology.conservatism = conservatism
         return lang
 
+    def memory_report(self) -> MemoryReport:
+        strings: Dict[int, str] = {}
+        words = 0
+        unshared_bytes = 0
+        storage_bytes = 0
+        for stage in self.stages:
+            if isinstance(stage, Lexicon):
+                storage_bytes += stage.nbytes
+                words += len(stage)
+                continue
+            storage_bytes += sys.getsizeof(stage)
+            for word in stage:
+                strings[id(word)] = word
+                unshared_bytes += sys.getsizeof(word)
+                words += 1
+
+        string_bytes = sum(sys.getsizeof(word) for word in strings.values())
+        return MemoryReport(
+            stages=len(self.stages),
+            words=words,
+            strings=len(strings),
+            string_bytes=string_bytes,
+            unshared_bytes=unshared_bytes,
+            storage_bytes=storage_bytes,
+        )
+
     def to_csv(self) -> str:
         headers = ["Original"] + [f"Change {i}" for i in range(1, len(self.stages))]
         rows = list(zip(*self.stages))
@@ -0,0 +1,50 @@
+import random
+import pytest
+from conlang_tools.language.classes import Language, Phonology, Phonotactics
+
+# A small language most of these tests share. Modules that need it a little
+# different override only the fixture for the part they change.
+
+
+@pytest.fixture
+def small_onset():
+    return {"b": 3, "d": 1}
+
+
+@pytest.fixture
+def small_nucleus():
+    return {"a": 2, "i": 1}
+
+
+@pytest.fixture
+def small_coda():
+    return {"n": 1}
+
+
+@pytest.fixture
+def small_openness():
+    return 0.5
+
+
+@pytest.fixture
+def small_stress():
+    return "initial"
+
+
+@pytest.fixture
+def small_words():
+    return ["/ba/"]
+
+
+@pytest.fixture
+def small_language(
+    small_onset, small_nucleus, small_coda, small_openness, small_stress, small_words
+):
+    return Language(
+        phonotactics=Phonotactics(
+            onset=small_onset, nucleus=small_nucleus, coda=small_coda
+        ),
+        phonology=Phonology(openness=small_openness, stress=small_stress),
+        words=small_words,
+        rng=random.Random(1),
+    )
@@ -0,0 +1,124 @@
+import random
+import numpy as np
+import pytest
+from conlang_tools.language.batch import generate_batch, segment_table
+from conlang_tools.language.classes import Language, RetryPolicy
+
+
+@pytest.fixture
+def small_nucleus():
+    return {"a": 2, "a:": 1}
+
+
+class TestSegmentTable:
+    def test_skips_zero_weights(self):
+        table, odds = segment_table({"a": 3, "b": 0, "c": 1})
+        assert list(table) == ["a", "c"]
+        assert list(odds) == [0.75, 0.25]
+
+    def test_empty_raises(self):
+        with pytest.raises(IndexError):
+            segment_table({})
+
+
+class TestGenerateBatch:
+    def test_generates_words(self, small_language):
+        words = generate_batch(small_language, 50, 1, np.random.default_rng(1))
+        assert len(words) == 50
+        assert all(small_language.word_space(1).parse(word) for word in words)
+
+    def test_applies_stress(self, small_language):
+        for stress in ["initial", "final", "penultimate", "antepenultimate"]:
+            small_language.phonology.stress = stress
+            words = generate_batch(small_language, 50, 3, np.random.default_rng(2))
+            space = small_language.word_space(3)
+            assert all(space.parse(word) is not None for word in words)
+
+    def test_applies_heavy_stress(self, small_language):
+        small_language.phonology.stress = "heavy"
+        words = generate_batch(small_language, 200, 2, np.random.default_rng(3))
+        expected = [
+            "/"
+            + ".".join(small_language.apply_stress(word.strip("/").split(".")))
+            + "/"
+            for word in [w.replace("ˈ", "") for w in words]
+        ]
+        assert words == expected
+
+    def test_applies_random_stress(self, small_language):
+        small_language.phonology.stress = "random"
+        words = generate_batch(small_language, 200, 2, np.random.default_rng(4))
+        assert all(word.count("ˈ") == 1 for word in words)
+        assert {word.index("ˈ") == 1 for word in words} == {True, False}
+
+    def test_openness(self, small_language):
+        small_language.phonology.openness = 1
+        words = generate_batch(small_language, 100, 2, np.random.default_rng(5))
+        assert not any("n" in word for word in words)
+
+    def test_reproducible(self, small_language):
+        first = generate_batch(small_language, 20, 2, np.random.default_rng(6))
+        second = generate_batch(small_language, 20, 2, np.random.default_rng(6))
+        assert first == second
+
+
+class TestUniqueCandidates:
+    def test_iter_candidates(self, small_language):
+        candidates = list(small_language.iter_candidates(100, 2, batch_size=30))
+        assert len(candidates) == 100
+        assert len(set(candidates)) < 100
+
+    def test_iter_unique_candidates(self, small_language):
+        small_language.generated.append("/ˈda.da/")
+        words = list(small_language.iter_unique_candidates(500, 2, run_size=50))
+        assert words == sorted(set(words))
+        assert "/ˈda.da/" not in words
+        assert all(word in small_language.word_space(2) for word in words)
+        assert small_language.generated == ["/ˈda.da/"]
+
+    def test_iter_unique_candidates_excludes_words(self, small_language):
+        words = list(small_language.iter_unique_candidates(200, 1, run_size=50))
+        assert words == sorted(
+            {"/ba:/", "/ban/", "/ba:n/", "/da/", "/da:/", "/dan/", "/da:n/"}
+        )
+
+
+class TestGenerateNewWordsBatch:
+    def test_generates_new_words(self, small_language):
+        words = small_language.generate_new_words(20, 2, mode="batch")
+        assert len(words) == len(set(words)) == 20
+        assert small_language.generated == words
+        assert all("." in word for word in words)
+
+    def test_grows_when_space_is_full(self, small_language):
+        words = small_language.generate_new_words(12, mode="batch")
+        assert len(set(words)) == 12
+        assert sum("." not in word for word in words) == 7
+        assert "/ba/" not in words
+
+    def test_generates_in_parallel(self, small_language):
+        small_language.rng = random.Random(8)
+        words = small_language.generate_new_words(300, 3, jobs=2)
+        assert len(words) == len(set(words)) == 300
+        assert small_language.generated == words
+        assert not set(words) & set(small_language.words)
+
+    def test_parallel_is_reproducible(self, small_language):
+        def generate(seed):
+            lang = Language(
+                phonotactics=small_language.phonotactics,
+                phonology=small_language.phonology,
+                rng=random.Random(seed),
+            )
+            return lang.generate_new_words(50, 2, jobs=2)
+
+        assert generate(9) == generate(9)
+
+    def test_gives_up(self, small_language):
+        policy = RetryPolicy(attempts=3, max_syllables=1, give_up="stop")
+        words = small_language.generate_new_words(10, policy=policy, mode="batch")
+        assert len(words) == 7
+        with pytest.raises(ValueError):
+            small_language.generate_new_words(
+                1, policy=policy._replace(give_up="raise"), mode="batch"
+            )
@@ -1,5 +1,17 @@
+import random
 import pytest
-from conlang_tools.language.classes import Language, Phonology, Phonotactics, Stress
+import yaml
+from conlang_tools.language.classes import (
+    Language,
+    LexiconStatistics,
+    Phonology,
+    Phonotactics,
+    RetryPolicy,
+    Stress,
+    map_vowels,
+)
+from conlang_tools.language.lexicon import Lexicon
+from conlang_tools.phonemes.collections import get_consonant, get_vowel
 
 
 class TestLanguage:
@@ -59,6 +71,27 @@ class TestLanguage:
         assert len(lang.words) == 1
         assert lang.words[0] == "/ba/"
 
+    def test_array_storage(self):
+        lang = Language(words=["/ba/", "/ˈba.ba/"], storage="array")
+        assert isinstance(lang.words, Lexicon)
+        assert lang.storage == "array"
+        assert lang.words == ["/ba/", "/ˈba.ba/"]
+
+    def test_replacing_words_keeps_storage(self, example_language):
+        lang = Language(words=["/ba/"], storage="array")
+        lang.words = ["/da/", "/ga/"]
+        assert lang.storage == "array"
+        assert list(lang.words) == ["/da/", "/ga/"]
+        example_language.words = ["/da/"]
+        assert example_language.storage == "list"
+
+    def test_list_storage(self, example_language):
+        assert example_language.storage == "list"
+
+    def test_to_dict_array_storage(self):
+        lang = Language(words=["/ba/"], storage="array")
+        assert lang.to_dict()["words"] == ["/ba/"]
+
     def test_to_dict(self, example_language):
         expected = {
             "phonotactics": {"onset": {"b": 2}, "nucleus": {"a": 1}, "coda": {"c": 1}},
@@ -76,6 +109,11 @@ class TestLanguage:
         assert lang.phonology.openness == 0.5
         assert "/ba/" in lang.words
 
+    def test_load_array_storage(self):
+        lang = Language.load("example", storage="array")
+        assert isinstance(lang.words, Lexicon)
+        assert "/ba/" in lang.words
+
     def test_load_fail(self):
         with pytest.raises(FileNotFoundError):
             Language.load("thislanguagedoesnotexist")
@@ -126,6 +164,35 @@ class TestLanguage:
         possibilities = ["ˈba.ba", "ba.ˈba"]
         assert ".".join(lang.apply_stress(["ba", "ba"])) in possibilities
 
+    def test_has_own_rng(self, example_language):
+        assert isinstance(example_language.rng, random.Random)
+        assert Language().rng is not Language().rng
+
+    def test_seeded_rng_reproduces_words(self, example_language):
+        def generate(seed):
+            lang = Language(
+                phonotactics=Phonotactics(
+                    onset={"b": 2, "d": 1}, nucleus={"a": 1, "i": 1}, coda={"c": 1}
+                ),
+                phonology=Phonology(stress="random", openness=0.5),
+                rng=random.Random(seed),
+            )
+            return lang.generate_new_words(20, 3)
+
+        assert generate(1) == generate(1)
+        assert generate(1) != generate(2)
+
+    def test_seeded_rng_reproduces_batches(self, example_language):
+        def generate(seed):
+            lang = Language(
+                phonotactics=example_language.phonotactics,
+                phonology=example_language.phonology,
+                rng=random.Random(seed),
+            )
+            return lang.generate_new_words(5, 3, mode="batch")
+
+        assert generate(3) == generate(3)
+
     def test_generate_monosyllabic_word(self, example_language):
         word = example_language.generate_word()
         possibilities = ["/ba/", "/bac/"]
@@ -173,6 +240,48 @@ class TestLanguage:
         assert mapping["o"].symbol == "o"
         assert mapping["u"].symbol == "u"
 
+    def test_phoneme_index(self, example_language):
+        example_language.words = ["/ba/", "/ca/"]
+        assert example_language.phoneme_index.with_phoneme("c") == {1}
+
+    def test_phoneme_index_is_cached(self, example_language):
+        assert example_language.phoneme_index is example_language.phoneme_index
+
+    def test_phoneme_index_follows_appended_words(self, example_language):
+        index = example_language.phoneme_index
+        example_language.words.append("/ca/")
+        assert example_language.phoneme_index is index
+        assert index.with_phoneme("c") == {1}
+
+    def test_phoneme_index_follows_replaced_words(self, example_language):
+        example_language.phoneme_index
+        example_language.words = ["/ca/"]
+        assert example_language.phoneme_index.with_phoneme("c") == {0}
+
+    def test_phoneme_index_follows_changed_words(self, example_language):
+        example_language.words = ["/ba/", "/ba/"]
+        example_language.phoneme_index
+        example_language.words[1] = "/ca/"
+        assert example_language.phoneme_index.with_phoneme("c") == {1}
+
+    def test_vowel_mapping_shared_across_languages(self, vowel_change_example):
+        nucleus = dict(vowel_change_example.phonotactics.nucleus)
+        twin = Language(phonotactics=Phonotactics(onset={"d": 1}, nucleus=nucleus))
+        vowel_change_example.vowel_height_mapping()
+        before = map_vowels.cache_info().hits
+        twin.vowel_height_mapping()
+        assert map_vowels.cache_info().hits == before + 1
+
+    def test_vowel_mapping_returns_copy(self, vowel_change_example):
+        mapping = vowel_change_example.vowel_height_mapping()
+        mapping["a"] = mapping["i"]
+        assert vowel_change_example.vowel_height_mapping()["a"].symbol == "e"
+
+    def test_vowel_mapping_follows_inventory(self, vowel_change_example):
+        assert vowel_change_example.vowel_height_mapping()["a"].symbol == "e"
+        del vowel_change_example.phonotactics.nucleus["e"]
+        assert vowel_change_example.vowel_height_mapping()["a"].symbol == "i"
+
     def test_generate_new_word(self, example_language):
         word = example_language.generate_new_word()
         assert word not in example_language.words
@@ -193,11 +302,156 @@ class TestLanguage:
         assert len(new_words) == 3
         assert all(["." in word for word in new_words])
 
+    def test_iter_new_words(self, example_language):
+        new_words = example_language.iter_new_words(2)
+        first = next(new_words)
+        assert example_language.generated == [first]
+        second = next(new_words)
+        assert first != second
+        assert example_language.generated == [first, second]
+
+    def test_iter_new_words_limit(self, example_language):
+        new_words = list(example_language.iter_new_words(2, limit=3))
+        assert len(new_words) == 3
+
+    def test_iter_new_words_without_record(self, example_language):
+        new_words = list(example_language.iter_new_words(limit=3, record=False))
+        assert len(set(new_words)) == 3
+        assert example_language.generated == []
+        assert set(new_words) <= example_language.known
+
+    def test_iter_new_words_in_batches(self, example_language):
+        new_words = example_language.iter_new_words(3, mode="batch", record=False)
+        taken = [next(new_words) for _ in range(500)]
+        assert len(set(taken)) == 500
+        assert example_language.generated == []
+
+    def test_use_bloom_filter(self, example_language):
+        bloom = example_language.use_bloom_filter(100)
+        assert "/ba/" in bloom
+        assert bloom.capacity == 101
+        assert example_language.dedup is bloom
+
+    def test_bloom_filter_follows_words(self, example_language):
+        bloom = example_language.use_bloom_filter(100)
+        example_language.words.append("/bac/")
+        assert "/bac/" in example_language.dedup
+        example_language.generated.append("/ˈba.ba/")
+        assert "/ˈba.ba/" in example_language.dedup
+        assert example_language.dedup is bloom
+
+    def test_generate_with_bloom_filter(self, example_language):
+        example_language.use_bloom_filter(200, error_rate=0.0001)
+        new_words = example_language.generate_new_words(200, 6)
+        assert len(set(new_words)) == 200
+        assert "/ba/" not in new_words
+        assert example_language.generated == []
+
+    def test_generate_batches_with_bloom_filter(self, example_language):
+        example_language.use_bloom_filter(200, error_rate=0.0001)
+        new_words = example_language.generate_new_words(200, 6, mode="batch")
+        assert len(set(new_words)) == 200
+        assert example_language.generated == []
+
+    def test_known_follows_words_and_generated(self, example_language):
+        lang = Language(words=["/ba/"])
+        assert lang.known == {"/ba/"}
+        lang.words.append("/da/")
+        lang.generated.append("/ga/")
+        assert lang.known == {"/ba/", "/da/", "/ga/"}
+        lang.words = ["/fa/"]
+        assert lang.known == {"/fa/", "/ga/"}
+
+    def test_known_follows_changed_words(self, example_language):
+        assert example_language.known == {"/ba/"}
+        example_language.words[0] = "/bac/"
+        assert example_language.known == {"/bac/"}
+        policy = RetryPolicy(attempts=100, max_syllables=1, give_up="stop")
+        assert example_language.generate_new_word(1, policy) == "/ba/"
+        assert example_language.generate_new_word(1, policy) is None
+
+    def test_bloom_filter_follows_changed_words(self, example_language):
+        example_language.use_bloom_filter(100)
+        example_language.words[0] = "/bac/"
+        assert "/bac/" in example_language.dedup
+
+    def test_generate_new_word_grows_iteratively(self):
+        lang = Language(
+            phonotactics=Phonotactics(onset={"b": 1}, nucleus={"a": 1}, coda={"": 1}),
+            phonology=Phonology(openness=1),
+            words=["/ba/"],
+        )
+        assert lang.generate_new_word() == "/ˈba.ba/"
+        assert lang.generate_new_word() == "/ˈba.ba.ba/"
+
+    def test_generate_new_word_gives_up(self):
+        lang = Language(
+            phonotactics=Phonotactics(onset={"b": 1}, nucleus={"a": 1}, coda={"": 1}),
+            phonology=Phonology(openness=1),
+            words=["/ba/", "/ˈba.ba/"],
+        )
+        policy = RetryPolicy(attempts=2, max_syllables=2, give_up="raise")
+        with pytest.raises(ValueError):
+            lang.generate_new_word(policy=policy)
+        stop = policy._replace(give_up="stop")
+        assert lang.generate_new_word(policy=stop) is None
+
+    def test_generate_new_words_stops_early(self):
+        lang = Language(
+            phonotactics=Phonotactics(onset={"b": 1}, nucleus={"a": 1}, coda={"": 1}),
+            phonology=Phonology(openness=1),
+        )
+        policy = RetryPolicy(max_syllables=3, give_up="stop")
+        assert lang.generate_new_words(5, policy=policy) == [
+            "/ba/",
+            "/ˈba.ba/",
+            "/ˈba.ba.ba/",
+        ]
+
     def test_measure_change(self, example_language):
         example_language.words = ["/ba/", "/ca/", "/da/", "/fa/"]
         after = ["/ba/", "/ca/", "/da/", "/ga/"]
         assert example_language.measure_change(after) == 0.25
 
+    def test_measure_change_ignores_order(self, example_language):
+        example_language.words = ["/ba/", "/ca/", "/da/", "/fa/"]
+        after = ["/fa/", "/da/", "/ca/", "/ba/"]
+        assert example_language.measure_change(after) == 0
+
+    def test_measure_aligned_change(self, example_language):
+        example_language.words = ["/ba/", "/ca/", "/da/", "/fa/"]
+        after = ["/ba/", "/ca/", "/da/", "/ga:b/"]
+        measurement = example_language.measure_aligned_change(after)
+        assert measurement.words == 4
+        assert measurement.changed == 1
+        assert measurement.phonemes == 3
+        assert measurement.ratio == 0.25
+
+    def test_measure_aligned_change_respects_position(self, example_language):
+        example_language.words = ["/ba/", "/ca/"]
+        measurement = example_language.measure_aligned_change(["/ca/", "/ba/"])
+        assert measurement.changed == 2
+        assert measurement.phonemes == 2
+
+    def test_measure_aligned_change_without_phonemes(self, example_language):
+        example_language.words = ["/ba/", "/ca/", "/da/", "/fa/"]
+        after = ["/ba/", "/ca/", "/da/", "/ga:b/"]
+        measurement = example_language.measure_aligned_change(after, phonemes=False)
+        assert measurement.changed == 1
+        assert measurement.phonemes == 0
+
+    def test_measure_aligned_change_mismatch(self, example_language):
+        example_language.words = ["/ba/", "/ca/"]
+        with pytest.raises(ValueError):
+            example_language.measure_aligned_change(["/ba/"])
+
+    def test_calculate_conservatism_after_change_aligned(self, example_language):
+        example_language.words = ["/ba/", "/ca/", "/da/", "/fa/"]
+        after = ["/ca/", "/ba/", "/da/", "/fa/"]
+        lang = example_language
+        assert lang.calculate_conservatism_after_change(after) == 0.625
+        assert lang.calculate_conservatism_after_change(after, aligned=True) == 0.5
+
     def test_calculate_conservatism_after_change_more(self, example_language):
         example_language.words = ["/ba/", "/ca/", "/da/", "/fa/"]
         after = ["/ba/", "/ca/", "/da/", "/ga/"]
@@ -217,6 +471,31 @@ class TestLanguage:
         assert consonants[0].symbol == "b"
         assert len(vowels) == 1
 
+    def test_inventory(self, example_language):
+        inventory = example_language.inventory
+        assert inventory.consonants == frozenset(
+            [get_consonant("b"), get_consonant("c")]
+        )
+        assert inventory.vowels == frozenset([get_vowel("a")])
+
+    def test_inventory_is_cached(self, example_language):
+        assert example_language.inventory is example_language.inventory
+
+    def test_inventory_invalidated_on_mutation(self, example_language):
+        before = example_language.inventory
+        example_language.phonotactics.nucleus["e"] = 1
+        after = example_language.inventory
+        assert after is not before
+        assert get_vowel("e") in after.vowels
+
+    def test_inventory_invalidated_on_replacement(self, example_language):
+        before = example_language.inventory
+        example_language.phonotactics = Phonotactics(onset={"d": 1}, nucleus={"i": 1})
+        after = example_language.inventory
+        assert after is not before
+        assert after.consonants == frozenset([get_consonant("d")])
+        assert after.vowels == frozenset([get_vowel("i")])
+
     def test_from_words(self):
         words = ["/ba/", "/ˈba.ba/", "/bab/"]
         lang = Language.from_words(words)
@@ -228,6 +507,129 @@ class TestLanguage:
         assert lang.phonotactics.coda == {"b": 1}
         assert lang.words == words
 
+    def test_from_words_array_storage(self):
+        words = ["/ba/", "/ˈba.ba/", "/bab/"]
+        lang = Language.from_words(words, storage="array")
+        assert isinstance(lang.words, Lexicon)
+        assert lang.words == words
+        assert lang.phonotactics.onset == {"b": 4}
+
+    def test_from_words_parallel(self):
+        words = ["/ba/", "/ˈba.ba/", "/bab/", "/ˈdi.ku/", "/ˈga:.nom/"] * 3
+        serial = Language.from_words(words)
+        parallel = Language.from_words(words, jobs=2)
+        assert parallel.to_dict() == serial.to_dict()
+        assert list(parallel.phonotactics.onset) == list(serial.phonotactics.onset)
+
+
+class TestLexiconStatistics:
+    @pytest.fixture
+    def words(self):
+        return ["/ba/", "/ˈba.ba/", "/bab/", "/ˈdi.ku/"]
+
+    def test_analyze(self, words):
+        stats = LexiconStatistics.analyze(words)
+        assert stats.words == 4
+        assert stats.syllables == 6
+        assert stats.open_syllables == 5
+        assert stats.onset == {"b": 4, "d": 1, "k": 1}
+        assert stats.nucleus == {"a": 4, "i": 1, "u": 1}
+        assert stats.coda == {"b": 1}
+        assert stats.stress["initial"] == 4
+
+    def test_openness(self, words):
+        stats = LexiconStatistics.analyze(words)
+        assert stats.openness == Phonology.calculate_openness(words)
+
+    def test_poll_stress(self, words):
+        stats = LexiconStatistics.analyze(words)
+        assert stats.poll_stress() == Phonology.poll_stress(words)
+
+    def test_poll_stress_random(self):
+        words = ["/ba:.ˈba/", "/ˈba.ba:/", "/ba.ˈba.ba:.ba.ba/"]
+        assert LexiconStatistics.analyze(words).poll_stress() == "random"
+
+    def test_merge(self, words):
+        merged = LexiconStatistics.analyze(words[:2])
+        merged.merge(LexiconStatistics.analyze(words[2:]))
+        whole = LexiconStatistics.analyze(words)
+        assert merged.words == whole.words
+        assert merged.syllables == whole.syllables
+        assert merged.open_syllables == whole.open_syllables
+        assert list(merged.onset.items()) == list(whole.onset.items())
+        assert merged.stress == whole.stress
+
+    def test_add_matches_analyze(self, words):
+        stats = LexiconStatistics()
+        stats.update(words)
+        analyzed = LexiconStatistics.analyze(words)
+        assert stats.open_syllables == analyzed.open_syllables
+        assert list(stats.onset.items()) == list(analyzed.onset.items())
+        assert stats.stress == analyzed.stress
+        assert stats.lengths == analyzed.lengths == {1: 2, 2: 2}
+
+    def test_from_words_parallel(self, words):
+        parallel = LexiconStatistics.from_words(words, jobs=2)
+        serial = LexiconStatistics.from_words(words)
+        assert parallel.words == serial.words
+        assert list(parallel.nucleus.items()) == list(serial.nucleus.items())
+
+    def test_add_matches_analyze_squares(self, words):
+        stats = LexiconStatistics()
+        stats.update(words)
+        analyzed = LexiconStatistics.analyze(words)
+        assert stats.open_squares == analyzed.open_squares == 9
+        assert stats.open_products == analyzed.open_products == 9
+        assert stats.syllable_squares == analyzed.syllable_squares == 10
+
+    def test_from_sample_exact_by_default(self, words):
+        stats = LexiconStatistics.from_sample(words)
+        assert stats.words == 4
+        assert not stats.sampled
+        assert stats.estimate_openness() == (5 / 6, 5 / 6, 5 / 6)
+
+    def test_from_sample_reproducible(self):
+        words = [f"/b{'a' * (i % 3 + 1)}.ba/" for i in range(200)]
+        first = LexiconStatistics.from_sample(words, 20, seed=1)
+        second = LexiconStatistics.from_sample(words, 20, seed=1)
+        assert first.words == 20
+        assert first.population == 200
+        assert first.sampled
+        assert list(first.nucleus.items()) == list(second.nucleus.items())
+
+    def test_from_sample_stratified(self):
+        words = ["/ba/"] * 75 + ["/ba.bi/"] * 25
+        stats = LexiconStatistics.from_sample(words, 20, seed=1, stratify=True)
+        assert stats.lengths == {1: 15, 2: 5}
+
+    def test_from_sample_rejects_empty_sample(self, words):
+        with pytest.raises(ValueError):
+            LexiconStatistics.from_sample(words, 0)
+
+    def test_estimates_cover_population(self):
+        rng = random.Random(0)
+        words = [rng.choice(["/ba/", "/bab/", "/ˈba.bab/"]) for _ in range(2000)]
+        exact = LexiconStatistics.analyze(words)
+        stats = LexiconStatistics.from_sample(words, 400, seed=2)
+        openness = stats.estimate_openness(0.99)
+        assert openness.low < exact.openness < openness.high
+        final = stats.estimate_stress("final", 0.99)
+        assert final.low < exact.stress["final"] / exact.words < final.high
+        assert set(stats.estimates()) == {
+            "openness",
+            "initial",
+            "final",
+            "penultimate",
+            "antepenultimate",
+            "heavy",
+        }
+
+    def test_scale(self):
+        words = ["/ba/"] * 90 + ["/ku/"] * 10
+        stats = LexiconStatistics.from_sample(words, 10, seed=3)
+        tactics = Phonotactics.from_statistics(stats)
+        assert sum(tactics.onset.values()) == pytest.approx(100, abs=len(tactics.onset))
+
 
 class TestPhonology:
     def test_creates_phonology(self):
@@ -357,6 +759,23 @@ class TestPhonotactics:
         dictionary = phones.to_dict()
         assert dictionary == {"onset": {"b": 2}, "nucleus": {"a": 1}, "coda": {"c": 1}}
 
+    def test_to_dict_can_be_dumped(self):
+        phones = Phonotactics(onset={"b": 2}, nucleus={"a": 1}, coda={"c": 1})
+        dumped = yaml.safe_dump(phones.to_dict())
+        assert yaml.safe_load(dumped) == phones.to_dict()
+
+    def test_version_changes_on_mutation(self):
+        phones = Phonotactics(onset={"b": 2})
+        before = phones.version
+        phones.onset["c"] = 1
+        assert phones.version > before
+
+    def test_version_changes_on_replacement(self):
+        phones = Phonotactics(onset={"b": 2})
+        before = phones.version
+        phones.coda = {"c": 1}
+        assert phones.version > before
+
     def test_build_choices(self):
         phones = Phonotactics(onset={"b": 2, "c": 1})
         assert ", ".join(phones.choices("onset")) == "b, b, c"
@@ -369,6 +788,23 @@ class TestPhonotactics:
         phones = Phonotactics(nucleus={"a": 2, "e": 1})
         assert ", ".join(phones.choices("other")) == "a, a, e"
 
+    def test_sampler_is_cached(self):
+        phones = Phonotactics(onset={"b": 2, "c": 1})
+        assert phones.sampler("onset") is phones.sampler("onset")
+
+    def test_sampler_rebuilt_on_change(self):
+        phones = Phonotactics(onset={"b": 2})
+        before = phones.sampler("onset")
+        phones.onset["c"] = 1
+        after = phones.sampler("onset")
+        assert after is not before
+        assert set(after.keys) == {"b", "c"}
+
+    def test_choose(self):
+        phones = Phonotactics(onset={"b": 2}, nucleus={"a": 1, "e": 0})
+        assert phones.choose("onset") == "b"
+        assert phones.choose() == "a"
+
     def test_from_words(self):
         words = ["/ba/", "/ˈba.ba/", "/bab/"]
         tactics = Phonotactics.from_words(words)
@@ -377,6 +813,11 @@ class TestPhonotactics:
         assert tactics.nucleus == {"a": 4}
         assert tactics.coda == {"b": 1}
 
+    def test_from_words_parallel(self):
+        words = ["/ba/", "/ˈba.ba/", "/bab/", "/ˈdi.ku/"]
+        tactics = Phonotactics.from_words(words, jobs=2)
+        assert tactics.to_dict() == Phonotactics.from_words(words).to_dict()
+
 
 class TestStress:
     def test_creates_stress(self):
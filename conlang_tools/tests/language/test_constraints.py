@@ -0,0 +1,142 @@
+import random
+import pytest
+from conlang_tools.language.classes import RetryPolicy
+from conlang_tools.language.constraints import (
+    SegmentConstraint,
+    WordConstraints,
+    build_slots,
+    generate_constrained,
+    segment_phonemes,
+)
+
+
+@pytest.fixture
+def small_onset():
+    return {"b": 3, "d": 1, "st": 1}
+
+
+@pytest.fixture
+def small_nucleus():
+    return {"a": 1000, "i": 1}
+
+
+def generate(lang, constraints, n=200):
+    return [lang.generate_constrained_word(constraints) for _ in range(n)]
+
+
+class TestSegmentPhonemes:
+    def test_splits_segment(self):
+        assert segment_phonemes("st") == frozenset(["s", "t"])
+
+    def test_empty(self):
+        assert segment_phonemes("") == frozenset()
+
+
+class TestBuildSlots:
+    def test_three_slots_per_syllable(self, small_language):
+        slots = build_slots(small_language, WordConstraints(), 2)
+        assert len(slots) == 6
+        assert slots[2].options == ["", "n"]
+        assert slots[2].weights == pytest.approx([0.5, 0.5])
+
+    def test_restricts_onset(self, small_language):
+        slots = build_slots(small_language, WordConstraints(onset="st"), 2)
+        assert slots[0].options == ["st"]
+        assert len(slots[3].options) == 3
+
+    def test_infeasible(self, small_language):
+        assert build_slots(small_language, WordConstraints(onset="g"), 1) is None
+        segment = SegmentConstraint(2, "nucleus", frozenset(["a"]))
+        assert (
+            build_slots(small_language, WordConstraints(segments=(segment,)), 2) is None
+        )
+
+
+class TestGenerateConstrained:
+    def test_onset(self, small_language):
+        words = generate(small_language, WordConstraints(onset="st"))
+        assert all(word.startswith("/st") for word in words)
+
+    def test_open_ending(self, small_language):
+        words = generate(small_language, WordConstraints(open_ending=True))
+        assert not any(word.endswith("n/") for word in words)
+        words = generate(small_language, WordConstraints(open_ending=False))
+        assert all(word.endswith("n/") for word in words)
+
+    def test_contains_rare_phoneme(self, small_language):
+        constraints = WordConstraints(min_syllables=3, contains="i")
+        words = generate(small_language, constraints)
+        assert all("i" in word for word in words)
+        assert all(word.count(".") == 2 for word in words)
+
+    def test_contains_follows_weights(self, small_language):
+        # Given a word contains "i", it's almost always exactly once, and
+        # equally likely in any of the three syllables.
+        constraints = WordConstraints(min_syllables=3, contains="i")
+        words = generate(small_language, constraints, 900)
+        positions = [
+            next(i for i, s in enumerate(word.split(".")) if "i" in s) for word in words
+        ]
+        for position in range(3):
+            assert 250 < positions.count(position) < 350
+
+    def test_segments(self, small_language):
+        segment = SegmentConstraint(-1, "onset", frozenset(["d"]))
+        words = generate(small_language, WordConstraints(2, segments=(segment,)))
+        assert all(word.split(".")[1].startswith("d") for word in words)
+
+    def test_syllable_range(self, small_language):
+        constraints = WordConstraints(min_syllables=1, max_syllables=3)
+        words = generate(small_language, constraints, 300)
+        assert {word.count(".") for word in words} == {0, 1, 2}
+
+    def test_stress(self, small_language):
+        small_language.phonology.stress = "random"
+        words = generate(small_language, WordConstraints(2, stress=-1))
+        assert all(word.split(".")[1].startswith("ˈ") for word in words)
+
+    def test_stress_follows_language(self, small_language):
+        words = generate(small_language, WordConstraints(2, 3, stress=0))
+        assert all(word.startswith("/ˈ") for word in words)
+        with pytest.raises(ValueError):
+            small_language.generate_constrained_word(WordConstraints(2, stress=1))
+
+    def test_stress_heavy_raises(self, small_language):
+        small_language.phonology.stress = "heavy"
+        with pytest.raises(ValueError):
+            small_language.generate_constrained_word(WordConstraints(2, stress=0))
+
+    def test_infeasible_raises(self, small_language):
+        with pytest.raises(ValueError):
+            small_language.generate_constrained_word(WordConstraints(contains="u"))
+        small_language.phonology.openness = 1
+        with pytest.raises(ValueError):
+            small_language.generate_constrained_word(WordConstraints(open_ending=False))
+
+    def test_reproducible(self, small_language):
+        constraints = WordConstraints(2, contains="i")
+        first = generate_constrained(small_language, constraints, random.Random(2))
+        second = generate_constrained(small_language, constraints, random.Random(2))
+        assert first == second
+
+
+class TestGenerateNewWordsConstrained:
+    def test_generates_new_words(self, small_language):
+        small_language.phonotactics.nucleus = {"a": 1, "i": 1}
+        constraints = WordConstraints(onset="st")
+        words = small_language.generate_new_words(4, constraints=constraints)
+        assert sorted(words) == ["/sta/", "/stan/", "/sti/", "/stin/"]
+        assert small_language.generated == words
+
+    def test_gives_up(self, small_language):
+        small_language.phonotactics.nucleus = {"a": 1, "i": 1}
+        constraints = WordConstraints(onset="st", open_ending=True)
+        policy = RetryPolicy(attempts=50, give_up="stop")
+        words = small_language.generate_new_words(
+            5, policy=policy, constraints=constraints
+        )
+        assert sorted(words) == ["/sta/", "/sti/"]
+        with pytest.raises(ValueError):
+            small_language.generate_new_words(
+                1, policy=policy._replace(give_up="raise"), constraints=constraints
+            )
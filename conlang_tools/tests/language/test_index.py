@@ -0,0 +1,87 @@
+import pytest
+from conlang_tools.language.index import PhonemeIndex, is_canonical, phoneme_features
+from conlang_tools.language.lexicon import phoneme_ids
+from conlang_tools.phonemes.collections import get_consonant, get_vowel
+
+
+class TestPhonemeFeatures:
+    def test_consonant(self):
+        features = phoneme_features(get_consonant("s"))
+        assert features == [
+            "consonant",
+            "fricative",
+            "alveolar-central",
+            "obstruent",
+            "voiceless",
+            "sibilant",
+        ]
+
+    def test_vowel(self):
+        features = phoneme_features(get_vowel("u:"))
+        assert features == ["vowel", "close", "back", "rounded", "long"]
+
+
+class TestIsCanonical:
+    def test_canonical(self):
+        assert is_canonical("/ˈba.hab/") is True
+
+    def test_brackets(self):
+        assert is_canonical("[ba]") is False
+
+    def test_stressed_monosyllable(self):
+        assert is_canonical("/ˈba/") is False
+
+    def test_consonant_syllable(self):
+        assert is_canonical("/ba.b/") is False
+
+
+class TestPhonemeIndex:
+    @pytest.fixture
+    def index(self):
+        return PhonemeIndex(["/ˈba.ha/", "/hab/", "/ˈdi.ku/", "[ba]"])
+
+    def test_len(self, index):
+        assert len(index) == 4
+
+    def test_with_phoneme(self, index):
+        assert index.with_phoneme("h") == {0, 1}
+
+    def test_with_phoneme_id(self, index):
+        assert index.with_phoneme(phoneme_ids["k"]) == {2}
+
+    def test_with_phoneme_object(self, index):
+        assert index.with_phoneme(get_consonant("d")) == {2}
+
+    def test_with_phoneme_positions(self, index):
+        assert index.with_phoneme("h", "initial") == {1}
+        assert index.with_phoneme("h", "intervocalic") == {0}
+        assert index.with_phoneme("b", "final") == {1}
+
+    def test_with_unknown_phoneme(self, index):
+        assert index.with_phoneme("ʕ") == set()
+
+    def test_with_feature(self, index):
+        assert index.with_feature("velar") == {2}
+        assert index.with_feature("vowel", "final") == {0, 2, 3}
+        assert index.with_feature("voiced", "final") == {1}
+
+    def test_irregular(self, index):
+        assert index.irregular == {3}
+
+    def test_remove(self, index):
+        index.remove(0)
+        assert index.with_phoneme("h") == {1}
+        assert len(index) == 3
+
+    def test_update(self, index):
+        index.update(1, "/kab/")
+        assert index.with_phoneme("h") == {0}
+        assert index.with_phoneme("k") == {1, 2}
+
+    def test_extend(self, index):
+        index.extend(["/hu/"], start=4)
+        assert index.with_phoneme("h", "initial") == {1, 4}
+
+    def test_returns_copies(self, index):
+        index.with_phoneme("h").add(99)
+        assert index.with_phoneme("h") == {0, 1}
@@ -0,0 +1,79 @@
+from conlang_tools.language.classes import RetryPolicy
+from conlang_tools.language.ledger import Ledger, ledger_path
+
+
+class TestLedgerPath:
+    def test_path(self):
+        assert ledger_path("example") == "languages/example.ledger.db"
+
+
+class TestLedger:
+    def test_add(self):
+        with Ledger() as ledger:
+            ledger.add("/ba/")
+            ledger.add("/ba/")
+            assert "/ba/" in ledger
+            assert "/da/" not in ledger
+            assert len(ledger) == 1
+
+    def test_update_and_list(self):
+        with Ledger() as ledger:
+            ledger.update(["/da/", "/ba/", "/di/"])
+            assert list(ledger) == ["/ba/", "/da/", "/di/"]
+            assert ledger.list(2) == ["/ba/", "/da/"]
+
+    def test_reset(self):
+        with Ledger() as ledger:
+            ledger.update(["/da/", "/ba/"])
+            ledger.reset()
+            assert len(ledger) == 0
+            assert ledger.list() == []
+
+    def test_persists(self, tmp_path):
+        path = str(tmp_path / "test.ledger.db")
+        with Ledger(path, batch_size=2) as ledger:
+            for word in ["/ba/", "/da/", "/di/"]:
+                ledger.add(word)
+        with Ledger(path) as ledger:
+            assert ledger.list() == ["/ba/", "/da/", "/di/"]
+            assert len(ledger) == 3
+
+
+class TestLanguageLedger:
+    def test_records_new_words(self, small_language, tmp_path):
+        path = str(tmp_path / "test.ledger.db")
+        small_language.use_ledger(path)
+        words = small_language.generate_new_words(5)
+        small_language.ledger.close()
+        with Ledger(path) as ledger:
+            assert ledger.list() == sorted(words)
+
+    def test_skips_words_from_earlier_runs(self, small_language, tmp_path):
+        path = str(tmp_path / "test.ledger.db")
+        with Ledger(path) as ledger:
+            ledger.update(["/ban/", "/bi/", "/bin/", "/da/"])
+        small_language.use_ledger(path)
+        policy = RetryPolicy(attempts=100, max_syllables=1, give_up="stop")
+        words = small_language.generate_new_words(10, policy=policy)
+        assert sorted(words) == ["/dan/", "/di/", "/din/"]
+
+    def test_skips_words_in_batches(self, small_language):
+        small_language.use_ledger(":memory:")
+        small_language.ledger.update(["/ban/", "/bi/", "/bin/", "/da/"])
+        policy = RetryPolicy(max_syllables=1, give_up="stop")
+        words = small_language.generate_new_words(10, policy=policy, mode="batch")
+        assert sorted(words) == ["/dan/", "/di/", "/din/"]
+
+    def test_skips_words_externally(self, small_language):
+        small_language.use_ledger(":memory:")
+        small_language.ledger.update(["/ban/", "/bi/", "/bin/", "/da/"])
+        words = list(small_language.iter_unique_candidates(200, 1, run_size=50))
+        assert words == ["/dan/", "/di/", "/din/"]
+        assert len(small_language.ledger) == 7
+
+    def test_min_distance(self, small_language):
+        small_language.use_ledger(":memory:")
+        small_language.ledger.update(["/din/"])
+        policy = RetryPolicy(max_syllables=1, give_up="stop", min_distance=2)
+        words = small_language.generate_new_words(10, policy=policy)
+        assert not {"/dan/", "/di/", "/bin/"} & set(words)
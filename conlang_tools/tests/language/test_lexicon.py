@@ -0,0 +1,136 @@
+import sys
+import pytest
+from conlang_tools.language.lexicon import (
+    EncodedLexicon,
+    Lexicon,
+    analyze_syllable,
+    phoneme_table,
+    spell,
+    split_word,
+)
+
+
+class TestAnalyzeSyllable:
+    def test_open_syllable(self):
+        analysis = analyze_syllable("ba")
+        assert [phoneme_table[i].symbol for i in analysis.phonemes] == ["b", "a"]
+        assert analysis.onset == "b"
+        assert analysis.nucleus == "a"
+        assert analysis.coda is None
+        assert analysis.open is True
+        assert analysis.weight == 0
+
+    def test_closed_syllable(self):
+        analysis = analyze_syllable("bab")
+        assert analysis.coda == "b"
+        assert analysis.open is False
+        assert analysis.weight == 1
+
+    def test_superheavy_syllable(self):
+        assert analyze_syllable("ba:b").weight == 2
+
+    def test_unrecognized(self):
+        with pytest.raises(ValueError):
+            analyze_syllable("b%")
+
+
+class TestSplitWord:
+    def test_split_word(self):
+        assert split_word("/ba.ˈbab/") == [("ba", False), ("bab", True)]
+
+    def test_split_word_brackets(self):
+        assert split_word("[ˈba]") == [("ba", True)]
+
+
+class TestEncodedLexicon:
+    @pytest.fixture
+    def lexicon(self):
+        return EncodedLexicon(["/ba/", "/ˈba.bab/", "/di.ˈku/"])
+
+    def test_len(self, lexicon):
+        assert len(lexicon) == 3
+
+    def test_empty(self):
+        assert len(EncodedLexicon()) == 0
+
+    def test_syllable_counts(self, lexicon):
+        assert lexicon.syllable_counts.tolist() == [1, 2, 2]
+
+    def test_phonemes(self, lexicon):
+        start, end = lexicon.syllable_offsets[2], lexicon.syllable_offsets[3]
+        symbols = [phoneme_table[i].symbol for i in lexicon.phonemes[start:end]]
+        assert symbols == ["b", "a", "b"]
+
+    def test_stressed(self, lexicon):
+        assert lexicon.stressed.tolist() == [False, True, False, False, True]
+
+    def test_elements(self, lexicon):
+        onsets = [lexicon.segments[i] for i in lexicon.element("onset")]
+        assert onsets == ["b", "b", "b", "d", "k"]
+        assert lexicon.element("coda").tolist().count(-1) == 4
+
+    def test_open(self, lexicon):
+        assert lexicon.open.tolist() == [True, True, False, True, True]
+
+
+class TestSpell:
+    def test_spell(self):
+        assert spell(bytes(analyze_syllable("ba:b").phonemes)) == "ba:b"
+
+
+class TestLexicon:
+    @pytest.fixture
+    def words(self):
+        return ["/ba/", "/ˈba.bab/", "/di.ˈku:/", "[ba]", "/b%/"]
+
+    @pytest.fixture
+    def lexicon(self, words):
+        return Lexicon(words)
+
+    def test_len(self, lexicon):
+        assert len(lexicon) == 5
+
+    def test_empty(self):
+        assert len(Lexicon()) == 0
+
+    def test_getitem(self, lexicon, words):
+        assert [lexicon[i] for i in range(len(words))] == words
+
+    def test_getitem_negative(self, lexicon):
+        assert lexicon[-4] == "/ˈba.bab/"
+
+    def test_getitem_slice(self, lexicon):
+        assert lexicon[1:3] == ["/ˈba.bab/", "/di.ˈku:/"]
+
+    def test_getitem_out_of_range(self, lexicon):
+        with pytest.raises(IndexError):
+            lexicon[5]
+
+    def test_iter(self, lexicon, words):
+        assert list(lexicon) == words
+
+    def test_eq(self, lexicon, words):
+        assert lexicon == words
+        assert words == lexicon
+        assert lexicon != words[:-1]
+
+    def test_contains(self, lexicon):
+        assert "/ˈba.bab/" in lexicon
+        assert "/bab/" not in lexicon
+
+    def test_exceptions(self, lexicon):
+        assert lexicon.exceptions == {3: "[ba]", 4: "/b%/"}
+
+    def test_append(self, lexicon):
+        lexicon.append("/ku/")
+        assert lexicon[5] == "/ku/"
+        assert len(lexicon) == 6
+
+    def test_stores_phonemes_compactly(self, lexicon):
+        assert len(lexicon.phonemes) == 11
+        assert lexicon.phonemes.itemsize == 1
+
+    def test_nbytes(self):
+        words = [f"/ˈba.ba{'b' * (i % 2)}/" for i in range(100)]
+        lexicon = Lexicon(words)
+        assert lexicon.nbytes < sum(sys.getsizeof(word) for word in words) / 4
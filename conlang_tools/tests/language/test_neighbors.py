@@ -0,0 +1,129 @@
+import random
+import pytest
+from conlang_tools.language.classes import RetryPolicy
+from conlang_tools.language.neighbors import (
+    NeighborIndex,
+    bounded_distance,
+    deletions,
+    phoneme_key,
+)
+from conlang_tools.utils.methods import phoneme_distance
+
+
+@pytest.fixture
+def small_onset():
+    return {"b": 1, "d": 1, "k": 1}
+
+
+@pytest.fixture
+def small_nucleus():
+    return {"a": 1, "i": 1}
+
+
+class TestPhonemeKey:
+    def test_ignores_stress_and_breaks(self):
+        assert phoneme_key("/ˈba.di/") == phoneme_key("/bad.i/")
+        assert len(phoneme_key("/ˈba.di/")) == 4
+
+    def test_unreadable(self):
+        assert phoneme_key("/:ɟ/") is None
+
+
+class TestDeletions:
+    def test_depth_one(self):
+        assert deletions(b"abc", 1) == {b"abc", b"bc", b"ac", b"ab"}
+
+    def test_depth_beyond_length(self):
+        assert b"" in deletions(b"ab", 3)
+
+
+class TestBoundedDistance:
+    def test_within_limit(self):
+        assert bounded_distance(b"kitten", b"sitting", 3) == 3
+
+    def test_beyond_limit(self):
+        assert bounded_distance(b"kitten", b"sitting", 1) == 2
+        assert bounded_distance(b"a", b"abcd", 1) == 2
+
+
+class TestNeighborIndex:
+    @pytest.fixture
+    def index(self):
+        return NeighborIndex(1, ["/ba.di/", "/kun/"])
+
+    def test_rejects_negative_radius(self):
+        with pytest.raises(ValueError):
+            NeighborIndex(-1)
+
+    def test_len(self, index):
+        index.add("/ˈba.di/")
+        assert len(index) == 2
+
+    def test_contains(self, index):
+        assert "/bad.i/" in index
+        assert "/ba.du/" not in index
+
+    def test_near(self, index):
+        assert index.near("/ba.di/")
+        assert index.near("/ba.du/")
+        assert index.near("/ba.dit/")
+        assert index.near("/ku/")
+        assert not index.near("/bu.du/")
+        assert not index.near("/ta/")
+
+    def test_neighbors(self, index):
+        assert index.neighbors("/ku.di/") == []
+        assert index.neighbors("/kin/") == [phoneme_key("/kun/")]
+
+    def test_agrees_with_phoneme_distance(self):
+        rng = random.Random(2)
+        syllables = ["ba", "bi", "dan", "di", "ka", "kin"]
+
+        def word():
+            count = rng.randint(1, 3)
+            return "/" + ".".join(rng.choice(syllables) for _ in range(count)) + "/"
+
+        words = [word() for _ in range(40)]
+        index = NeighborIndex(2, words)
+        for query in [word() for _ in range(40)]:
+            expected = any(phoneme_distance(query, w) <= 2 for w in words)
+            assert index.near(query) == expected
+
+
+class TestMinDistance:
+    def test_generates_distant_words(self, small_language):
+        policy = RetryPolicy(50, max_syllables=2, give_up="stop", min_distance=2)
+        words = small_language.generate_new_words(20, policy=policy)
+        everything = words + ["/ba/"]
+        for i, first in enumerate(everything):
+            for second in everything[i + 1 :]:
+                assert phoneme_distance(first, second) >= 2
+
+    def test_in_batches(self, small_language):
+        policy = RetryPolicy(max_syllables=2, give_up="stop", min_distance=2)
+        words = small_language.generate_new_words(20, policy=policy, mode="batch")
+        assert words
+        assert all(phoneme_distance(word, "/ba/") >= 2 for word in words)
+
+    def test_without_recording(self, small_language):
+        policy = RetryPolicy(max_syllables=1, give_up="stop", min_distance=2)
+        words = list(small_language.iter_new_words(policy=policy, record=False))
+        assert small_language.generated == []
+        for i, first in enumerate(words):
+            for second in words[i + 1 :]:
+                assert phoneme_distance(first, second) >= 2
+
+    def test_index_follows_words(self, small_language):
+        index = small_language.neighbors(1)
+        assert small_language.neighbors(1) is index
+        small_language.words.append("/kin/")
+        assert small_language.neighbors(1) is index
+        assert index.near("/kan/")
+        small_language.words = ["/da/"]
+        assert not small_language.neighbors(1).near("/kan/")
+
+    def test_index_follows_changed_words(self, small_language):
+        small_language.neighbors(1)
+        small_language.words[0] = "/kin/"
+        assert small_language.neighbors(1).near("/kan/")
+        assert not small_language.neighbors(1).near("/bi/")
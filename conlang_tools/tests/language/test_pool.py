@@ -0,0 +1,113 @@
+from collections import Counter
+import random
+import pytest
+from conlang_tools.language import classes
+from conlang_tools.language.classes import Language, Phonology, Phonotactics
+from conlang_tools.language.pool import SyllablePool, count_combinations, normalize
+from conlang_tools.utils.methods import weigh_syllables
+
+
+@pytest.fixture
+def small_nucleus():
+    return {"a": 2, "a:": 1}
+
+
+@pytest.fixture
+def small_stress():
+    return "heavy"
+
+
+@pytest.fixture
+def small_words():
+    return []
+
+
+class TestNormalize:
+    def test_normalize(self):
+        assert normalize({"a": 3, "b": 1, "c": 0}) == {"a": 0.75, "b": 0.25}
+
+
+class TestSyllablePool:
+    def test_syllables(self, small_language):
+        pool = SyllablePool(small_language)
+        assert len(pool) == 8
+        assert sum(pool.probabilities) == pytest.approx(1)
+        assert pool.probabilities[pool.ids["ba"]] == pytest.approx(0.25)
+
+    def test_metadata(self, small_language):
+        pool = SyllablePool(small_language)
+        assert pool.weigh(["ba", "ban", "ba:", "ba:n"]) == [0, 1, 1, 2]
+        assert pool.open[pool.ids["ba:"]] is True
+        assert pool.open[pool.ids["ba:n"]] is False
+
+    def test_weights_match_weigh_syllables(self, small_language):
+        pool = SyllablePool(small_language)
+        assert pool.weights == weigh_syllables(pool.syllables)
+
+    def test_only_weighs_heavy_stress(self, small_language):
+        small_language.phonology.stress = "initial"
+        assert SyllablePool(small_language).weights is None
+        assert SyllablePool(small_language, weigh=True).weights is not None
+
+    def test_sample_follows_probabilities(self, small_language):
+        pool = SyllablePool(small_language)
+        rng = random.Random(2)
+        counts = Counter(pool.sample(rng) for _ in range(4000))
+        assert 0.22 < counts["ba"] / 4000 < 0.28
+
+    def test_count_combinations(self, small_language):
+        assert count_combinations(small_language) == 8
+
+
+class TestLanguageSyllablePool:
+    def test_cached(self, small_language):
+        pool = small_language.syllable_pool()
+        assert small_language.syllable_pool() is pool
+        small_language.phonology.openness = 1
+        assert small_language.syllable_pool() is not pool
+        assert len(small_language.syllable_pool()) == 4
+
+    def test_follows_phonotactics(self, small_language):
+        pool = small_language.syllable_pool()
+        small_language.phonotactics.onset["g"] = 1
+        assert small_language.syllable_pool() is not pool
+        assert "ga" in small_language.syllable_pool().ids
+
+    def test_limit(self, small_language, monkeypatch):
+        monkeypatch.setattr(classes, "pool_limit", 4)
+        assert small_language.syllable_pool() is None
+        assert small_language.generate_syllable() in SyllablePool(small_language).ids
+
+    def test_unrecognized_segments(self):
+        lang = Language(
+            phonotactics=Phonotactics(
+                onset={"p": 1, "r": 1}, nucleus={"a": 1}, coda={"n": 1}
+            ),
+            phonology=Phonology(openness=0.5, stress="initial"),
+            rng=random.Random(1),
+        )
+        words = lang.generate_new_words(10, num_syllables=2)
+        assert any("r" in word for word in words)
+
+    def test_large_inventory(self):
+        lang = Language(
+            phonotactics=Phonotactics(
+                onset={f"p{i}": 1 for i in range(51)},
+                nucleus={f"a{i}": 1 for i in range(16)},
+                coda={f"n{i}": 1 for i in range(46)},
+            ),
+            phonology=Phonology(openness=0.5, stress="initial"),
+            rng=random.Random(1),
+        )
+        assert lang.syllable_pool() is None
+        assert len(lang.generate_new_words(10, num_syllables=2)) == 10
+
+    def test_generates_heavy_stress(self, small_language):
+        for _ in range(50):
+            word = small_language.generate_word(3)
+            syllables = [s.lstrip("ˈ") for s in word.strip("/").split(".")]
+            assert small_language.apply_stress(syllables) == word.strip("/").split(".")
+
+    def test_word_space_shares_pool(self, small_language):
+        pool = small_language.syllable_pool()
+        assert small_language.word_space(2).syllables is pool.syllables
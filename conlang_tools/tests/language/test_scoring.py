@@ -0,0 +1,84 @@
+import math
+import numpy as np
+import pytest
+from conlang_tools.language.classes import RetryPolicy
+from conlang_tools.language.lexicon import EncodedLexicon
+from conlang_tools.language.scoring import log_odds, score_lexicon, score_words
+from conlang_tools.utils.methods import phoneme_distance
+
+
+@pytest.fixture
+def small_nucleus():
+    return {"a": 1, "i": 1}
+
+
+@pytest.fixture
+def small_openness():
+    return 0.75
+
+
+class TestLogOdds:
+    def test_segments(self):
+        odds = log_odds({"a": 3, "b": 1, "c": 0}, ["b", "a", "c"])
+        assert odds[:2] == pytest.approx([math.log(0.25), math.log(0.75)])
+        assert odds[2] == -np.inf
+
+    def test_empty_segment(self):
+        assert log_odds({"b": 1}, ["b"])[-1] == -np.inf
+        assert log_odds({"": 1, "b": 1}, ["b"])[-1] == pytest.approx(math.log(0.5))
+
+    def test_no_weights(self):
+        assert (log_odds({}, ["a"]) == -np.inf).all()
+
+
+class TestScoreWords:
+    def test_scores(self, small_language):
+        scores = score_words(small_language, ["/ba/", "/din/", "/ˈba.ba/"])
+        ba = math.log(0.75 * 0.5 * 0.75)
+        din = math.log(0.25 * 0.5 * 0.25)
+        assert scores == pytest.approx([ba, din, 2 * ba])
+
+    def test_impossible(self, small_language):
+        scores = score_words(small_language, ["/ka/", "/a/", "/bam/"])
+        assert (scores == -np.inf).all()
+
+    def test_openness(self, small_language):
+        small_language.phonology.openness = 1
+        scores = score_words(small_language, ["/ba/", "/ban/"])
+        assert scores[0] == pytest.approx(math.log(0.375))
+        assert scores[1] == -np.inf
+
+    def test_empty(self, small_language):
+        assert len(score_lexicon(small_language, EncodedLexicon([]))) == 0
+
+    def test_language_score(self, small_language):
+        assert small_language.score(["/ba/"])[0] == pytest.approx(math.log(0.28125))
+
+
+class TestRankNewWords:
+    def test_most_typical(self, small_language):
+        words = small_language.rank_new_words(3, 2)
+        assert all(word.count("b") == 2 for word in words)
+        scores = small_language.score(words)
+        assert list(scores) == sorted(scores, reverse=True)
+        assert scores[0] == pytest.approx(2 * math.log(0.28125))
+        assert small_language.generated == words
+
+    def test_least_typical(self, small_language):
+        words = small_language.rank_new_words(3, 1, oversample=50, typical=False)
+        assert set(words[:2]) == {"/din/", "/dan/"}
+        scores = small_language.score(words)
+        assert list(scores) == sorted(scores)
+
+    def test_skips_known_words(self, small_language):
+        words = small_language.rank_new_words(10, 1, oversample=50)
+        assert "/ba/" not in words
+        assert len(words) == len(set(words)) == 7
+
+    def test_min_distance(self, small_language):
+        policy = RetryPolicy(min_distance=2)
+        words = small_language.rank_new_words(5, 2, policy=policy, record=False)
+        assert small_language.generated == []
+        for i, first in enumerate(words):
+            for second in words[i + 1 :]:
+                assert phoneme_distance(first, second) >= 2
@@ -0,0 +1,49 @@
+import pytest
+from conlang_tools.language.lexicon import EncodedLexicon
+from conlang_tools.language.statistics import (
+    count_segments,
+    count_stress_positions,
+    count_syllables,
+    measure_openness,
+)
+
+
+class TestStatistics:
+    @pytest.fixture
+    def lexicon(self):
+        return EncodedLexicon(["/ba/", "/bab/", "/bwa/", "/ˈbwa.ma/"])
+
+    def test_measure_openness(self, lexicon):
+        assert measure_openness(lexicon) == 0.8
+
+    def test_measure_openness_empty(self):
+        assert measure_openness(EncodedLexicon()) == 0
+
+    def test_count_syllables(self, lexicon):
+        assert count_syllables(lexicon) == {1: 3, 2: 1}
+
+    def test_count_segments(self, lexicon):
+        assert count_segments(lexicon, "onset") == {"b": 2, "bw": 2, "m": 1}
+        assert count_segments(lexicon, "coda") == {"b": 1}
+
+    def test_count_segments_first_appearance_order(self):
+        lexicon = EncodedLexicon(["/ku/", "/ba/", "/ba/", "/ki/"])
+        assert list(count_segments(lexicon, "onset")) == ["k", "b"]
+
+    def test_count_segments_empty(self):
+        assert count_segments(EncodedLexicon(["/ba/"]), "coda") == {}
+
+    def test_count_stress_positions(self):
+        words = ["/ba/", "/ˈba:.ba/", "/ba.ˈbab/", "/ˈba:b.ba:.bab.ba/", "/ba:.ˈba/"]
+        positions = count_stress_positions(EncodedLexicon(words))
+        assert positions == {
+            "initial": 3,
+            "final": 3,
+            "penultimate": 2,
+            "antepenultimate": 2,
+            "heavy": 4,
+        }
+
+    def test_count_stress_positions_empty(self):
+        positions = count_stress_positions(EncodedLexicon())
+        assert all(count == 0 for count in positions.values())
@@ -0,0 +1,250 @@
+from collections import Counter
+from itertools import islice
+import random
+import pytest
+from conlang_tools.language.classes import (
+    Language,
+    Phonology,
+    Phonotactics,
+    RetryPolicy,
+)
+from conlang_tools.language.wordspace import WordSpace
+
+
+@pytest.fixture
+def small_words():
+    return ["/ba/", "/ˈba.di/"]
+
+
+class TestWordSpace:
+    def test_rejects_no_syllables(self, small_language):
+        with pytest.raises(ValueError):
+            WordSpace(small_language, 0)
+
+    def test_syllables(self, small_language):
+        space = WordSpace(small_language, 1)
+        assert set(space.syllables) == {
+            "ba",
+            "ban",
+            "bi",
+            "bin",
+            "da",
+            "dan",
+            "di",
+            "din",
+        }
+        assert sum(space.probabilities) == pytest.approx(1)
+        assert space.probabilities[space.syllable_ids["ba"]] == pytest.approx(0.25)
+
+    def test_size(self, small_language):
+        assert WordSpace(small_language, 1).size == 8
+        assert WordSpace(small_language, 3).size == 512
+
+    def test_size_random_stress(self, small_language):
+        small_language.phonology.stress = "random"
+        assert WordSpace(small_language, 1).size == 8
+        assert WordSpace(small_language, 3).size == 512 * 3
+
+    def test_size_without_closed_syllables(self, small_language):
+        small_language.phonology.openness = 1
+        assert WordSpace(small_language, 2).size == 16
+
+    def test_remaining(self, small_language):
+        assert WordSpace(small_language, 1).remaining == 7
+        assert WordSpace(small_language, 2).remaining == 63
+
+    def test_remaining_follows_language(self, small_language):
+        space = WordSpace(small_language, 1)
+        small_language.generated.append("/di/")
+        assert space.remaining == 6
+        small_language.words = []
+        assert space.remaining == 7
+
+    def test_remaining_follows_changed_words(self, small_language):
+        space = WordSpace(small_language, 1)
+        small_language.words[0] = "/di/"
+        assert space.remaining == 7
+        assert "/di/" not in {space.spell(space.draw_weighted()) for _ in range(50)}
+
+    def test_digits_round_trip(self, small_language):
+        space = WordSpace(small_language, 3)
+        assert all(space.index(space.digits(i)) == i for i in range(space.size))
+
+    def test_parse_round_trip(self, small_language):
+        space = WordSpace(small_language, 2)
+        words = [space.spell(space.digits(i)) for i in range(space.size)]
+        assert len(set(words)) == space.size
+        assert all(space.parse(word) == space.digits(i) for i, word in enumerate(words))
+
+    def test_parse_wrong_stress(self, small_language):
+        space = WordSpace(small_language, 2)
+        assert "/ˈba.di/" in space
+        assert "/ba.ˈdi/" not in space
+        assert "/ˈbu.di/" not in space
+
+    def test_spell_heavy_stress(self, small_language):
+        small_language.phonology.stress = "heavy"
+        space = WordSpace(small_language, 2)
+        assert space.spell((space.syllable_ids["ba"], space.syllable_ids["ban"])) == (
+            "/ba.ˈban/"
+        )
+
+    def test_sample_fills_space(self, small_language):
+        space = WordSpace(small_language, 2)
+        rng = random.Random(1)
+        words = [space.sample(rng=rng) for _ in range(63)]
+        assert len(set(words)) == 63
+        assert "/ˈba.di/" not in words
+        assert all(word in space for word in words)
+        assert small_language.generated == words
+        with pytest.raises(ValueError):
+            space.sample()
+
+    def test_sample_weighted_fills_space(self, small_language):
+        small_language.phonology.stress = "random"
+        space = WordSpace(small_language, 2)
+        words = space.sample_many(1000, weighted=True, rng=random.Random(2))
+        assert len(words) == len(set(words)) == 127
+        assert space.remaining == 0
+
+    def test_draw_weighted_skips_used_mass(self, small_language):
+        # The two used words have 0.125 of the mass between them, all of it
+        # under a b, so b is left with 0.625 of the 0.875 still free.
+        small_language.words = ["/ˈba.ba/", "/ˈban.ba/"]
+        space = WordSpace(small_language, 2)
+        space.scan_digit = None
+        rng = random.Random(4)
+        draws = [space.draw_weighted(rng) for _ in range(2000)]
+        onsets = Counter(space.syllables[digits[0]][0] for digits in draws)
+        assert 0.68 < onsets["b"] / 2000 < 0.75
+        assert not {"/ˈba.ba/", "/ˈban.ba/"} & {space.spell(d) for d in draws}
+
+    def test_sample_weighted_follows_weights(self, small_language):
+        rng = random.Random(3)
+        small_language.words = []
+        space = WordSpace(small_language, 1)
+        onsets = Counter()
+        for _ in range(2000):
+            onsets[space.sample(weighted=True, rng=rng)[1]] += 1
+            small_language.generated.clear()
+        assert 0.70 < onsets["b"] / 2000 < 0.80
+
+    def test_language_caches_word_space(self, small_language):
+        space = small_language.word_space(2)
+        assert small_language.word_space(2) is space
+        small_language.phonotactics.onset["g"] = 1
+        assert small_language.word_space(2) is not space
+        assert small_language.word_space(2).size == 144
+
+
+class TestBestFirst:
+    def test_lists_every_word_once(self, small_language):
+        small_language.phonology.stress = "random"
+        space = WordSpace(small_language, 2)
+        rows = list(space.best_first())
+        assert len(rows) == len(set(rows)) == space.size
+
+    def test_most_likely_first(self, small_language):
+        space = WordSpace(small_language, 3)
+        weights = [space.weight(digits) for digits in space.best_first()]
+        assert weights == sorted(weights, reverse=True)
+        assert space.spell(next(space.best_first())) == "/ˈba.ba.ba/"
+
+    def test_is_lazy(self, small_language):
+        small_language.phonotactics.onset = {c: 1 for c in "bdgkmnpst"}
+        space = WordSpace(small_language, 12)
+        first = list(islice(space.best_first(), 5))
+        assert len(first) == 5
+        assert space.size > 10**18
+
+
+class TestIterExhaustive:
+    def test_lists_new_words(self, small_language):
+        words = list(small_language.iter_exhaustive(1))
+        assert len(words) == len(set(words)) == 7
+        assert "/ba/" not in words
+        assert words[0] == "/ban/"
+        assert small_language.generated == words
+
+    def test_limit(self, small_language):
+        words = list(small_language.iter_exhaustive(2, limit=3))
+        assert words == ["/ˈba.ba/", "/ˈba.ban/", "/ˈban.ba/"]
+        more = list(small_language.iter_exhaustive(2, limit=1))
+        assert more == ["/ˈban.ban/"]
+
+
+class TestSaturation:
+    def test_saturation(self, small_language):
+        saturation = WordSpace(small_language, 1).saturation()
+        assert saturation.size == 8
+        assert saturation.used == 1
+        assert saturation.free == pytest.approx(0.75)
+        assert not saturation.full
+
+    def test_full(self, small_language):
+        small_language.generated.extend(["/ban/", "/bi/", "/bin/", "/da/"])
+        small_language.generated.extend(["/dan/", "/di/", "/din/"])
+        saturation = small_language.saturation(1)
+        assert saturation.full
+        assert saturation.free == 0
+
+    def test_follows_claimed_words(self, small_language):
+        policy = RetryPolicy(attempts=100)
+        words = list(small_language.iter_new_words(1, 3, policy, record=False))
+        assert small_language.generated == []
+        assert small_language.saturation(1).used == 4
+        assert all(word in small_language.word_space(1) for word in words)
+
+    def test_counts_ledger_words(self, small_language):
+        small_language.use_ledger(":memory:")
+        small_language.ledger.update(["/ban/", "/bi/", "/ˈbin.bin/"])
+        assert small_language.saturation(1).used == 3
+        small_language.generate_new_word(1)
+        assert small_language.saturation(1).used == 4
+
+    def test_tracks_only_filling_lengths(self, small_language):
+        assert small_language.tracked_space(1) is not None
+        assert small_language.tracked_space(2) is None
+        assert 2 not in small_language._word_spaces
+
+    def test_skips_empty_spaces(self):
+        lang = Language(
+            phonotactics=Phonotactics(
+                onset={"b": 1, "d": 1}, nucleus={"a": 1, "i": 1}, coda={"n": 1}
+            ),
+            phonology=Phonology(openness=0.5, stress="initial"),
+        )
+        assert lang.generate_new_word(1) is not None
+        assert lang._word_spaces == {}
+
+    def test_skips_full_lengths(self, small_language):
+        small_language.words = ["/ba/", "/ban/", "/bi/", "/bin/"]
+        small_language.words += ["/da/", "/dan/", "/di/", "/din/"]
+        lengths = []
+        generate_word = small_language.generate_word
+        small_language.generate_word = lambda n: lengths.append(n) or generate_word(n)
+        word = small_language.generate_new_word(1)
+        assert word.count(".") == 1
+        assert 1 not in lengths
+
+    def test_nearly_full_length(self, small_language):
+        # Only /din/ is left, and ten attempts would all miss it with
+        # probability (1 - 1/24) ** 10, or about 0.65.
+        rng = random.Random(5)
+        words = []
+        for _ in range(400):
+            lang = Language(
+                phonotactics=small_language.phonotactics,
+                phonology=small_language.phonology,
+                words=["/ba/", "/ban/", "/bi/", "/bin/", "/da/", "/dan/", "/di/"],
+                rng=rng,
+            )
+            words.append(lang.generate_new_word(1))
+        longer = sum("." in word for word in words)
+        assert 220 < longer < 300
+        assert words.count("/din/") == 400 - longer
+
+    def test_fills_length_in_batches(self, small_language):
+        words = small_language.generate_new_words(40, mode="batch")
+        assert len(set(words)) == 40
+        assert sum("." not in word for word in words) == 7
@@ -1,12 +1,16 @@
 from typing import List
+import random
 import pytest
 from conlang_tools.language.classes import Phonology, Phonotactics, Language
 from conlang_tools.phonemes.collections import get_vowel
 from conlang_tools.phonemes.phonemes import Phoneme
 from conlang_tools.phonemes.roots import Root
+from conlang_tools.phonemes.vowels import Vowel
+from conlang_tools.soundchanges import changes
 from conlang_tools.soundchanges.changes import (
     change,
     apply_change,
+    apply_random_change,
     describe_vowel_change,
     get_affected_syllables,
     devoicing,
@@ -58,6 +62,32 @@ class TestApplyChange:
         new_words = apply_change(example_language, evaluator, transformer)
         assert new_words[0] == "/ba:/"
 
+    def test_apply_change_reuses_unchanged_words(self, example_language):
+        def evaluator(root: Root, si: int, pi: int, phoneme: Phoneme) -> bool:
+            return False
+
+        def transformer(
+            root: Root, si: int, pi: int, phoneme: Phoneme
+        ) -> List[Phoneme]:
+            return [phoneme]
+
+        new_words = apply_change(example_language, evaluator, transformer)
+        assert new_words[0] is example_language.words[0]
+
+    def test_apply_change_candidates(self, example_language):
+        example_language.words = ["/ba/", "/bo/", "[bo]"]
+
+        def evaluator(root: Root, si: int, pi: int, phoneme: Phoneme) -> bool:
+            return isinstance(phoneme, Vowel)
+
+        def transformer(
+            root: Root, si: int, pi: int, phoneme: Phoneme
+        ) -> List[Phoneme]:
+            return [get_vowel("a:")]
+
+        new_words = apply_change(example_language, evaluator, transformer, {0})
+        assert new_words == ["/ba:/", "/bo/", "/ba:/"]
+
 
 class TestDescribeVowelChange:
     @pytest.fixture
@@ -105,6 +135,11 @@ class TestGetAffectedSyllables:
     def test_random(self):
         assert get_affected_syllables() in ["all", "stressed"]
 
+    def test_rng(self):
+        first = [get_affected_syllables(rng=random.Random(4)) for _ in range(20)]
+        second = [get_affected_syllables(rng=random.Random(4)) for _ in range(20)]
+        assert first == second
+
 
 class TestErosionCodaStopsFollwedByConsonant:
     @pytest.fixture
@@ -546,6 +581,13 @@ class TestPalatalization:
         assert "**Palatalization:** Front vowels turned" in description
         assert len(words) == len(example_language.words)
 
+    def test_palatalization_uses_language_rng(self, example_language):
+        example_language.rng = random.Random(5)
+        first = [palatalization(example_language)[0] for _ in range(10)]
+        example_language.rng = random.Random(5)
+        second = [palatalization(example_language)[0] for _ in range(10)]
+        assert first == second
+
 
 class TestVelarAssimilation:
     @pytest.fixture
@@ -943,3 +985,10 @@ class TestChange:
         assert isinstance(description, str)
         assert all(isinstance(word, str) for word in words)
         assert len(words) == len(example_language.words)
+
+    def test_reuses_sampler(self, example_language):
+        choices = {"first": (1, lambda lang: ("First", [])), "second": (0, None)}
+        assert apply_random_change(example_language, choices) == ("First", [])
+        sampler = changes._samplers[(("first", 1), ("second", 0))]
+        apply_random_change(example_language, dict(choices))
+        assert changes._samplers[(("first", 1), ("second", 0))] is sampler
@@ -1,7 +1,9 @@
 import csv
 import io
+import random
 import pytest
 from conlang_tools.language.classes import Language, Phonology, Phonotactics
+from conlang_tools.language.lexicon import Lexicon
 from conlang_tools.soundchanges.history import History
 
 
@@ -45,6 +47,48 @@ class TestHistory:
         assert new_lang.words == example_history.stages[3]
         assert new_lang != example_language
 
+    def test_steps_array_storage(self, example_language):
+        example_language.words = Lexicon(example_language.words)
+        history = History(example_language)
+        new_lang = history.steps(3)
+        assert all(isinstance(stage, Lexicon) for stage in history.stages)
+        assert isinstance(new_lang.words, Lexicon)
+        assert new_lang.words == history.stages[3]
+
+    def test_intern(self, example_history):
+        first = "".join(["/ba", "/"])
+        second = "".join(["/ba", "/"])
+        assert first is not second
+        interned = example_history.intern([first, second, "/bo/"])
+        assert interned[0] is interned[1]
+
+    def test_intern_reuses_existing_words(self, example_history, example_language):
+        words = ["".join(["/ba", "/"])]
+        assert example_history.intern(words)[0] is example_language.words[1]
+
+    def test_stages_share_unchanged_words(self, example_history):
+        example_history.steps(3)
+        for word in example_history.stages[3]:
+            if word in example_history.stages[0]:
+                index = example_history.stages[0].index(word)
+                assert word is example_history.stages[0][index]
+
+    def test_memory_report(self, example_history):
+        example_history.stages.append(list(example_history.stages[0]))
+        report = example_history.memory_report()
+        assert report.stages == 2
+        assert report.words == 4
+        assert report.strings == 2
+        assert report.unshared_bytes == 2 * report.string_bytes
+        assert report.storage_bytes > 0
+
+    def test_memory_report_array_storage(self, example_language):
+        example_language.words = Lexicon(example_language.words)
+        report = History(example_language).memory_report()
+        assert report.words == 2
+        assert report.strings == 0
+        assert report.storage_bytes == example_language.words.nbytes
+
     def test_csv(self, example_history):
         example_history.step()
         example_history.step()
@@ -57,3 +101,22 @@ class TestHistory:
         assert example_history.stages[3][0] is not None
         assert first_row[3] == str(example_history.stages[3][0])
         obj.close()
+
+    def test_steps_share_language_rng(self, example_language):
+        example_language.rng = random.Random(6)
+        new_lang = History(example_language).steps(3)
+        assert new_lang.rng is example_language.rng
+
+    def test_seeded_history_is_reproducible(self, example_language):
+        def run(seed):
+            lang = Language(
+                phonotactics=example_language.phonotactics,
+                phonology=example_language.phonology,
+                words=list(example_language.words),
+                rng=random.Random(seed),
+            )
+            history = History(lang)
+            history.steps(5)
+            return history.log, [list(stage) for stage in history.stages]
+
+        assert run(7) == run(7)
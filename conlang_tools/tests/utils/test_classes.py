@@ -0,0 +1,168 @@
+from collections import Counter
+import random
+import pytest
+from conlang_tools.utils.classes import (
+    BloomFilter,
+    VersionedDict,
+    VersionedList,
+    WeightedSampler,
+    appended,
+    snapshot,
+)
+
+
+class TestVersionedList:
+    def test_behaves_like_list(self):
+        items = VersionedList(["a"])
+        assert items == ["a"]
+        assert items.version == 0
+
+    def test_append_keeps_version(self):
+        items = VersionedList()
+        items.append("a")
+        items.extend(["b"])
+        items += ["c"]
+        assert items == ["a", "b", "c"]
+        assert items.version == 0
+
+    def test_setitem_changes_version(self):
+        items = VersionedList(["a"])
+        items[0] = "b"
+        assert items.version == 1
+
+    def test_delitem_changes_version(self):
+        items = VersionedList(["a"])
+        del items[0]
+        assert items.version == 1
+
+
+class TestAppended:
+    def test_appended(self):
+        items = VersionedList(["a"])
+        mark = snapshot(items)
+        items.append("b")
+        assert appended(items, mark) == ["b"]
+
+    def test_starts_over(self):
+        items = VersionedList(["a", "b"])
+        assert appended(items, None) is None
+        assert appended(VersionedList(["a", "b"]), snapshot(items)) is None
+        mark = snapshot(items)
+        items[0] = "c"
+        assert appended(items, mark) is None
+        mark = snapshot(items)
+        items.pop()
+        assert appended(items, mark) is None
+
+    def test_plain_list(self):
+        items = ["a"]
+        mark = snapshot(items)
+        items.append("b")
+        assert appended(items, mark) == ["b"]
+
+
+class TestVersionedDict:
+    def test_behaves_like_dict(self):
+        dictionary = VersionedDict({"a": 1})
+        assert dictionary == {"a": 1}
+        assert isinstance(dictionary, dict)
+
+    def test_starts_at_version_0(self):
+        assert VersionedDict({"a": 1}).version == 0
+
+    def test_setitem_changes_version(self):
+        dictionary = VersionedDict()
+        dictionary["a"] = 1
+        assert dictionary.version == 1
+
+    def test_delitem_changes_version(self):
+        dictionary = VersionedDict({"a": 1})
+        del dictionary["a"]
+        assert dictionary.version == 1
+
+    def test_update_changes_version(self):
+        dictionary = VersionedDict()
+        dictionary.update({"a": 1})
+        assert dictionary.version == 1
+
+    def test_pop_changes_version(self):
+        dictionary = VersionedDict({"a": 1})
+        dictionary.pop("a")
+        assert dictionary.version == 1
+
+    def test_clear_changes_version(self):
+        dictionary = VersionedDict({"a": 1})
+        dictionary.clear()
+        assert dictionary.version == 1
+
+    def test_setdefault_existing_key_keeps_version(self):
+        dictionary = VersionedDict({"a": 1})
+        assert dictionary.setdefault("a", 2) == 1
+        assert dictionary.version == 0
+
+    def test_calls_on_change(self):
+        calls = []
+        dictionary = VersionedDict(on_change=lambda: calls.append(True))
+        dictionary["a"] = 1
+        assert len(calls) == 1
+
+
+class TestWeightedSampler:
+    def test_skips_zero_weights(self):
+        sampler = WeightedSampler({"a": 3, "b": 0})
+        assert sampler.keys == ["a"]
+        assert sampler.sample() == "a"
+
+    def test_empty_raises(self):
+        with pytest.raises(IndexError):
+            WeightedSampler({}).sample()
+
+    def test_alias_table_preserves_weights(self):
+        weights = {"a": 5, "b": 3, "c": 1, "d": 1}
+        sampler = WeightedSampler(weights)
+        shares = Counter()
+        for column, key in enumerate(sampler.keys):
+            shares[key] += sampler.probabilities[column]
+            alias = sampler.keys[sampler.aliases[column]]
+            shares[alias] += 1 - sampler.probabilities[column]
+        for key, weight in weights.items():
+            assert shares[key] / len(sampler) == pytest.approx(weight / 10)
+
+    def test_sample_follows_weights(self):
+        sampler = WeightedSampler({"a": 3000, "b": 1000})
+        rng = random.Random(1)
+        draws = Counter(sampler.sample(rng) for _ in range(10000))
+        assert 0.72 < draws["a"] / 10000 < 0.78
+
+    def test_reproducible_with_rng(self):
+        sampler = WeightedSampler({"a": 1, "b": 1, "c": 1})
+        first = [sampler.sample(random.Random(7)) for _ in range(5)]
+        second = [sampler.sample(random.Random(7)) for _ in range(5)]
+        assert first == second
+
+
+class TestBloomFilter:
+    def test_contains_added(self):
+        bloom = BloomFilter(100, items=["/ba/", "/ka/"])
+        assert "/ba/" in bloom
+        assert "/ka/" in bloom
+        assert len(bloom) == 2
+
+    def test_does_not_contain_others(self):
+        bloom = BloomFilter(100, items=["/ba/"])
+        assert "/da/" not in bloom
+
+    def test_sizing(self):
+        bloom = BloomFilter(1000, 0.01)
+        assert bloom.size == 9586
+        assert bloom.hashes == 7
+        assert bloom.nbytes == 1199
+
+    def test_error_rate(self):
+        bloom = BloomFilter(5000, 0.01, items=[f"/in{i}/" for i in range(5000)])
+        mistakes = sum(f"/out{i}/" in bloom for i in range(10000))
+        assert mistakes / 10000 < 0.02
+
+    def test_rejects_bad_error_rate(self):
+        with pytest.raises(ValueError):
+            BloomFilter(100, 0)
@@ -0,0 +1,54 @@
+import os
+import random
+from conlang_tools.utils.external import (
+    collapse,
+    external_unique,
+    read_run,
+    spill,
+    write_run,
+)
+
+
+class TestWriteRun:
+    def test_sorts_and_dedupes(self, tmp_path):
+        path = write_run(["/ka/", "/ba/", "/ka/"], str(tmp_path))
+        assert list(read_run(path)) == [("/ba/", 0), ("/ka/", 0)]
+
+
+class TestSpill:
+    def test_splits_into_runs(self, tmp_path):
+        paths = spill(["/e/", "/d/", "/c/", "/b/", "/a/"], 2, str(tmp_path))
+        assert len(paths) == 3
+        assert [item for item, _ in read_run(paths[0])] == ["/d/", "/e/"]
+
+
+class TestCollapse:
+    def test_merges_runs(self, tmp_path):
+        items = [f"/{i % 20}/" for i in range(100)]
+        paths = collapse(spill(items, 5, str(tmp_path)), str(tmp_path), 3)
+        assert len(paths) <= 3
+        merged = sorted(item for path in paths for item, _ in read_run(path))
+        assert set(merged) == set(items)
+
+
+class TestExternalUnique:
+    def test_dedupes(self):
+        items = ["/ka/", "/ba/", "/ka/", "/da/", "/ba/"]
+        assert list(external_unique(items, run_size=2)) == ["/ba/", "/da/", "/ka/"]
+
+    def test_excludes(self):
+        items = ["/ka/", "/ba/", "/ka/", "/da/"]
+        exclude = ["/ka/", "/ga/"]
+        assert list(external_unique(items, exclude, run_size=2)) == ["/ba/", "/da/"]
+
+    def test_matches_set(self):
+        rng = random.Random(1)
+        items = [f"/{rng.randrange(500)}/" for _ in range(2000)]
+        exclude = [f"/{rng.randrange(500)}/" for _ in range(100)]
+        result = list(external_unique(items, exclude, run_size=64, fan_in=4))
+        assert result == sorted(set(items) - set(exclude))
+
+    def test_cleans_up(self, tmp_path):
+        result = list(external_unique(["/b/", "/a/"], directory=str(tmp_path)))
+        assert result == ["/a/", "/b/"]
+        assert os.listdir(tmp_path) == []
@@ -1,6 +1,9 @@
 from conlang_tools.utils.methods import (
+    edit_distance,
     get_choices,
     oxford_comma,
+    phoneme_distance,
+    shard,
     weigh_syllable,
     weigh_syllables,
 )
@@ -12,6 +15,32 @@ class TestGetChoices:
         assert "-".join(get_choices(dictionary)) == "a-a-a-b-b-c"
 
 
+class TestEditDistance:
+    def test_identical(self):
+        assert edit_distance("abc", "abc") == 0
+
+    def test_substitution(self):
+        assert edit_distance("abc", "abd") == 1
+
+    def test_insertion_and_deletion(self):
+        assert edit_distance("abc", "ab") == 1
+        assert edit_distance("ab", "abc") == 1
+
+    def test_empty(self):
+        assert edit_distance([], ["a", "b"]) == 2
+
+    def test_sequences(self):
+        assert edit_distance(["t", "a:"], ["d", "a:", "b"]) == 2
+
+
+class TestPhonemeDistance:
+    def test_counts_phonemes(self):
+        assert phoneme_distance("/ba/", "/ba:/") == 1
+
+    def test_ignores_markings(self):
+        assert phoneme_distance("/ˈba.ba/", "/bab.a/") == 0
+
+
 class TestOxfordComma:
     def test_empty_list(self):
         assert oxford_comma([]) == ""
@@ -27,6 +56,18 @@ class TestOxfordComma:
         assert oxford_comma(["this", "that", "the other"]) == expected
 
 
+class TestShard:
+    def test_splits_evenly(self):
+        assert shard([1, 2, 3, 4, 5], 2) == [[1, 2, 3], [4, 5]]
+
+    def test_keeps_order(self):
+        items = list(range(10))
+        assert [i for part in shard(items, 3) for i in part] == items
+
+    def test_skips_empty_shards(self):
+        assert shard([1, 2], 4) == [[1], [2]]
+
+
 class TestWeighSyllable:
     def test_weigh_syllable_normal_0(self):
         assert weigh_syllable("ba") == 0
@@ -0,0 +1,207 @@
+from hashlib import blake2b
+from math import ceil, log
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+import random
+
+
+class VersionedList(list):
+    # A list that counts changes to the items it already holds, so caches
+    # built from it can tell when they're stale. Appending doesn't count,
+    # since caches can see that from its length and catch up.
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.version = 0
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+
+    def __imul__(self, other):
+        result = super().__imul__(other)
+        self.version += 1
+        return result
+
+    def insert(self, index, value):
+        super().insert(index, value)
+        self.version += 1
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        self.version += 1
+        return result
+
+    def remove(self, value):
+        super().remove(value)
+        self.version += 1
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+    def reverse(self):
+        super().reverse()
+        self.version += 1
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self.version += 1
+
+
+class Snapshot(NamedTuple):
+    # Where a sequence stood when something was built from it.
+    items: Sequence[str]
+    length: int
+    version: int
+
+
+def snapshot(items: Sequence[str]) -> Snapshot:
+    return Snapshot(items, len(items), getattr(items, "version", 0))
+
+
+def appended(items: Sequence[str], mark: Optional[Snapshot]) -> Optional[Sequence[str]]:
+    # What's been appended to items since mark was taken, or None if items
+    # has since been replaced, shrunk or changed in place, so anything built
+    # from it has to start over.
+    if (
+        mark is None
+        or mark.items is not items
+        or mark.version != getattr(items, "version", 0)
+        or mark.length > len(items)
+    ):
+        return None
+    return items[mark.length :]
+
+
+class VersionedDict(dict):
+    def __init__(self, *args, on_change: Optional[Callable[[], None]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+        self.on_change = on_change
+
+    def touch(self) -> None:
+        self.version += 1
+        if self.on_change is not None:
+            self.on_change()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.touch()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.touch()
+
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self.touch()
+        return result
+
+    def clear(self):
+        super().clear()
+        self.touch()
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        self.touch()
+        return result
+
+    def popitem(self):
+        result = super().popitem()
+        self.touch()
+        return result
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        super().setdefault(key, default)
+        self.touch()
+        return default
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.touch()
+
+
+class WeightedSampler:
+    def __init__(self, weights: Dict[str, int | float]):
+        # Vose's alias method: every draw picks a column uniformly, then
+        # either keeps it or takes its alias, so it costs the same no matter
+        # how many keys there are or how large their weights get.
+        self.keys: List[str] = [key for key, weight in weights.items() if weight > 0]
+        self.probabilities: List[float] = [1.0] * len(self.keys)
+        self.aliases: List[int] = list(range(len(self.keys)))
+
+        total = sum(weights[key] for key in self.keys)
+        scaled = [weights[key] * len(self.keys) / total for key in self.keys]
+        small = [i for i, value in enumerate(scaled) if value < 1]
+        large = [i for i, value in enumerate(scaled) if value >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probabilities[less] = scaled[less]
+            self.aliases[less] = more
+            scaled[more] -= 1 - scaled[less]
+            (small if scaled[more] < 1 else large).append(more)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def sample(self, rng: Optional[random.Random] = None) -> str:
+        if not self.keys:
+            raise IndexError("Cannot choose from an empty sequence")
+        draw = (rng or random).random() * len(self.keys)
+        column = min(int(draw), len(self.keys) - 1)
+        if draw - column < self.probabilities[column]:
+            return self.keys[column]
+        return self.keys[self.aliases[column]]
+
+
+class BloomFilter:
+    def __init__(
+        self, capacity: int, error_rate: float = 0.001, items: Iterable[str] = ()
+    ):
+        if not 0 < error_rate < 1:
+            raise ValueError("A Bloom filter's error rate must be between 0 and 1.")
+        # The standard sizing: enough bits and hashes that, once it holds
+        # `capacity` items, a new item is mistaken for one already in it with
+        # probability `error_rate`.
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(ceil(-self.capacity * log(error_rate) / log(2) ** 2), 8)
+        self.hashes = max(round(self.size / self.capacity * log(2)), 1)
+        self.bits = bytearray(ceil(self.size / 8))
+        self.count = 0
+        for item in items:
+            self.add(item)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self.positions(item)
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+    def positions(self, item: str) -> List[int]:
+        # Double hashing: two 64-bit halves of one digest give every position.
+        digest = blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        for position in self.positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def update(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.add(item)
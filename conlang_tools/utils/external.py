@@ -0,0 +1,82 @@
+from heapq import merge
+from tempfile import TemporaryDirectory, mkstemp
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+def write_run(items: List[str], directory: str) -> str:
+    # Sorts the items in place and writes each one once, a line at a time.
+    items.sort()
+    handle, path = mkstemp(suffix=".run", dir=directory)
+    with open(handle, "w", encoding="utf-8") as run:
+        previous = None
+        for item in items:
+            if item != previous:
+                run.write(item + "\n")
+                previous = item
+    return path
+
+
+def spill(items: Iterable[str], run_size: int, directory: str) -> List[str]:
+    paths: List[str] = []
+    buffer: List[str] = []
+    for item in items:
+        buffer.append(item)
+        if len(buffer) >= run_size:
+            paths.append(write_run(buffer, directory))
+            buffer = []
+    if buffer:
+        paths.append(write_run(buffer, directory))
+    return paths
+
+
+def read_run(path: str, tag: int = 0) -> Iterator[Tuple[str, int]]:
+    with open(path, "r", encoding="utf-8") as run:
+        for line in run:
+            yield line[:-1], tag
+
+
+def unique(pairs: Iterable[Tuple[str, int]]) -> Iterator[Tuple[str, int]]:
+    # Keeps the first of each run of equal items, which, since pairs are
+    # sorted, is the one with the lowest tag.
+    previous = None
+    for item, tag in pairs:
+        if item != previous:
+            previous = item
+            yield item, tag
+
+
+def collapse(paths: List[str], directory: str, fan_in: int) -> List[str]:
+    # Merges runs into fewer, longer runs until we can merge them all at once
+    # without holding too many files open.
+    while len(paths) > fan_in:
+        merged: List[str] = []
+        for start in range(0, len(paths), fan_in):
+            group = paths[start : start + fan_in]
+            handle, path = mkstemp(suffix=".run", dir=directory)
+            with open(handle, "w", encoding="utf-8") as run:
+                streams = [read_run(p) for p in group]
+                for item, _ in unique(merge(*streams)):
+                    run.write(item + "\n")
+            merged.append(path)
+        paths = merged
+    return paths
+
+
+def external_unique(
+    items: Iterable[str],
+    exclude: Iterable[str] = (),
+    run_size: int = 1_000_000,
+    directory: Optional[str] = None,
+    fan_in: int = 64,
+) -> Iterator[str]:
+    # Yields each item once, in sorted order, leaving out anything in
+    # exclude. Both are spilled to disk in sorted runs of at most run_size
+    # items, so memory use stays bounded however many items there are.
+    with TemporaryDirectory(dir=directory) as temporary:
+        excluded = collapse(spill(exclude, run_size, temporary), temporary, fan_in)
+        runs = collapse(spill(items, run_size, temporary), temporary, fan_in)
+        streams = [read_run(path, 0) for path in excluded]
+        streams += [read_run(path, 1) for path in runs]
+        for item, tag in unique(merge(*streams)):
+            if tag == 1:
+                yield item
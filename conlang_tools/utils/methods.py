@@ -1,5 +1,5 @@
-from typing import Dict, List
-from conlang_tools.phonemes.roots import Syllable
+from typing import Dict, List, Sequence
+from conlang_tools.phonemes.roots import Root, Syllable
 from conlang_tools.phonemes.consonants import Consonant
 from conlang_tools.phonemes.vowels import Vowel
 
@@ -8,6 +8,30 @@ def get_choices(dictionary: Dict[str, int]) -> List[str]:
     return [key for key, value in dictionary.items() for _ in range(value)]
 
 
+def edit_distance(a: Sequence, b: Sequence) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, item_a in enumerate(a, start=1):
+        current = [i]
+        for j, item_b in enumerate(b, start=1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (item_a != item_b),
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+def phoneme_distance(a: str, b: str) -> int:
+    a_symbols = [phoneme.symbol for phoneme in Root(a).phonemes]
+    b_symbols = [phoneme.symbol for phoneme in Root(b).phonemes]
+    return edit_distance(a_symbols, b_symbols)
+
+
 def oxford_comma(items: List[str]) -> str:
     if len(items) < 1:
         return ""
@@ -19,6 +43,18 @@ def oxford_comma(items: List[str]) -> str:
         return ", ".join(items[:-1]) + ", and " + items[-1]
 
 
+def shard(items: Sequence, parts: int) -> List[Sequence]:
+    size, remainder = divmod(len(items), parts)
+    shards: List[Sequence] = []
+    start = 0
+    for index in range(parts):
+        end = start + size + (index < remainder)
+        if end > start:
+            shards.append(items[start:end])
+        start = end
+    return shards
+
+
 def weigh_syllable(syllable: str) -> int:
     analysis = Syllable(syllable)
     return sum(
@@ -1,8 +1,13 @@
 import argparse
 import glob
 import os
+import random
+import sys
 import yaml
-from conlang_tools.language.classes import Language
+from conlang_tools.language.classes import Language, LexiconStatistics, RetryPolicy
+from conlang_tools.language.constraints import WordConstraints
+from conlang_tools.language.ledger import ledger_path
+from conlang_tools.language.wordspace import drawing_threshold
 from conlang_tools.soundchanges.history import History
 
 if __name__ == "__main__":
@@ -12,11 +17,66 @@ if __name__ == "__main__":
         "and 'create'.",
         "lang": "[Word Generator/History] Which language you’d like to work with. "
         "Options are: ",
+        "attempts": "[Word Generator] How many times to try for a new word with a "
+        "given number of syllables before trying with one more. Defaults to 10.",
         "changes": "[History] How many sound changes do you want to model?",
         "csv": "[History] Filename to which you’d like to write the history of how "
         "each word in the language changed (CSV format).",
+        "contains": "[Word Generator] Only generate words that contain this "
+        "phoneme somewhere.",
+        "dedup": "[Word Generator] How to make sure new words are new. Options are "
+        "'exact' and 'bloom' (a Bloom filter, which uses a fixed amount of memory "
+        "however many words you generate, but skips a small share of new words as "
+        "if they were already used). Defaults to 'exact'.",
+        "ending": "[Word Generator] Only generate words that end in an 'open' "
+        "syllable (a vowel) or a 'closed' one (a consonant).",
+        "error_rate": "[Word Generator] With '--dedup bloom', the share of new words "
+        "that may be skipped. Defaults to 0.001.",
+        "exhaustive": "[Word Generator] List new words with exactly '--syllables' "
+        "syllables in order, from the most likely to the least, instead of "
+        "drawing them at random, until there are none left.",
+        "give_up": "[Word Generator] What to do if no new word can be found within "
+        "'--max-syllables'. Options are 'raise' (report an error) and 'stop' (return "
+        "the words found so far). Defaults to 'raise'.",
+        "jobs": "[Create Language/Word Generator] How many processes to use when "
+        "analyzing the word list or generating new words. Defaults to 1.",
+        "sample": "[Create Language] Analyze a random sample of this many words "
+        "instead of the whole word list, and report estimates with 95% confidence "
+        "intervals. Useful for very large word lists.",
+        "reset_ledger": "[Word Generator] With '--ledger', forget every word in the "
+        "ledger before generating new ones.",
+        "run_size": "[Word Generator] With '--mode external', how many words to "
+        "sort in memory at a time. Defaults to 1,000,000.",
+        "seed": "Seed for the random number generator, so that results can be "
+        "reproduced. Applies to generating words, modeling history, and sampling "
+        "when creating a language.",
+        "stressed": "[Word Generator] Only generate words stressed on this "
+        "syllable, counting from 0 (or from the end with negative numbers).",
+        "stratify": "[Create Language] When sampling, sample proportionally from "
+        "words of each syllable count.",
+        "ledger": "[Word Generator] Remember every word generated for this language "
+        "in 'languages/<LANG>.ledger.db', and never generate any of them again.",
         "log": "[History] Filename to which you’d like to write the history of the "
         "changes that occurred (Markdown format).",
+        "max_syllables": "[Word Generator] The most syllables a new word may have. "
+        "By default, there is no limit.",
+        "min_distance": "[Word Generator] How many phonemes each new word must "
+        "differ by from every word in the language and every other new word. "
+        "Defaults to 1 (any word that isn't already in the language).",
+        "mode": "[Word Generator] How to generate words. Options are 'sequential' "
+        "(one at a time), 'batch' (many at once, which is much faster when "
+        "generating many words), 'external' (draw '--words' candidates, then "
+        "sort and deduplicate them on disk, which can't be combined with "
+        "'--min-distance', '--dedup bloom', '--jobs' or '--onset', '--contains', "
+        "'--ending' and '--stressed'), and 'typical' and 'atypical' (draw "
+        "'--oversample' times as many candidates as you asked for, and keep the "
+        "ones the language is most or least likely to produce). Defaults to "
+        "'sequential'.",
+        "onset": "[Word Generator] Only generate words that begin with this onset.",
+        "oversample": "[Word Generator] With '--mode typical' or '--mode atypical', "
+        "how many candidates to draw for each word you ask for. Defaults to 10.",
+        "output": "[Word Generator] Filename to write the new words to, one per "
+        "line. Words are written as they're generated. Defaults to printing them.",
         "name": "[Create Language] The name of the language you would like to create.",
         "syllables": "[Word Generator] The number of syllables to begin with to "
         "generate new words. Words with more syllables than this may be returned if "
@@ -37,15 +97,67 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description=desc["main"])
     parser.add_argument("--tool", "-t", type=str, help=desc["tool"])
     parser.add_argument("--lang", "-l", type=str, help=desc["lang"])
+    parser.add_argument("--attempts", type=int, help=desc["attempts"])
     parser.add_argument("--changes", "-c", type=int, help=desc["changes"])
+    parser.add_argument("--contains", type=str, help=desc["contains"])
     parser.add_argument("--csv", type=str, help=desc["csv"])
+    parser.add_argument(
+        "--dedup", choices=["exact", "bloom"], default="exact", help=desc["dedup"]
+    )
+    parser.add_argument("--ending", choices=["open", "closed"], help=desc["ending"])
+    parser.add_argument(
+        "--error-rate", type=float, default=0.001, help=desc["error_rate"]
+    )
+    parser.add_argument("--exhaustive", action="store_true", help=desc["exhaustive"])
+    parser.add_argument(
+        "--give-up", choices=["raise", "stop"], default="raise", help=desc["give_up"]
+    )
+    parser.add_argument("--jobs", "-j", type=int, help=desc["jobs"])
+    parser.add_argument("--ledger", action="store_true", help=desc["ledger"])
     parser.add_argument("--log", type=str, help=desc["log"])
+    parser.add_argument("--max-syllables", type=int, help=desc["max_syllables"])
+    parser.add_argument("--min-distance", type=int, help=desc["min_distance"])
+    parser.add_argument(
+        "--mode",
+        choices=["sequential", "batch", "external", "typical", "atypical"],
+        default="sequential",
+        help=desc["mode"],
+    )
+    parser.add_argument("--onset", type=str, help=desc["onset"])
+    parser.add_argument("--oversample", type=int, help=desc["oversample"])
+    parser.add_argument("--output", "-o", type=str, help=desc["output"])
     parser.add_argument("--name", "-n", type=str, help=desc["name"])
+    parser.add_argument("--sample", type=int, help=desc["sample"])
+    parser.add_argument(
+        "--reset-ledger", action="store_true", help=desc["reset_ledger"]
+    )
+    parser.add_argument(
+        "--run-size", type=int, default=1_000_000, help=desc["run_size"]
+    )
+    parser.add_argument("--seed", type=int, help=desc["seed"])
+    parser.add_argument("--stressed", type=int, help=desc["stressed"])
+    parser.add_argument("--stratify", action="store_true", help=desc["stratify"])
     parser.add_argument("--syllables", type=int, help=desc["syllables"])
     parser.add_argument("--wordlist", "-wl", type=str, help=desc["wordlist"])
     parser.add_argument("--words", "-w", type=int, help=desc["words"])
 
     args = parser.parse_args()
+    if args.mode == "external":
+        # External deduplication sorts plain candidates on disk, so it has no
+        # way to honor any of these.
+        ignored = {
+            "--min-distance": args.min_distance is not None,
+            "--dedup bloom": args.dedup == "bloom",
+            "--jobs": args.jobs is not None,
+            "--onset": args.onset is not None,
+            "--contains": args.contains is not None,
+            "--ending": args.ending is not None,
+            "--stressed": args.stressed is not None,
+        }
+        used = [flag for flag, given in ignored.items() if given]
+        if used:
+            parser.error(f"--mode external can't be used with {', '.join(used)}.")
+    rng = random.Random(args.seed) if args.seed is not None else None
     nolang_msg = (
         "No language specified. Please use '--lang' or '-l' to specify a language."
     )
@@ -55,7 +167,7 @@ if __name__ == "__main__":
         if not args.lang:
             print(nolang_msg)
         else:
-            lang = Language.load(args.lang)
+            lang = Language.load(args.lang, rng=rng)
             num_changes = args.changes or 1
             history = History(lang)
             new_lang = history.steps(num_changes)
@@ -88,11 +200,29 @@ if __name__ == "__main__":
                 "No word list specified. Please use '--worldist' or '-wl' to specify "
                 "a file to use for your word list."
             )
+        elif args.sample is not None and args.sample < 1:
+            print(
+                "A sample needs at least one word. Please use '--sample' with 1 or more."
+            )
         else:
             name = args.name or "new_language"
             with open(args.wordlist, "r", encoding="utf-8") as wordlist_file:
                 words = [line.strip() for line in wordlist_file.readlines()]
-                lang = Language.from_words(words)
+                stats = LexiconStatistics.from_sample(
+                    words,
+                    size=args.sample,
+                    seed=args.seed,
+                    stratify=args.stratify,
+                    jobs=args.jobs or 1,
+                )
+                lang = Language.from_statistics(stats, words)
+                if stats.sampled:
+                    print(f"Estimated from {stats.words} of {stats.population} words:")
+                    for key, estimate in stats.estimates().items():
+                        print(
+                            f"  {key}: {estimate.value:.3f} "
+                            f"({estimate.low:.3f}–{estimate.high:.3f})"
+                        )
                 with open(f"languages/{name}.yaml", "w", encoding="utf-8") as yaml_file:
                     yaml.safe_dump(lang.to_dict(), yaml_file, allow_unicode=True)
                     print(f"Created languages/{name}.yaml")
@@ -102,9 +232,121 @@ if __name__ == "__main__":
         if not args.lang:
             print(nolang_msg)
         else:
-            lang = Language.load(args.lang)
+            lang = Language.load(args.lang, rng=rng)
             num_words = args.words or 10
             num_syllables = args.syllables or 1
-            new_words = lang.generate_new_words(num_words, num_syllables=num_syllables)
-            for word in new_words:
-                print(word)
+            policy = RetryPolicy(
+                attempts=args.attempts or 10,
+                max_syllables=args.max_syllables,
+                give_up=args.give_up,
+                min_distance=args.min_distance or 1,
+            )
+            constraints = None
+            if args.onset or args.contains or args.ending or args.stressed is not None:
+                # With constraints, words are drawn to fit them from the start,
+                # with anywhere from --syllables to --max-syllables syllables.
+                constraints = WordConstraints(
+                    min_syllables=num_syllables,
+                    max_syllables=args.max_syllables,
+                    onset=args.onset,
+                    open_ending=None if not args.ending else args.ending == "open",
+                    contains=args.contains,
+                    stress=args.stressed,
+                )
+            if args.ledger:
+                ledger = lang.use_ledger(ledger_path(args.lang))
+                if args.reset_ledger:
+                    ledger.reset()
+            if args.dedup == "bloom":
+                lang.use_bloom_filter(num_words, error_rate=args.error_rate)
+            if args.exhaustive:
+                new_words = lang.iter_exhaustive(
+                    num_syllables, limit=num_words, policy=policy, record=False
+                )
+            elif args.mode == "external":
+                new_words = lang.iter_unique_candidates(
+                    num_words, num_syllables, run_size=args.run_size
+                )
+            elif args.mode in ["typical", "atypical"]:
+                new_words = lang.rank_new_words(
+                    num_words,
+                    num_syllables,
+                    oversample=args.oversample or 10,
+                    typical=args.mode == "typical",
+                    policy=policy,
+                    record=False,
+                )
+            else:
+                new_words = lang.iter_new_words(
+                    num_syllables,
+                    limit=num_words,
+                    policy=policy,
+                    mode=args.mode,
+                    jobs=args.jobs or 1,
+                    record=False,
+                    constraints=constraints,
+                )
+            # Words are written as soon as they're found, through a buffer,
+            # so we never hold the whole list in memory.
+            output = (
+                open(args.output, "w", encoding="utf-8", buffering=1 << 16)
+                if args.output
+                else sys.stdout
+            )
+            count = 0
+            longer = 0
+            try:
+                for word in new_words:
+                    output.write(word + "\n")
+                    count += 1
+                    longer += word.count(".") + 1 > num_syllables
+            except ValueError as error:
+                print(error, file=sys.stderr)
+            except BrokenPipeError:
+                # Whatever we were piping into has stopped reading (as with
+                # `head`), so stop quietly.
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+                sys.exit(0)
+            finally:
+                if output is not sys.stdout:
+                    output.close()
+                if lang.ledger is not None:
+                    lang.ledger.commit()
+            if args.mode == "external":
+                print(
+                    f"Kept {count} new words of {num_words} candidates.",
+                    file=sys.stderr,
+                )
+            elif count < num_words:
+                print(f"Only found {count} of {num_words} new words.", file=sys.stderr)
+            elif args.output:
+                print(f"Wrote {count} new words to '{args.output}'.")
+            if longer and constraints is None:
+                # Let them know they asked for more words than there's room
+                # for at that length.
+                syllables = "syllable" if num_syllables == 1 else "syllables"
+                message = (
+                    f"{longer} of {count} new words have more than "
+                    f"{num_syllables} {syllables}"
+                )
+                space = lang.tracked_space(num_syllables)
+                saturation = space.saturation() if space is not None else None
+                if saturation is not None and saturation.free < drawing_threshold:
+                    message += (
+                        f", since {saturation.used:,} of the {saturation.size:,} "
+                        f"possible words with {num_syllables} {syllables} are taken"
+                    )
+                elif policy.min_distance > 1:
+                    message += (
+                        ", since retries at that length kept turning up words we "
+                        "have, or words too close to them "
+                        f"(--min-distance {policy.min_distance})"
+                    )
+                else:
+                    message += (
+                        ", since retries at that length kept turning up words we "
+                        "already have"
+                    )
+                print(message + ".", file=sys.stderr)
+            if lang.ledger is not None:
+                lang.ledger.close()